@@ -0,0 +1,66 @@
+"""
+No-op stand-ins for PyOpenGL and pygame, so the engine's CPU paths can be imported and timed
+without a display or GPU. install() must run before anything from src is imported.
+
+Every gl*/glu* function returns 1 (a valid-looking object id) and every GL_* constant gets a
+distinct integer. Names are collected from the engine sources, so star imports such as
+`from OpenGL.GL import *` provide everything the modules reference.
+"""
+import ctypes
+import glob
+import os
+import re
+import sys
+import types
+
+_GL_NAME = re.compile(r'\b(gl[A-Z]\w*|glu[A-Z]\w*|GL_\w+|GLU_\w+|GL[a-z]\w*)\b')
+
+
+def _gl_function(*args, **kwargs):
+    return 1
+
+
+class _StubModule(types.ModuleType):
+    """Module whose unknown attributes are no-op functions (so `from x import y` always succeeds)."""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _gl_function
+
+
+def _collect_gl_names(source_dirs):
+    names = set()
+    for source_dir in source_dirs:
+        for path in glob.glob(os.path.join(source_dir, '*.py')):
+            with open(path) as f:
+                names |= set(_GL_NAME.findall(f.read()))
+    return sorted(names)
+
+
+def install(source_dirs):
+    """Registers stub OpenGL, OpenGL.GL, OpenGL.GLU, pygame and pygame.locals modules in sys.modules."""
+    names = _collect_gl_names(source_dirs)
+    gl = _StubModule('OpenGL.GL')
+    glu = _StubModule('OpenGL.GLU')
+    for constant_value, name in enumerate(names, start=1):
+        if name.startswith(('GL_', 'GLU_')):
+            value = constant_value
+        elif name.startswith('GL'): # Types such as GLenum, GLfloat
+            value = ctypes.c_float if name == 'GLfloat' else ctypes.c_uint
+        else:
+            value = _gl_function
+        setattr(gl, name, value)
+        setattr(glu, name, value)
+    gl.sizeof = ctypes.sizeof
+    gl.__all__ = names + ['sizeof']
+    glu.__all__ = names
+
+    opengl = _StubModule('OpenGL')
+    opengl.GL, opengl.GLU = gl, glu
+    pygame = _StubModule('pygame')
+    pygame_locals = _StubModule('pygame.locals')
+    pygame_locals.__all__ = []
+    pygame.locals = pygame_locals
+    sys.modules.update({'OpenGL': opengl, 'OpenGL.GL': gl, 'OpenGL.GLU': glu,
+                        'pygame': pygame, 'pygame.locals': pygame_locals})
@@ -0,0 +1,320 @@
+"""
+Headless benchmarks for the engine's CPU hot paths (world generation, collision, raycasting,
+frustum and occlusion culling, vertex data and chunk meshing) at several world sizes.
+
+OpenGL and pygame are replaced by no-op stubs (see gl_stubs.py), so no display or GPU is needed.
+Results are printed as a table and can be written as JSON; a run can be compared against a stored
+baseline, in which case the exit code is 1 if any benchmark got slower than the threshold allows.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes small medium --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import gl_stubs
+gl_stubs.install([os.path.join(REPO_ROOT, 'src')])
+
+import numpy as np
+
+from src import game, world_management
+from src.world_management import world, generate_world, get_surface_height
+from src.assets import get_interleaved_cube_vertex_data
+from src.camera import Camera
+from src.culling import cull_blocks, cull_chunks
+from src.meshing import build_chunk_mesh, build_chunk_instances
+from src.physics import move_and_collide
+from src.visibility import ChunkVisibilityGraph, face_connectivity
+from src.config import WORLD_SEED, PLAYER_AABB_DIMS
+
+# name -> (width, height, depth) in blocks
+WORLD_SIZES = {
+    'small': (32, 24, 32),
+    'medium': (64, 32, 64),
+    'large': (128, 48, 128),
+}
+SAMPLE_COUNT = 256 # Poses/positions per batch for the per-call benchmarks
+
+_benchmarks = [] # (name, per_size, setup(context) -> callable)
+
+
+def benchmark(name, per_size=True):
+    """Registers a setup function returning the callable to time. per_size=False runs it only once."""
+    def register(setup):
+        _benchmarks.append((name, per_size, setup))
+        return setup
+    return register
+
+
+def _use_world_size(width, height, depth):
+    """Points the fixed-world bounds used by the game module and block queries at the benchmark world."""
+    for module in (game, world_management):
+        module.WORLD_WIDTH, module.WORLD_HEIGHT, module.WORLD_DEPTH = width, height, depth
+
+
+def _clear_world():
+    world.chunks.clear()
+    world.chunk_revisions.clear()
+
+
+def _make_context(size_name):
+    width, height, depth = WORLD_SIZES[size_name]
+    _use_world_size(width, height, depth)
+    _clear_world()
+    generate_world(WORLD_SEED, width, height, depth, processes=0)
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(1, width - 2, SAMPLE_COUNT)
+    zs = rng.uniform(1, depth - 2, SAMPLE_COUNT)
+    # Standing on (or just above) the terrain, where collision and raycasts do real work
+    ys = np.array([get_surface_height(int(round(x)), int(round(z)), height) + 1.5 for x, z in zip(xs, zs)])
+    yaws = rng.uniform(0, 360, SAMPLE_COUNT)
+    pitches = rng.uniform(-89, 30, SAMPLE_COUNT)
+    cameras = [Camera((x, y, z), yaw, pitch) for x, y, z, yaw, pitch in zip(xs, ys, zs, yaws, pitches)]
+    visibility = ChunkVisibilityGraph()
+    for chunk_coord in world.loaded_chunk_coords():
+        visibility.update_chunk(world, chunk_coord)
+    return {
+        'size': (width, height, depth),
+        'positions': list(zip(xs.tolist(), ys.tolist(), zs.tolist())),
+        'angles': list(zip(yaws.tolist(), pitches.tolist())),
+        'matrices': [(c.view_matrix, c.projection_matrix) for c in cameras],
+        'planes': [c.frustum_planes for c in cameras],
+        'chunk_coords': list(world.loaded_chunk_coords()),
+        'visibility': visibility,
+        'solid_positions': np.argwhere(world.get_region(0, 0, 0, width, height, depth)).astype(np.float32),
+    }
+
+
+# --- Benchmarks ---
+
+@benchmark('generate_world')
+def _generate_world(context):
+    width, height, depth = context['size']
+    def run():
+        _clear_world()
+        generate_world(WORLD_SEED, width, height, depth, processes=0)
+    return run
+
+@benchmark('move_and_collide')
+def _move_and_collide(context):
+    dims = PLAYER_AABB_DIMS
+    positions = context['positions']
+    def run():
+        for position in positions:
+            move_and_collide(world, position, (0.3, -0.5, 0.2), dims)
+    return run
+
+@benchmark('get_targeted_block')
+def _get_targeted_block(context):
+    poses = list(zip(context['positions'], context['angles']))
+    def run():
+        # Consecutive poses differ, so the single-entry raycast cache never hits
+        for position, (yaw, pitch) in poses:
+            game.get_targeted_block(position, yaw, pitch, 5.0)
+    return run
+
+@benchmark('get_frustum_planes')
+def _get_frustum_planes(context):
+    matrices = context['matrices']
+    def run():
+        for view, projection in matrices:
+            game.get_frustum_planes(view, projection)
+    return run
+
+@benchmark('is_block_in_frustum')
+def _is_block_in_frustum(context):
+    planes = context['planes'][0]
+    positions = context['solid_positions'][:4096].tolist()
+    def run():
+        for x, y, z in positions:
+            game.is_block_in_frustum(x, y, z, planes)
+    return run
+
+@benchmark('cull_blocks')
+def _cull_blocks(context):
+    planes, positions = context['planes'][:16], context['solid_positions']
+    def run():
+        for frustum_planes in planes:
+            cull_blocks(frustum_planes, positions)
+    return run
+
+@benchmark('cull_chunks')
+def _cull_chunks(context):
+    planes, chunk_coords = context['planes'], context['chunk_coords']
+    def run():
+        for frustum_planes in planes:
+            cull_chunks(frustum_planes, chunk_coords)
+    return run
+
+@benchmark('visible_chunks')
+def _visible_chunks(context):
+    visibility, chunk_coords = context['visibility'], context['chunk_coords']
+    views = list(zip(context['positions'], context['planes']))
+    def run():
+        for position, frustum_planes in views:
+            visibility.visible_chunks(position, frustum_planes, chunk_coords)
+    return run
+
+@benchmark('face_connectivity')
+def _face_connectivity(context):
+    chunks = [world.get_chunk(chunk_coord) for chunk_coord in context['chunk_coords']]
+    def run():
+        for blocks in chunks:
+            face_connectivity(blocks)
+    return run
+
+@benchmark('get_interleaved_cube_vertex_data', per_size=False)
+def _get_interleaved_cube_vertex_data(context):
+    def run():
+        for _ in range(100):
+            get_interleaved_cube_vertex_data()
+    return run
+
+@benchmark('build_chunk_mesh')
+def _build_chunk_mesh(context):
+    chunk_coords = context['chunk_coords']
+    def run():
+        for chunk_coord in chunk_coords:
+            build_chunk_mesh(world, chunk_coord, greedy=False)
+    return run
+
+@benchmark('build_chunk_mesh_greedy')
+def _build_chunk_mesh_greedy(context):
+    chunk_coords = context['chunk_coords']
+    def run():
+        for chunk_coord in chunk_coords:
+            build_chunk_mesh(world, chunk_coord, greedy=True)
+    return run
+
+@benchmark('build_chunk_mesh_packed')
+def _build_chunk_mesh_packed(context):
+    chunk_coords = context['chunk_coords']
+    def run():
+        for chunk_coord in chunk_coords:
+            build_chunk_mesh(world, chunk_coord, greedy=True, packed=True)
+    return run
+
+@benchmark('build_chunk_mesh_lod')
+def _build_chunk_mesh_lod(context):
+    chunk_coords = context['chunk_coords']
+    def run():
+        for lod in (1, 2, 3):
+            for chunk_coord in chunk_coords:
+                build_chunk_mesh(world, chunk_coord, greedy=True, lod=lod)
+    return run
+
+@benchmark('build_chunk_instances')
+def _build_chunk_instances(context):
+    chunk_coords = context['chunk_coords']
+    def run():
+        for chunk_coord in chunk_coords:
+            build_chunk_instances(world, chunk_coord)
+    return run
+
+
+# --- Running and comparing ---
+
+def time_callable(run, repeat, warmup=1):
+    """Returns timing statistics in milliseconds over `repeat` calls, after `warmup` untimed ones."""
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples),
+            'mean_ms': statistics.fmean(samples), 'repeat': repeat}
+
+
+def run_benchmarks(size_names, repeat, only=None):
+    """Runs the registered benchmarks. Returns {"<size>/<name>": stats}; size-independent ones use "any"."""
+    results = {}
+    for index, size_name in enumerate(size_names):
+        context = _make_context(size_name)
+        for name, per_size, setup in _benchmarks:
+            if only and name not in only:
+                continue
+            if not per_size and index > 0:
+                continue
+            key = f"{size_name if per_size else 'any'}/{name}"
+            results[key] = time_callable(setup(context), repeat)
+            print(f"  {key:<42} {results[key]['median_ms']:10.3f} ms (min {results[key]['min_ms']:.3f})")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compares median times against a baseline run.
+
+    Returns:
+        list: (key, baseline_ms, current_ms, ratio) of every benchmark slower than (1 + threshold) x baseline.
+    """
+    regressions = []
+    print(f"\n  {'benchmark':<42} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, stats in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"  {key:<42} {'-':>10} {stats['median_ms']:10.3f}     new")
+            continue
+        ratio = stats['median_ms'] / previous['median_ms'] if previous['median_ms'] > 0 else math.inf
+        regressed = ratio > 1.0 + threshold
+        if regressed:
+            regressions.append((key, previous['median_ms'], stats['median_ms'], ratio))
+        print(f"  {key:<42} {previous['median_ms']:10.3f} {stats['median_ms']:10.3f} {ratio:6.2f}x{'  SLOWER' if regressed else ''}")
+    return regressions
+
+
+def _meta():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=list(WORLD_SIZES), default=list(WORLD_SIZES))
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (the median is compared)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a new baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against this baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown vs. the baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    known = {name for name, _, _ in _benchmarks}
+    if args.only and not set(args.only) <= known:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(set(args.only) - known))}")
+
+    print(f"Running benchmarks for sizes: {', '.join(args.sizes)}")
+    document = {'meta': _meta(), 'sizes': {name: WORLD_SIZES[name] for name in args.sizes},
+                'results': run_benchmarks(args.sizes, args.repeat, args.only)}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document, f, indent=2)
+            print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(document['results'], baseline.get('results', {}), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
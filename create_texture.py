@@ -1,9 +1,17 @@
+import hashlib
+import json
 import os
+import sys
 from PIL import Image, ImageDraw
 
 # Directory for textures
 TEXTURE_DIR = "textures"
 TEXTURE_SIZE = 64 # Pixels
+ATLAS_FILENAME = "atlas.png"
+# Read by the game at startup (see src/assets.py and src/rendering.py)
+MANIFEST_FILENAME = "atlas.json" # UVs, mip level layout and the source hashes of the last build
+MIP_CHAIN_FILENAME = "atlas.mips" # Raw RGBA8 pixels of every mip level, bottom row first, levels back to back
+MANIFEST_VERSION = 1
 
 def ensure_textures_directory():
     """Ensures the textures directory exists."""
@@ -34,11 +42,66 @@ def create_solid_color_texture(filename, color, size=(TEXTURE_SIZE, TEXTURE_SIZE
     except Exception as e:
         print(f"Error creating texture {filename}: {e}")
 
-def generate_texture_atlas():
+def hash_source_textures(source_textures_data, layout):
+    """
+    Hashes the source texture files together with the atlas layout.
+
+    Returns:
+        dict: filename -> SHA-256 hex digest (None for a missing file), plus "layout" for the layout itself.
+    """
+    hashes = {"layout": hashlib.sha256(json.dumps(layout, sort_keys=True).encode()).hexdigest()}
+    for tex_data in source_textures_data:
+        filepath = os.path.join(TEXTURE_DIR, tex_data['filename'])
+        try:
+            with open(filepath, "rb") as f:
+                hashes[tex_data['filename']] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            hashes[tex_data['filename']] = None
+    return hashes
+
+def is_atlas_up_to_date(source_hashes):
+    """True if the manifest was built from exactly these sources and all outputs are still there."""
+    manifest_path = os.path.join(TEXTURE_DIR, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+    outputs = (ATLAS_FILENAME, MIP_CHAIN_FILENAME)
+    return (manifest.get("version") == MANIFEST_VERSION and manifest.get("source_hashes") == source_hashes
+            and all(os.path.exists(os.path.join(TEXTURE_DIR, name)) for name in outputs))
+
+def write_mip_chain(atlas_image, filepath):
+    """
+    Writes every mip level of the atlas (box-filtered halvings down to 1x1) as raw RGBA8 pixels,
+    bottom row first as glTexImage2D expects, so the game can upload them straight from an mmap.
+
+    Returns:
+        list: [{"level", "width", "height", "offset", "size"}] for each level, in file order.
+    """
+    levels, offset = [], 0
+    image = atlas_image.convert("RGBA")
+    with open(filepath, "wb") as f:
+        while True:
+            pixels = image.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
+            f.write(pixels)
+            levels.append({"level": len(levels), "width": image.width, "height": image.height,
+                           "offset": offset, "size": len(pixels)})
+            offset += len(pixels)
+            if image.width == 1 and image.height == 1:
+                break
+            image = image.resize((max(1, image.width // 2), max(1, image.height // 2)), Image.BOX)
+    return levels
+
+def generate_texture_atlas(force=False):
     """
     Generates individual solid color textures (if they don't exist)
     and then combines them into a texture atlas.
-    Calculates and prints UV coordinates for each texture in the atlas.
+    Writes the atlas PNG, a raw mip chain and a JSON manifest with the UV coordinates of each texture.
+    Nothing is rebuilt if the source textures and layout hash the same as in the existing manifest.
+
+    Args:
+        force (bool): Rebuild even if the sources are unchanged.
     """
     ensure_textures_directory()
 
@@ -52,7 +115,8 @@ def generate_texture_atlas():
         {'name': 'dirt', 'filename': 'dirt.png', 'color': (139, 69, 19)},
         {'name': 'stone', 'filename': 'stone.png', 'color': (128, 128, 128)},
         {'name': 'wood', 'filename': 'wood.png', 'color': (160, 82, 45)},
-        {'name': 'leaves', 'filename': 'leaves.png', 'color': (0, 100, 0)}
+        {'name': 'leaves', 'filename': 'leaves.png', 'color': (0, 100, 0)},
+        {'name': 'lamp', 'filename': 'lamp.png', 'color': (255, 220, 120)}
     ]
 
     print("\nStep 1: Ensuring individual textures exist...")
@@ -61,9 +125,16 @@ def generate_texture_atlas():
 
     # 2. Define atlas layout and dimensions
     grid_cols = 3
-    grid_rows = 2 # To accommodate 5 textures, leaving one slot empty
+    grid_rows = 2 # 6 slots for the 6 textures
     atlas_width = TEXTURE_SIZE * grid_cols
     atlas_height = TEXTURE_SIZE * grid_rows
+
+    layout = {'texture_size': TEXTURE_SIZE, 'grid': [grid_cols, grid_rows],
+              'textures': [[t['name'], t['filename']] for t in source_textures_data]}
+    source_hashes = hash_source_textures(source_textures_data, layout)
+    if not force and is_atlas_up_to_date(source_hashes):
+        print("\nSource textures unchanged since the last build. Skipping atlas generation (use --force to rebuild).")
+        return
     
     atlas_image = Image.new("RGB", (atlas_width, atlas_height))
     atlas_uvs = {}
@@ -108,25 +179,44 @@ def generate_texture_atlas():
         atlas_uvs[name] = (u_min, v_min, u_max, v_max)
 
     # Save the atlas
-    atlas_filepath = os.path.join(TEXTURE_DIR, "atlas.png")
+    atlas_filepath = os.path.join(TEXTURE_DIR, ATLAS_FILENAME)
     try:
         atlas_image.save(atlas_filepath, "PNG")
         print(f"\nSuccessfully created texture atlas: {atlas_filepath}")
     except Exception as e:
         print(f"Error saving texture atlas {atlas_filepath}: {e}")
+        return
+
+    # Precomputed mip chain, so the game neither decodes the PNG nor builds mipmaps at startup
+    mip_chain_filepath = os.path.join(TEXTURE_DIR, MIP_CHAIN_FILENAME)
+    try:
+        mip_levels = write_mip_chain(atlas_image, mip_chain_filepath)
+        print(f"Successfully wrote {len(mip_levels)} mip levels: {mip_chain_filepath}")
+    except Exception as e:
+        print(f"Error writing mip chain {mip_chain_filepath}: {e}")
+        return
 
     # Print UV coordinates
     print("\nCalculated UV Coordinates (u_min, v_min, u_max, v_max):")
     for name, uvs in atlas_uvs.items():
         print(f"  '{name}': ({uvs[0]:.4f}, {uvs[1]:.4f}, {uvs[2]:.4f}, {uvs[3]:.4f})")
-    
-    # For direct copy-paste into code if needed:
-    print("\nUV Dictionary for copy-pasting:")
-    print("atlas_uv_coords = {")
-    for name, uvs in atlas_uvs.items():
-        print(f"    '{name}': ({uvs[0]:.6f}, {uvs[1]:.6f}, {uvs[2]:.6f}, {uvs[3]:.6f}),")
-    print("}")
+
+    # The manifest is written last: its presence with matching hashes marks a complete build
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "atlas": ATLAS_FILENAME,
+        "width": atlas_width,
+        "height": atlas_height,
+        "tile_size": TEXTURE_SIZE,
+        "uvs": {name: list(uvs) for name, uvs in atlas_uvs.items()},
+        "mip_chain": {"file": MIP_CHAIN_FILENAME, "format": "RGBA8", "levels": mip_levels},
+        "source_hashes": source_hashes,
+    }
+    manifest_filepath = os.path.join(TEXTURE_DIR, MANIFEST_FILENAME)
+    with open(manifest_filepath, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\nSuccessfully wrote atlas manifest: {manifest_filepath}")
 
 
 if __name__ == "__main__":
-    generate_texture_atlas()
+    generate_texture_atlas(force="--force" in sys.argv[1:])
@@ -2,28 +2,46 @@
 
 in vec3 Normal;
 in vec2 TexCoord;
-// in float AoFactor; // Temporarily removed
+flat in vec4 UvOffsetScale; // u_offset, v_offset, u_scale, v_scale of the block's atlas tile
+in float AoFactor; // Baked per-vertex ambient occlusion, interpolated across the face
+flat in vec2 Light; // x: sky light, y: block light brightness of the cell in front of the face
 in vec3 FragPos; // Fragment position in world space
 
 out vec4 FragColor;
 
 uniform sampler2D textureSampler;  // Texture atlas
-uniform vec3 lightDir;             // Light direction (world space, normalized)
-uniform float ambientStrength;
+
+// Per-frame constants, uploaded once per frame into a uniform buffer (see render_state.py)
+layout (std140) uniform FrameConstants {
+    mat4 view;
+    mat4 projection;
+    vec4 lightDir;         // xyz: light direction (world space, normalized)
+    float ambientStrength;
+};
 // uniform float diffuseStrength; // Assuming diffuseStrength = 1.0 for now
 
+const vec3 BLOCK_LIGHT_COLOR = vec3(1.0, 0.85, 0.6); // Warm light from emitting blocks (lamps)
+const float MIN_LIGHT = 0.03; // Fully dark caves are not pitch black
+
 void main() {
     // Ambient light
     vec3 ambient = ambientStrength * vec3(1.0, 1.0, 1.0); // Assuming light color is white
 
     // Diffuse light
     vec3 norm = normalize(Normal);
-    float diff = max(dot(norm, normalize(lightDir)), 0.0);
+    float diff = max(dot(norm, normalize(lightDir.xyz)), 0.0);
     vec3 diffuse = diff * vec3(1.0, 1.0, 1.0); // Assuming light color is white
 
-    // Combine lighting, modulated by texture color
-    // AO factor multiplication is temporarily removed
-    vec4 texColor = texture(textureSampler, TexCoord);
-    vec3 lighting = (ambient + diffuse); // * AoFactor; // AO Temporarily removed
+    // Wrap the tile-local coordinate into the block's atlas tile. Gradients come from the
+    // unwrapped coordinate so mip selection doesn't jump at tile seams of merged quads.
+    vec2 atlasUv = UvOffsetScale.xy + fract(TexCoord) * UvOffsetScale.zw;
+    vec2 uvDx = dFdx(TexCoord) * UvOffsetScale.zw;
+    vec2 uvDy = dFdy(TexCoord) * UvOffsetScale.zw;
+
+    // Combine lighting, modulated by texture color and ambient occlusion
+    vec4 texColor = textureGrad(textureSampler, atlasUv, uvDx, uvDy);
+    // Sunlight only reaches as far as the sky light does; block light adds where it is brighter
+    vec3 sunlight = (ambient + diffuse) * Light.x;
+    vec3 lighting = max(max(sunlight, BLOCK_LIGHT_COLOR * Light.y), vec3(MIN_LIGHT)) * AoFactor;
     FragColor = vec4(lighting * texColor.rgb, texColor.a);
 }
@@ -1,24 +1,61 @@
 #version 330 core
 
+#ifdef PACKED_VERTICES
+// Chunk meshes in the packed layout (two uint32 words per vertex, see meshing.pack_chunk_vertices)
+layout (location = 0) in uvec2 aPacked;
+
+uniform vec3 chunkOrigin;              // World position of the chunk's block (0, 0, 0)
+uniform vec4 tileRects[TILE_COUNT];    // Atlas rect per tile index (block type)
+uniform vec3 faceNormals[6];           // Normal per face index
+uniform float aoFactors[4];            // Brightness per AO level
+uniform float lightFactors[16];        // Brightness per light level
+#else
 layout (location = 0) in vec3 aPos;          // Vertex position
 layout (location = 1) in vec3 aNormal;       // Vertex normal
-layout (location = 2) in vec2 aTexCoord;     // Vertex texture coordinate
-// layout (location = 3) in float aAoFactor; // Temporarily removed for shader-based rendering
+layout (location = 2) in vec2 aTexCoord;     // Vertex texture coordinate (tile-local, repeats once per block)
+layout (location = 3) in float aAoFactor;    // Baked ambient occlusion (chunk meshes; constant 1.0 otherwise)
+layout (location = 4) in vec4 aUvOffsetScale; // Atlas rect: u_offset, v_offset, u_scale, v_scale
+                                              // (per-vertex for chunk meshes, per-instance when instanced,
+                                              //  constant attribute for single blocks)
+layout (location = 5) in vec3 aInstanceOffset; // Block position for instanced drawing (constant 0 otherwise)
+layout (location = 6) in vec2 aLight;        // Baked sky / block light brightness (chunk meshes; constant (1, 0) otherwise)
+
+uniform mat4 model;
+#endif
 
 out vec3 Normal;
 out vec2 TexCoord;
-// out float AoFactor; // Temporarily removed
+flat out vec4 UvOffsetScale;
+out float AoFactor;
+flat out vec2 Light;
 out vec3 FragPos; // Output fragment position in world space for lighting
 
-uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
-uniform vec4 uv_offset_scale; // u_offset, v_offset, u_scale, v_scale
+// Per-frame constants, uploaded once per frame into a uniform buffer (see render_state.py)
+layout (std140) uniform FrameConstants {
+    mat4 view;
+    mat4 projection;
+    vec4 lightDir;         // xyz: light direction (world space, normalized)
+    float ambientStrength;
+};
 
 void main() {
-    FragPos = vec3(model * vec4(aPos, 1.0)); // Fragment position in world space
+#ifdef PACKED_VERTICES
+    uint lo = aPacked.x;
+    uint hi = aPacked.y;
+    vec3 corner = vec3(uvec3(lo, lo >> 6u, lo >> 12u) & 63u); // Block corner, offset by +0.5
+    FragPos = chunkOrigin + corner - 0.5;
+    Normal = faceNormals[(hi >> 24u) & 7u];
+    TexCoord = vec2(uvec2(lo >> 18u, lo >> 24u) & 63u);
+    UvOffsetScale = tileRects[hi & 0xFFFFu];
+    AoFactor = aoFactors[(hi >> 27u) & 3u];
+    Light = vec2(lightFactors[(hi >> 16u) & 15u], lightFactors[(hi >> 20u) & 15u]);
+#else
+    FragPos = vec3(model * vec4(aPos + aInstanceOffset, 1.0)); // Fragment position in world space
     Normal = mat3(transpose(inverse(model))) * aNormal; // Transform normal to world space
-    TexCoord = aTexCoord * uv_offset_scale.zw + uv_offset_scale.xy; // Apply UV transform for atlas
-    // AoFactor = aAoFactor; // Temporarily removed
+    TexCoord = aTexCoord; // Atlas lookup happens per fragment so merged quads can repeat the tile
+    UvOffsetScale = aUvOffsetScale;
+    AoFactor = aAoFactor;
+    Light = aLight;
+#endif
     gl_Position = projection * view * vec4(FragPos, 1.0);
 }
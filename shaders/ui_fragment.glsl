@@ -0,0 +1,13 @@
+#version 330 core
+
+in vec3 TexCoord;
+in vec4 Color;
+
+out vec4 FragColor;
+
+uniform sampler2D uiTexture; // Glyph atlas
+
+void main() {
+    vec4 texColor = texture(uiTexture, TexCoord.xy);
+    FragColor = Color * mix(vec4(1.0), texColor, TexCoord.z);
+}
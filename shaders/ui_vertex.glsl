@@ -0,0 +1,16 @@
+#version 330 core
+
+layout (location = 0) in vec3 aPos;      // Screen pixels (2D HUD) or block-local position (3D outline)
+layout (location = 1) in vec3 aTexCoord; // Glyph atlas u, v and a textured flag (0 = solid colour)
+layout (location = 2) in vec4 aColor;    // RGBA colour (multiplies the glyph texture when textured)
+
+out vec3 TexCoord;
+out vec4 Color;
+
+uniform mat4 transform; // Orthographic projection for the HUD, projection * view * model for the outline
+
+void main() {
+    TexCoord = aTexCoord;
+    Color = aColor;
+    gl_Position = transform * vec4(aPos, 1.0);
+}
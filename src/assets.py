@@ -1,18 +1,48 @@
+import json
+
 import numpy as np
 from OpenGL.GL import glGenBuffers, glBindBuffer, glBufferData, GL_ARRAY_BUFFER, GL_STATIC_DRAW
 
-# Texture Atlas UV Coordinates
-# These are EXAMPLE values. In a real scenario, these would come from the
-# execution of the texture atlas generation script.
-ATLAS_UV_COORDINATES = {
+# Texture atlas build outputs (written by create_texture.py)
+ATLAS_MANIFEST_PATH = "textures/atlas.json"
+ATLAS_MANIFEST_VERSION = 1
+
+# Fallback UVs (u_min, v_min, u_max, v_max) matching create_texture.py's default 3x2 layout,
+# used when the atlas has not been built with a manifest yet.
+DEFAULT_ATLAS_UV_COORDINATES = {
     'grass': (0.0, 0.0, 0.3333333333333333, 0.5),
     'dirt': (0.3333333333333333, 0.0, 0.6666666666666666, 0.5),
     'stone': (0.6666666666666666, 0.0, 1.0, 0.5),
     'wood': (0.0, 0.5, 0.3333333333333333, 1.0),
-    'leaves': (0.3333333333333333, 0.5, 0.6666666666666666, 1.0)
-    # Add other block types here if they are in the atlas
+    'leaves': (0.3333333333333333, 0.5, 0.6666666666666666, 1.0),
+    'lamp': (0.6666666666666666, 0.5, 1.0, 1.0)
 }
 
+def load_atlas_manifest(path=ATLAS_MANIFEST_PATH):
+    """
+    Reads the texture atlas manifest written by create_texture.py.
+
+    Returns:
+        dict or None: The manifest (UVs, size, mip chain layout), or None if it is missing or unreadable.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read atlas manifest '{path}': {e}. Using default UVs.")
+        return None
+    if manifest.get("version") != ATLAS_MANIFEST_VERSION or "uvs" not in manifest:
+        print(f"Warning: Atlas manifest '{path}' has an unsupported format. Using default UVs.")
+        return None
+    return manifest
+
+ATLAS_MANIFEST = load_atlas_manifest()
+# Texture Atlas UV Coordinates, per block name
+ATLAS_UV_COORDINATES = ({name: tuple(uvs) for name, uvs in ATLAS_MANIFEST["uvs"].items()}
+                        if ATLAS_MANIFEST else dict(DEFAULT_ATLAS_UV_COORDINATES))
+
 # Standard cube vertices (local coordinates, center is 0,0,0)
 std_cube_vertices = [
     (-0.5, -0.5,  0.5),  # 0 (LBF) Left-Bottom-Front
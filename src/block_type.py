@@ -8,6 +8,7 @@ class BlockType(Enum):
     STONE = 3
     WOOD = 4 
     LEAVES = 5
+    LAMP = 6 # Emits block light (see lighting.BLOCK_LIGHT_EMISSION)
 
 # Block Colors for Hotbar (RGB)
 BLOCK_COLORS = {
@@ -15,5 +16,6 @@ BLOCK_COLORS = {
     BlockType.DIRT: (139, 69, 19),
     BlockType.STONE: (128, 128, 128),
     BlockType.WOOD: (160, 82, 45),
-    BlockType.LEAVES: (0, 100, 0)
+    BlockType.LEAVES: (0, 100, 0),
+    BlockType.LAMP: (255, 220, 120)
 }
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+
+# All matrices returned by this module use OpenGL's column-major memory layout (the NumPy array is the
+# transpose of the mathematical matrix), i.e. the same layout glGetDoublev returns. They can be passed
+# straight to glUniformMatrix4fv(..., GL_FALSE, m) or glLoadMatrixf(m).
+
+
+def perspective_matrix(fov_y_degrees, aspect, near, far):
+    """Builds the same projection matrix as gluPerspective (GL layout, float32)."""
+    f = 1.0 / math.tan(math.radians(fov_y_degrees) / 2.0)
+    m = np.zeros((4, 4), dtype=np.float64)
+    m[0, 0] = f / aspect
+    m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far)
+    m[2, 3] = (2.0 * far * near) / (near - far)
+    m[3, 2] = -1.0
+    return m.T.astype(np.float32)
+
+
+def orthographic_matrix(left, right, bottom, top, near=-1.0, far=1.0):
+    """Builds the same projection matrix as glOrtho (gluOrtho2D with the default near/far). GL layout, float32."""
+    m = np.identity(4, dtype=np.float64)
+    m[0, 0] = 2.0 / (right - left)
+    m[1, 1] = 2.0 / (top - bottom)
+    m[2, 2] = -2.0 / (far - near)
+    m[0, 3] = -(right + left) / (right - left)
+    m[1, 3] = -(top + bottom) / (top - bottom)
+    m[2, 3] = -(far + near) / (far - near)
+    return m.T.astype(np.float32)
+
+
+def view_rotation(yaw_degrees, pitch_degrees):
+    """Rotation part of the view matrix: glRotatef(pitch, 1, 0, 0) followed by glRotatef(yaw, 0, 1, 0)."""
+    rp, ry = math.radians(pitch_degrees), math.radians(yaw_degrees)
+    cp, sp, cy, sy = math.cos(rp), math.sin(rp), math.cos(ry), math.sin(ry)
+    rot_x = np.array([[1.0, 0.0, 0.0], [0.0, cp, -sp], [0.0, sp, cp]])
+    rot_y = np.array([[cy, 0.0, sy], [0.0, 1.0, 0.0], [-sy, 0.0, cy]])
+    return rot_x @ rot_y
+
+
+def view_matrix(position, yaw_degrees, pitch_degrees):
+    """
+    Builds the view matrix the game used to set up with fixed-function calls:
+    glRotatef(pitch, 1, 0, 0); glRotatef(yaw, 0, 1, 0); glTranslatef(-x, -y, -z). GL layout, float32.
+    """
+    rotation = view_rotation(yaw_degrees, pitch_degrees)
+    m = np.identity(4, dtype=np.float64)
+    m[:3, :3] = rotation
+    m[:3, 3] = -rotation @ np.asarray(position, dtype=np.float64)
+    return m.T.astype(np.float32)
+
+
+def extract_frustum_planes(view_m, projection_m):
+    """
+    Extracts the six normalized frustum planes (a, b, c, d), with a*x + b*y + c*z + d >= 0 inside,
+    from GL-layout view and projection matrices.
+
+    Returns:
+        np.ndarray: (6, 4) array in order Left, Right, Bottom, Top, Near, Far.
+    """
+    # GL layout arrays are transposed, so (P @ V)^T = V_gl @ P_gl, and transposing again gives the clip matrix
+    clip = (np.asarray(view_m, dtype=np.float64) @ np.asarray(projection_m, dtype=np.float64)).T
+    planes = np.array([
+        clip[3] + clip[0], # Left
+        clip[3] - clip[0], # Right
+        clip[3] + clip[1], # Bottom
+        clip[3] - clip[1], # Top
+        clip[3] + clip[2], # Near
+        clip[3] - clip[2], # Far
+    ])
+    magnitudes = np.linalg.norm(planes[:, :3], axis=1)
+    magnitudes[magnitudes == 0] = 1.0
+    return planes / magnitudes[:, None]
+
+
+class Camera:
+    """
+    CPU-side camera. Computes view/projection matrices and frustum planes in NumPy, caching them
+    until the pose or projection parameters actually change, so the GL matrix state never has to
+    be read back.
+    """
+
+    def __init__(self, position, yaw=0.0, pitch=0.0, fov_y=45.0, aspect=4.0 / 3.0, near=0.1, far=100.0):
+        self.position = tuple(float(v) for v in position)
+        self.yaw = float(yaw)
+        self.pitch = float(pitch)
+        self.fov_y, self.aspect, self.near, self.far = float(fov_y), float(aspect), float(near), float(far)
+        self.revision = 0 # Incremented whenever the view or projection changes
+        self._view = None
+        self._projection = None
+        self._frustum_planes = None
+
+    def set_pose(self, position, yaw, pitch):
+        """Updates position/orientation. Cached matrices are only invalidated if something changed."""
+        position = (float(position[0]), float(position[1]), float(position[2]))
+        if position == self.position and yaw == self.yaw and pitch == self.pitch:
+            return False
+        self.position, self.yaw, self.pitch = position, float(yaw), float(pitch)
+        self._view = None
+        self._frustum_planes = None
+        self.revision += 1
+        return True
+
+    def set_projection(self, fov_y=None, aspect=None, near=None, far=None):
+        """Updates projection parameters. Cached matrices are only invalidated if something changed."""
+        new_params = (self.fov_y if fov_y is None else float(fov_y), self.aspect if aspect is None else float(aspect),
+                      self.near if near is None else float(near), self.far if far is None else float(far))
+        if new_params == (self.fov_y, self.aspect, self.near, self.far):
+            return False
+        self.fov_y, self.aspect, self.near, self.far = new_params
+        self._projection = None
+        self._frustum_planes = None
+        self.revision += 1
+        return True
+
+    @property
+    def view_matrix(self):
+        if self._view is None:
+            self._view = view_matrix(self.position, self.yaw, self.pitch)
+        return self._view
+
+    @property
+    def projection_matrix(self):
+        if self._projection is None:
+            self._projection = perspective_matrix(self.fov_y, self.aspect, self.near, self.far)
+        return self._projection
+
+    @property
+    def frustum_planes(self):
+        if self._frustum_planes is None:
+            self._frustum_planes = extract_frustum_planes(self.view_matrix, self.projection_matrix)
+        return self._frustum_planes
+
+    def forward_vector(self):
+        """Unit vector the view matrix looks along (world space), i.e. the camera's -Z axis."""
+        return -view_rotation(self.yaw, self.pitch)[2]
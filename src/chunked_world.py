@@ -0,0 +1,205 @@
+import numpy as np
+
+from .block_type import BlockType
+from .config import CHUNK_SIZE
+
+# Chunk coordinates are derived with shifts/masks, so CHUNK_SIZE must be a power of two.
+CHUNK_SHIFT = CHUNK_SIZE.bit_length() - 1
+CHUNK_MASK = CHUNK_SIZE - 1
+if (1 << CHUNK_SHIFT) != CHUNK_SIZE:
+    raise ValueError(f"CHUNK_SIZE must be a power of two, got {CHUNK_SIZE}")
+
+EMPTY_BLOCK = BlockType.EMPTY.value
+
+
+def world_to_chunk_coords(x, y, z):
+    """
+    Splits integer world coordinates into a chunk key and chunk-local coordinates.
+    Works for negative coordinates as well (arithmetic shift floors towards -inf).
+
+    Returns:
+        tuple: ((cx, cy, cz), (lx, ly, lz))
+    """
+    return ((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT, z >> CHUNK_SHIFT),
+            (x & CHUNK_MASK, y & CHUNK_MASK, z & CHUNK_MASK))
+
+
+def chunk_origin(chunk_coord):
+    """Returns the world coordinates of block (0, 0, 0) of the given chunk."""
+    cx, cy, cz = chunk_coord
+    return (cx << CHUNK_SHIFT, cy << CHUNK_SHIFT, cz << CHUNK_SHIFT)
+
+
+class ChunkedWorld:
+    """
+    Sparse voxel store made of fixed-size cubic chunks.
+
+    Each loaded chunk is a contiguous NumPy array of shape (CHUNK_SIZE,)*3 indexed
+    [x, y, z], keyed by its chunk coordinate (cx, cy, cz). Cells in chunks that are
+    not loaded read as EMPTY, so memory scales with loaded chunks only.
+    """
+
+    def __init__(self, dtype=np.uint8):
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype(np.uint8), np.dtype(np.uint16)):
+            raise ValueError(f"Unsupported block dtype {self.dtype}; use uint8 or uint16.")
+        self.chunks = {}
+        self.revision = 0 # Incremented on every modification, so callers can cache derived results
+        self.chunk_revisions = {} # chunk_coord -> value of self.revision when that chunk last changed
+
+    def _touch(self, chunk_coord):
+        """Records a modification of one chunk."""
+        self.revision += 1
+        self.chunk_revisions[chunk_coord] = self.revision
+
+    def chunk_revision(self, chunk_coord):
+        """Returns a stamp that changes whenever the chunk is modified (0 if never loaded)."""
+        return self.chunk_revisions.get(chunk_coord, 0)
+
+    # --- Chunk access ---
+
+    def get_chunk(self, chunk_coord):
+        """Returns the block array of a loaded chunk, or None if it is not loaded."""
+        return self.chunks.get(chunk_coord)
+
+    def get_or_create_chunk(self, chunk_coord):
+        """Returns the block array of a chunk, allocating an empty one if needed."""
+        chunk = self.chunks.get(chunk_coord)
+        if chunk is None:
+            chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), dtype=self.dtype)
+            self.chunks[chunk_coord] = chunk
+        return chunk
+
+    def set_chunk(self, chunk_coord, blocks):
+        """Stores a whole chunk array (copied/cast to the world dtype)."""
+        blocks = np.asarray(blocks)
+        if blocks.shape != (CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE):
+            raise ValueError(f"Chunk array must have shape {(CHUNK_SIZE,) * 3}, got {blocks.shape}")
+        self.chunks[chunk_coord] = np.ascontiguousarray(blocks, dtype=self.dtype)
+        self._touch(chunk_coord)
+
+    def unload_chunk(self, chunk_coord):
+        """Removes a chunk from memory. Returns its block array, or None if it was not loaded."""
+        chunk = self.chunks.pop(chunk_coord, None)
+        if chunk is not None:
+            self.revision += 1
+            self.chunk_revisions.pop(chunk_coord, None)
+        return chunk
+
+    def loaded_chunk_coords(self):
+        """Returns a list of the coordinates of all loaded chunks."""
+        return list(self.chunks.keys())
+
+    def memory_usage_bytes(self):
+        """Returns the number of bytes held by loaded chunk arrays."""
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    # --- Scalar access ---
+
+    def get_block(self, x, y, z):
+        """Returns the block type value at integer world coordinates (EMPTY if unloaded)."""
+        chunk = self.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT, z >> CHUNK_SHIFT))
+        if chunk is None:
+            return EMPTY_BLOCK
+        return int(chunk[x & CHUNK_MASK, y & CHUNK_MASK, z & CHUNK_MASK])
+
+    def set_block(self, x, y, z, value):
+        """Sets the block type value at integer world coordinates, allocating the chunk if needed."""
+        chunk_coord = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT, z >> CHUNK_SHIFT)
+        chunk = self.chunks.get(chunk_coord)
+        if chunk is None:
+            if value == EMPTY_BLOCK:
+                return # Unloaded chunks already read as EMPTY
+            chunk = self.get_or_create_chunk(chunk_coord)
+        chunk[x & CHUNK_MASK, y & CHUNK_MASK, z & CHUNK_MASK] = value
+        self._touch(chunk_coord)
+
+    def get_blocks(self, xs, ys, zs):
+        """
+        Vectorized lookup of many cells at once. xs, ys, zs are integer arrays of equal shape;
+        returns an array of block values of the same shape (EMPTY for unloaded chunks).
+        """
+        xs, ys, zs = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64), np.asarray(zs, dtype=np.int64)
+        result = np.zeros(xs.shape, dtype=self.dtype)
+        if xs.size == 0:
+            return result
+        keys = np.stack((xs >> CHUNK_SHIFT, ys >> CHUNK_SHIFT, zs >> CHUNK_SHIFT), axis=-1).reshape(-1, 3)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        flat_result = result.reshape(-1)
+        lx, ly, lz = (xs & CHUNK_MASK).reshape(-1), (ys & CHUNK_MASK).reshape(-1), (zs & CHUNK_MASK).reshape(-1)
+        for key_idx, key in enumerate(unique_keys):
+            chunk = self.chunks.get((int(key[0]), int(key[1]), int(key[2])))
+            if chunk is None:
+                continue
+            selected = inverse == key_idx
+            flat_result[selected] = chunk[lx[selected], ly[selected], lz[selected]]
+        return result
+
+    def is_block_solid(self, x, y, z):
+        """Checks if the block at integer world coordinates is solid (not EMPTY)."""
+        return self.get_block(x, y, z) != EMPTY_BLOCK
+
+    # --- Bulk access ---
+
+    def _overlapping_chunks(self, x0, y0, z0, x1, y1, z1):
+        """
+        Yields (chunk_coord, world_slices, local_slices) for every chunk overlapping the
+        half-open box [x0, x1) x [y0, y1) x [z0, z1). world_slices index into an array
+        whose origin is (x0, y0, z0); local_slices index into the chunk array.
+        """
+        for cx in range(x0 >> CHUNK_SHIFT, ((x1 - 1) >> CHUNK_SHIFT) + 1):
+            ox = cx << CHUNK_SHIFT
+            ax, bx = max(x0, ox), min(x1, ox + CHUNK_SIZE)
+            for cy in range(y0 >> CHUNK_SHIFT, ((y1 - 1) >> CHUNK_SHIFT) + 1):
+                oy = cy << CHUNK_SHIFT
+                ay, by = max(y0, oy), min(y1, oy + CHUNK_SIZE)
+                for cz in range(z0 >> CHUNK_SHIFT, ((z1 - 1) >> CHUNK_SHIFT) + 1):
+                    oz = cz << CHUNK_SHIFT
+                    az, bz = max(z0, oz), min(z1, oz + CHUNK_SIZE)
+                    world_slices = (slice(ax - x0, bx - x0), slice(ay - y0, by - y0), slice(az - z0, bz - z0))
+                    local_slices = (slice(ax - ox, bx - ox), slice(ay - oy, by - oy), slice(az - oz, bz - oz))
+                    yield (cx, cy, cz), world_slices, local_slices
+
+    def get_region(self, x0, y0, z0, x1, y1, z1):
+        """
+        Copies the half-open box [x0, x1) x [y0, y1) x [z0, z1) into a new array indexed
+        [x - x0, y - y0, z - z0]. Cells in unloaded chunks are EMPTY.
+        """
+        region = np.zeros((max(0, x1 - x0), max(0, y1 - y0), max(0, z1 - z0)), dtype=self.dtype)
+        if region.size == 0:
+            return region
+        for chunk_coord, world_slices, local_slices in self._overlapping_chunks(x0, y0, z0, x1, y1, z1):
+            chunk = self.chunks.get(chunk_coord)
+            if chunk is not None:
+                region[world_slices] = chunk[local_slices]
+        return region
+
+    def set_region(self, x0, y0, z0, blocks):
+        """Writes a 3D array of block values into the world with its [0, 0, 0] at (x0, y0, z0)."""
+        blocks = np.asarray(blocks)
+        x1, y1, z1 = x0 + blocks.shape[0], y0 + blocks.shape[1], z0 + blocks.shape[2]
+        if blocks.size == 0:
+            return
+        for chunk_coord, world_slices, local_slices in self._overlapping_chunks(x0, y0, z0, x1, y1, z1):
+            part = blocks[world_slices]
+            chunk = self.chunks.get(chunk_coord)
+            if chunk is None:
+                if not part.any():
+                    continue # Don't allocate chunks for all-EMPTY writes
+                chunk = self.get_or_create_chunk(chunk_coord)
+            chunk[local_slices] = part
+            self._touch(chunk_coord)
+
+    def fill_region(self, x0, y0, z0, x1, y1, z1, value):
+        """Fills the half-open box [x0, x1) x [y0, y1) x [z0, z1) with a single block value."""
+        if x1 <= x0 or y1 <= y0 or z1 <= z0:
+            return
+        for chunk_coord, _, local_slices in self._overlapping_chunks(x0, y0, z0, x1, y1, z1):
+            chunk = self.chunks.get(chunk_coord)
+            if chunk is None:
+                if value == EMPTY_BLOCK:
+                    continue
+                chunk = self.get_or_create_chunk(chunk_coord)
+            chunk[local_slices] = value
+            self._touch(chunk_coord)
@@ -8,12 +8,63 @@ WORLD_DEPTH = 30
 # Player AABB dimensions (width, height, depth)
 PLAYER_AABB_DIMS = (0.6, 1.8, 0.6) 
 
-# Physics Constants
+# Physics Constants (per simulation tick)
 GRAVITY = 0.015
 JUMP_STRENGTH = 0.23
+PLAYER_MOVE_SPEED = 0.1 # Blocks per tick
+
+# Simulation and frame pacing
+SIMULATION_HZ = 60 # Fixed rate of player physics, independent of the render framerate
+SIMULATION_DT = 1.0 / SIMULATION_HZ
+MAX_SIMULATION_STEPS = 5 # Per rendered frame; after a longer stall the simulation slows down instead of spiralling
+FRAME_RATE_CAP = 0 # Max rendered frames per second (0 = uncapped)
+VSYNC = False # Sync buffer swaps to the display refresh (if the driver allows it)
 
 # Lighting Constants
 LIGHT_DIRECTION_RAW = (0.8, 1.0, 0.6) # Raw direction
 light_mag = math.sqrt(sum(v*v for v in LIGHT_DIRECTION_RAW))
 LIGHT_DIRECTION = [v / light_mag for v in LIGHT_DIRECTION_RAW] # Normalized
 AMBIENT_LIGHT_STRENGTH = 0.4
+
+# Chunked world storage
+CHUNK_SIZE = 16 # Blocks per chunk edge; must be a power of two
+
+# Chunk meshing
+GREEDY_MESHING = True # Merge coplanar faces of the same block type into larger quads
+REMESH_BUDGET_MS = 4.0 # Per-frame time budget for rebuilding dirty chunk meshes
+LOD_ENABLED = True # Mesh distant chunk columns from downsampled blocks (chunk_mesh mode; see lod.py)
+LOD_DISTANCES_CHUNKS = (4.0, 8.0, 16.0) # Column distance where the 2x, 4x and 8x reduced meshes start
+LOD_HYSTERESIS_CHUNKS = 0.5 # How far past a threshold a column must be before its level changes
+PACKED_CHUNK_VERTICES = True # Chunk meshes use 8-byte packed vertices unpacked in the shader, instead of 15 floats (CHUNK_SIZE up to 32)
+
+# Rendering
+RENDER_MODE = "chunk_mesh" # "chunk_mesh" (one merged mesh per chunk) or "instanced" (one cube instance per visible block)
+OCCLUSION_CULLING = True # Only draw chunks reachable from the camera through empty space (see visibility.py)
+
+# World generation
+WORLD_SEED = 1337
+WORLDGEN_PROCESSES = None # Process pool size for terrain generation (None = CPU count, 0 = serial)
+
+# World streaming
+INFINITE_WORLD = True # Stream chunk columns around the player instead of generating a fixed WORLD_WIDTH x WORLD_DEPTH world
+RENDER_RADIUS_CHUNKS = 6 # Columns within this many chunks of the camera are loaded and drawn
+UNLOAD_RADIUS_CHUNKS = RENDER_RADIUS_CHUNKS + 2 # Columns beyond this are evicted (hysteresis)
+STREAMING_WORKERS = None # Worker processes for generation and meshing, streamed or rebuilt (None = CPU count - 1, min 1)
+STREAMING_BUDGET_MS = 3.0 # Per-frame time budget for integrating streamed chunks
+STREAMING_MAX_UPLOADS = 8 # Max chunk uploads per frame
+
+# World persistence
+PERSIST_WORLD = True # Save edited chunks to region files and load them back on the next launch
+SAVE_DIRECTORY = "saves/world"
+SAVE_CODEC = "zlib" # Chunk payload compression: "zlib" or "rle"
+AUTOSAVE_INTERVAL_S = 30.0 # Dirty chunks are queued for the background writer this often
+
+# Frame profiler (F3 toggles the overlay, F4 writes the history to CSV)
+PROFILER_ENABLED = False # Start with per-stage timing on; while off, the instrumentation is close to free
+PROFILER_HISTORY_FRAMES = 1024 # Frames kept in the ring buffer
+PROFILER_CSV_DIRECTORY = "profiles"
+PROFILER_FRAME_BUDGET_MS = 1000.0 / 60.0 # Reference line of the frame-time graph
+
+# Shader program cache
+SHADER_CACHE_ENABLED = True # Reuse linked program binaries (glProgramBinary) across launches
+SHADER_CACHE_DIRECTORY = "cache/shaders"
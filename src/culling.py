@@ -0,0 +1,95 @@
+import numpy as np
+
+from .chunked_world import CHUNK_SIZE
+
+# Counters from the most recent culling passes, for the debug overlay
+last_cull_stats = {
+    'chunks_tested': 0,
+    'chunks_visible': 0,
+    'chunks_culled': 0,
+    'chunks_occluded': 0, # In the frustum but hidden behind terrain (see visibility.py)
+    'blocks_tested': 0,
+    'blocks_visible': 0,
+    'blocks_culled': 0,
+}
+
+
+def aabbs_in_frustum(frustum_planes, box_mins, box_maxs):
+    """
+    Tests many axis-aligned boxes against all six frustum planes at once.
+
+    For each plane, only the box corner furthest along the plane normal (the "positive vertex")
+    is tested; if that corner is behind any plane, the whole box is outside.
+
+    Args:
+        frustum_planes (array-like): (6, 4) normalized planes (a, b, c, d), inside where a*x+b*y+c*z+d >= 0.
+        box_mins, box_maxs (np.ndarray): (N, 3) box corners.
+
+    Returns:
+        np.ndarray: (N,) bool mask, True for boxes that are at least partially inside.
+    """
+    planes = np.asarray(frustum_planes, dtype=np.float64)
+    box_mins = np.asarray(box_mins, dtype=np.float64)
+    box_maxs = np.asarray(box_maxs, dtype=np.float64)
+    normals = planes[:, :3] # (6, 3)
+    # (N, 6, 3) positive vertex per box and plane
+    positive_vertices = np.where(normals[None] > 0, box_maxs[:, None, :], box_mins[:, None, :])
+    distances = np.einsum('npk,pk->np', positive_vertices, normals) + planes[:, 3]
+    return (distances >= 0).all(axis=1)
+
+
+def chunk_aabbs(chunk_coords):
+    """Returns (mins, maxs) world-space bounds of chunks. Blocks are centred on integer coordinates."""
+    coords = np.asarray(chunk_coords, dtype=np.float64).reshape(-1, 3)
+    mins = coords * CHUNK_SIZE - 0.5
+    return mins, mins + CHUNK_SIZE
+
+
+def cull_chunks(frustum_planes, chunk_coords):
+    """
+    Returns the chunk coordinates (from the given iterable) whose bounds intersect the frustum,
+    testing all chunks against all six planes in one NumPy batch.
+    """
+    chunk_coords = list(chunk_coords)
+    if not chunk_coords:
+        last_cull_stats.update(chunks_tested=0, chunks_visible=0, chunks_culled=0, chunks_occluded=0)
+        return []
+    mins, maxs = chunk_aabbs(chunk_coords)
+    visible_mask = aabbs_in_frustum(frustum_planes, mins, maxs)
+    visible = [coord for coord, is_visible in zip(chunk_coords, visible_mask) if is_visible]
+    last_cull_stats.update(chunks_tested=len(chunk_coords), chunks_visible=len(visible),
+                           chunks_culled=len(chunk_coords) - len(visible), chunks_occluded=0)
+    return visible
+
+
+def cull_blocks(frustum_planes, block_positions):
+    """
+    Vectorized per-block pass: returns a bool mask of which unit blocks (centred on the given
+    integer positions, shape (N, 3)) intersect the frustum.
+    """
+    positions = np.asarray(block_positions, dtype=np.float64).reshape(-1, 3)
+    visible_mask = aabbs_in_frustum(frustum_planes, positions - 0.5, positions + 0.5)
+    visible_count = int(visible_mask.sum())
+    last_cull_stats.update(blocks_tested=len(positions), blocks_visible=visible_count,
+                           blocks_culled=len(positions) - visible_count)
+    return visible_mask
+
+
+def visible_blocks_in_chunks(world, frustum_planes, chunk_coords):
+    """
+    Returns the world positions (N, 3) of non-empty blocks inside the frustum, visiting only the
+    chunks that survive chunk culling, so the cost grows with visible chunks rather than world size.
+    """
+    positions = []
+    for chunk_coord in cull_chunks(frustum_planes, chunk_coords):
+        blocks = world.get_chunk(chunk_coord)
+        if blocks is None:
+            continue
+        local = np.argwhere(blocks)
+        if len(local):
+            positions.append(local + np.asarray(chunk_coord) * CHUNK_SIZE)
+    if not positions:
+        last_cull_stats.update(blocks_tested=0, blocks_visible=0, blocks_culled=0)
+        return np.empty((0, 3), dtype=np.int64)
+    positions = np.concatenate(positions)
+    return positions[cull_blocks(frustum_planes, positions)]
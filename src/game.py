@@ -2,88 +2,82 @@ import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from OpenGL.GL import glDeleteBuffers, glGetDoublev, glDeleteProgram, glDeleteVertexArrays # For VBO, matrix, shader/VAO cleanup & ops
+from OpenGL.GL import glDeleteBuffers, glDeleteProgram, glDeleteVertexArrays # For VBO, shader/VAO cleanup & ops
 import math
 from enum import Enum
-import numpy as np
 from .config import *
 from .block_type import BlockType, BLOCK_COLORS
 # from .assets import std_cube_vertices, std_cube_faces, face_normals, cube_edges, tex_coords # Removed, as these are used by rendering.py
-from .world_management import world_data, is_block_solid, generate_world
+from .world_management import world, world_light, is_block_solid, generate_world, light_world, get_surface_height, load_saved_chunks
 from .rendering import (load_main_texture_atlas, get_frustum_planes, is_block_in_frustum, 
-                        draw_wireframe_cube_at, draw_hotbar, draw_fps_counter, # draw_cube_at removed
-                        init_generic_cube_vbo, init_rendering_pipeline, draw_block_glsl) # Added VBO/Shader pipeline functions
+                        init_generic_cube_vbo, init_rendering_pipeline, draw_block_glsl, # Added VBO/Shader pipeline functions
+                        upload_chunk_mesh, draw_chunk_meshes, delete_chunk_mesh, delete_all_chunk_meshes, # Per-chunk mesh VBOs
+                        upload_chunk_instances, draw_chunk_instances, delete_chunk_instances, delete_all_chunk_instances) # Instanced blocks
+from .meshing import get_padded_chunk_blocks
+from .lighting import update_light, get_padded_chunk_light
+from .mesh_pool import MeshingPool, ChunkMeshJobs
+from .remesh_queue import ChunkRebuildQueue
+from .camera import Camera, view_rotation
+from .raycast import RaycastCache
+from .physics import move_and_collide
+from .culling import cull_chunks, last_cull_stats
+from .visibility import ChunkVisibilityGraph
+from .lod import ColumnLods, LOD_FACTORS
+from . import rendering
+from . import render_state
+from .chunked_world import CHUNK_SHIFT
+from .terrain import TerrainGenerator
+from .streaming import ChunkStreamer, build_mesh_job, build_instances_job
+from .region_storage import WorldStorage
+from .text import delete_all_glyph_atlases
+from .ui_renderer import UIBatchRenderer
+from .profiler import FrameProfiler
+from functools import partial
 
 # Note: std_cube_vertices etc. from assets are used by rendering functions.
 # The 'assets' import is correctly placed within rendering.py.
 
-def check_collision(player_center_pos, player_dims):
-    global world_data, WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH
-    player_half_dims = [d / 2 for d in player_dims]
-    player_min_c = [player_center_pos[i] - player_half_dims[i] for i in range(3)]
-    player_max_c = [player_center_pos[i] + player_half_dims[i] for i in range(3)]
-    min_bx = max(0, math.floor(player_min_c[0] - 0.01)); max_bx = min(WORLD_WIDTH - 1, math.ceil(player_max_c[0] +0.01)) 
-    min_by = max(0, math.floor(player_min_c[1] - 0.01)); max_by = min(WORLD_HEIGHT - 1, math.ceil(player_max_c[1] +0.01)) 
-    min_bz = max(0, math.floor(player_min_c[2] - 0.01)); max_bz = min(WORLD_DEPTH - 1, math.ceil(player_max_c[2] +0.01)) 
-    collided_block_y_top = -1
-    for bx in range(int(min_bx), int(max_bx) +1):
-        for by in range(int(min_by), int(max_by) + 1):
-            for bz in range(int(min_bz), int(max_bz) + 1):
-                if world_data[bx][by][bz] != BlockType.EMPTY.value:
-                    block_min_c = [bx - 0.5, by - 0.5, bz - 0.5]; block_max_c = [bx + 0.5, by + 0.5, bz + 0.5]
-                    collision_x = player_min_c[0] < block_max_c[0] and player_max_c[0] > block_min_c[0]
-                    collision_y = player_min_c[1] < block_max_c[1] and player_max_c[1] > block_min_c[1]
-                    collision_z = player_min_c[2] < block_max_c[2] and player_max_c[2] > block_min_c[2]
-                    if collision_x and collision_y and collision_z:
-                        if collision_y: collided_block_y_top = block_max_c[1]
-                        return True, collided_block_y_top 
-    return False, None
-
-def get_targeted_block(camera_pos, yaw, pitch, max_distance=5.0, step_size=0.05):
-    global world_data
-    rad_yaw = math.radians(yaw); rad_pitch = math.radians(pitch)
-    dx = -math.sin(rad_yaw) * math.cos(rad_pitch); dy = math.sin(rad_pitch); dz = -math.cos(rad_yaw) * math.cos(rad_pitch)
-    current_pos = list(camera_pos)
-    for _ in range(int(max_distance / step_size)):
-        prev = (int(current_pos[0] + 0.5), int(current_pos[1] + 0.5), int(current_pos[2] + 0.5))
-        current_pos[0] += dx*step_size; current_pos[1] += dy*step_size; current_pos[2] += dz*step_size
-        bx, by, bz = int(current_pos[0] + 0.5), int(current_pos[1] + 0.5), int(current_pos[2] + 0.5)
-        if not (0<=bx<WORLD_WIDTH and 0<=by<WORLD_HEIGHT and 0<=bz<WORLD_DEPTH): continue
-        if world_data[bx][by][bz] != BlockType.EMPTY.value:
-            if prev and (0<=prev[0]<WORLD_WIDTH and 0<=prev[1]<WORLD_HEIGHT and 0<=prev[2]<WORLD_DEPTH):
-                return ((bx,by,bz), prev)
-            return ((bx,by,bz), None)
-    return None
+_targeted_block_cache = RaycastCache()
+
+def get_targeted_block(camera_pos, yaw, pitch, max_distance=5.0):
+    """
+    Returns the RaycastHit (block, previous cell, face normal, distance) under the crosshair, or None.
+    Uses exact voxel traversal along the view direction; the result is reused while the camera
+    and the world are unchanged.
+    """
+    direction = tuple(-view_rotation(yaw, pitch)[2]) # The view matrix's forward (-Z) axis
+    return _targeted_block_cache.cast(world, tuple(camera_pos), direction, max_distance)
 
 # All rendering functions have been moved to src/rendering.py
 
 def main():
-    global world_data, current_selected_block_type 
+    global current_selected_block_type 
     pygame.init(); pygame.font.init() 
     clock = pygame.time.Clock() # Initialize Pygame Clock
     ui_font = pygame.font.Font(None, 24) 
     display_width, display_height = 800, 600
-    pygame.display.set_mode((display_width, display_height), DOUBLEBUF | OPENGL)
+    try:
+        pygame.display.set_mode((display_width, display_height), DOUBLEBUF | OPENGL, vsync=1 if VSYNC else 0)
+    except pygame.error as e: # Not every driver lets vsync be requested
+        print(f"VSync unavailable ({e}); continuing without it.")
+        pygame.display.set_mode((display_width, display_height), DOUBLEBUF | OPENGL)
     pygame.display.set_caption("Voxel Engine - Mouse Look Review") 
     glClearColor(0.5,0.7,1.0,1.0); glEnable(GL_DEPTH_TEST); glEnable(GL_CULL_FACE); glCullFace(GL_BACK); glShadeModel(GL_SMOOTH)
 
-    generate_world() # Initialize the world using the new function
+    # Saved worlds keep their seed; only edited chunks are stored, everything else is regenerated from it
+    storage = WorldStorage(SAVE_DIRECTORY, dtype=world.dtype, codec=SAVE_CODEC) if PERSIST_WORLD else None
+    world_seed = storage.level.get("seed", WORLD_SEED) if storage else WORLD_SEED
+    if storage: storage.save_level(seed=world_seed, world_height=WORLD_HEIGHT)
+
+    if not INFINITE_WORLD:
+        generate_world(seed=world_seed) # Fixed-size world, generated up front
+        if storage: load_saved_chunks(storage)
+        if RENDER_MODE != "instanced": light_world() # Instanced blocks are drawn unlit
 
-    player_inventory = { BlockType.DIRT.value: 50, BlockType.STONE.value: 30, BlockType.GRASS.value: 10, BlockType.WOOD.value: 5 }
-    hotbar_slots = [BlockType.GRASS, BlockType.DIRT, BlockType.STONE, BlockType.WOOD] 
+    player_inventory = { BlockType.DIRT.value: 50, BlockType.STONE.value: 30, BlockType.GRASS.value: 10, BlockType.WOOD.value: 5, BlockType.LAMP.value: 10 }
+    hotbar_slots = [BlockType.GRASS, BlockType.DIRT, BlockType.STONE, BlockType.WOOD, BlockType.LAMP] 
     current_hotbar_selection_index = 0; current_selected_block_type = hotbar_slots[0].value 
     
-    # ground_level is now internal to generate_world, but camera_pos needs it or an equivalent
-    # For camera positioning, let's assume ground_level is still relevant if needed,
-    # or adjust camera_pos based on a known spawn height from generate_world if it changes.
-    # The current camera_pos uses ground_level from config, which is fine if generate_world also uses it.
-    # Actually, ground_level was defined locally in main() before, and now implicitly in generate_world().
-    # For camera_pos, we need a consistent way to determine player spawn height.
-    # The current camera_pos uses `ground_level` which is now defined in `generate_world` and not directly here.
-    # Let's assume player spawns relative to WORLD_HEIGHT // 3 for now.
-    # This was: ground_level + PLAYER_AABB_DIMS[1]/2.0 + 1.0
-    # Let's make it: (WORLD_HEIGHT // 3) + PLAYER_AABB_DIMS[1]/2.0 + 1.0
-
     # Load the main texture atlas
     atlas_id_for_cleanup = load_main_texture_atlas()
     # The block_texture_ids dictionary and loop for individual textures are removed.
@@ -104,104 +98,223 @@ def main():
         if vao_id_for_cleanup: glDeleteVertexArrays(1, [vao_id_for_cleanup])
         pygame.quit()
         return # Or raise an exception
-    
-    glMatrixMode(GL_PROJECTION); gluPerspective(45, (display_width/display_height), 0.1, 100.0); glMatrixMode(GL_MODELVIEW)
-    camera_pos = [WORLD_WIDTH/2.0, (WORLD_HEIGHT // 3) + PLAYER_AABB_DIMS[1]/2.0 + 1.0, WORLD_DEPTH/2.0] 
-    camera_yaw, camera_pitch = 0.0, -30.0 
-    mouse_sensitivity, move_speed = 0.1, 0.1; player_vertical_velocity = 0.0
+
+    # Build one mesh (VBO) per chunk; only exposed faces are emitted. In instanced mode, each chunk
+    # instead gets a batch of per-block instance data drawn with the generic cube VBO.
+    # Edits later only mark chunks dirty; the queue hands them to worker processes (block copies go
+    # through shared memory) and the main thread only uploads the finished meshes.
+    # Every rebuild also refreshes the chunk's face connectivity in the visibility graph.
+    visibility = ChunkVisibilityGraph()
+    mesh_pool = MeshingPool(STREAMING_WORKERS)
+    spawn_x, spawn_z = WORLD_WIDTH // 2, WORLD_DEPTH // 2 # Spawn above the terrain surface at the world centre
+    saved_player = storage.level.get("player") if storage else None
+    if saved_player: spawn_x, spawn_z = saved_player["position"][0], saved_player["position"][2]
+    # Distant columns get meshes built from downsampled blocks (levels by distance from the camera)
+    lods = ColumnLods() if LOD_ENABLED and RENDER_MODE != "instanced" else None
+    if RENDER_MODE == "instanced":
+        build = build_instances_job; upload = upload_chunk_instances
+        light_map = None
+        draw_world = draw_chunk_instances; world_batches = rendering.chunk_instance_batches
+    else:
+        build = partial(build_mesh_job, greedy=GREEDY_MESHING, packed=PACKED_CHUNK_VERTICES); upload = upload_chunk_mesh
+        light_map = world_light # Sky and block light, baked into the meshes
+        draw_world = draw_chunk_meshes; world_batches = rendering.chunk_meshes
+    def rebuild_chunk(chunk_coord):
+        lod = lods.level((chunk_coord[0], chunk_coord[2])) if lods else 0
+        padded_light = get_padded_chunk_light(light_map, chunk_coord, padding=1 << lod) if light_map is not None else None
+        mesh_jobs.submit(chunk_coord, get_padded_chunk_blocks(world, chunk_coord, padding=1 << lod), padded_light, lod)
+    rebuild_queue = ChunkRebuildQueue(rebuild_chunk)
+    mesh_jobs = ChunkMeshJobs(mesh_pool, world, build, upload, rebuild_queue, visibility)
+    world_columns = sorted({(cx, cz) for cx, _, cz in world.loaded_chunk_coords()}) # Fixed worlds only
+    if lods: lods.update((spawn_x, 0, spawn_z), world_columns)
+    rebuild_queue.mark_many_dirty(world.loaded_chunk_coords())
+    rebuild_queue.drain(); mesh_jobs.wait() # Initial build is unbounded so the first frame is complete
+
+    streamer = None
+    if INFINITE_WORLD:
+        # Columns around the player are generated and meshed on worker processes; the main loop only uploads
+        def free_chunk_buffers(chunk_coord):
+            delete_chunk_mesh(chunk_coord); delete_chunk_instances(chunk_coord); visibility.discard(chunk_coord)
+            mesh_jobs.discard(chunk_coord)
+        streamer = ChunkStreamer(world, TerrainGenerator(world_seed, WORLD_HEIGHT), build, upload, free_chunk_buffers,
+                                 rebuild_queue, load_radius=RENDER_RADIUS_CHUNKS, unload_radius=UNLOAD_RADIUS_CHUNKS,
+                                 max_uploads_per_frame=STREAMING_MAX_UPLOADS, storage=storage,
+                                 light_map=light_map, visibility=visibility, lods=lods, pool=mesh_pool)
+    if streamer: streamer.load_around_sync((spawn_x, 0, spawn_z)) # Only the spawn area blocks; the rest streams in
+    if saved_player:
+        camera_pos = list(saved_player["position"]); camera_yaw, camera_pitch = saved_player["yaw"], saved_player["pitch"]
+    else:
+        camera_pos = [float(spawn_x), get_surface_height(spawn_x, spawn_z) + PLAYER_AABB_DIMS[1]/2.0 + 1.0, float(spawn_z)] 
+        camera_yaw, camera_pitch = 0.0, -30.0 
+    # Matrices and frustum planes are computed on the CPU and cached; GL matrix state is only written, never read back
+    camera = Camera(camera_pos, camera_yaw, camera_pitch, fov_y=45, aspect=display_width/display_height, near=0.1, far=100.0)
+    # HUD and selection outline go through a retained batch renderer with its own shader
+    ui_renderer = UIBatchRenderer(ui_font, display_width, display_height)
+    hud_text_refresh_ms = 250; last_hud_text_ms = -hud_text_refresh_ms
+    mouse_sensitivity = 0.1; player_vertical_velocity = 0.0
+    # Physics runs in fixed SIMULATION_DT ticks; rendering interpolates between the last two tick positions
+    previous_camera_pos = list(camera_pos); render_pos = list(camera_pos)
+    simulation_accumulator = 0.0; frame_ms = 0
     pygame.mouse.set_visible(False); pygame.event.set_grab(True)
     keys_pressed = {k:False for k in (pygame.K_w,pygame.K_s,pygame.K_a,pygame.K_d,pygame.K_SPACE)}
-    targeted_block_info = None; running = True
+    targeted_block_info = None; on_ground = False; running = True
+    # Per-stage frame timings; the scoped timers below are no-ops until it is enabled (F3)
+    profiler = FrameProfiler(history_frames=PROFILER_HISTORY_FRAMES, enabled=PROFILER_ENABLED)
+    last_autosave_ms = pygame.time.get_ticks()
     while running:
-        targeted_block_info = get_targeted_block(camera_pos, camera_yaw, camera_pitch)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: running = False
-            if event.type == pygame.MOUSEMOTION:
-                dx,dy=event.rel
-                camera_yaw += dx * mouse_sensitivity
-                camera_yaw %= 360.0 # Wrap yaw
-                camera_pitch += dy * mouse_sensitivity
-                camera_pitch = max(-90.0, min(90.0, camera_pitch)) # Clamp pitch
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE: running = False
-                if event.key in keys_pressed: keys_pressed[event.key] = True
-                if pygame.K_1 <= event.key <= pygame.K_4: 
-                    idx=event.key-pygame.K_1
-                    if idx < len(hotbar_slots): current_hotbar_selection_index=idx; current_selected_block_type=hotbar_slots[idx].value
-            if event.type == pygame.KEYUP:
-                if event.key in keys_pressed: keys_pressed[event.key] = False
-            if event.type == pygame.MOUSEBUTTONDOWN and targeted_block_info:
-                hit, prev = targeted_block_info
-                if event.button==1 and hit:
-                    hx,hy,hz=hit; rtv=world_data[hx][hy][hz]
-                    if rtv!=BlockType.EMPTY.value: world_data[hx][hy][hz]=BlockType.EMPTY.value; player_inventory[rtv]=player_inventory.get(rtv,0)+1
-                elif event.button==3 and prev:
-                    px,py,pz=prev
-                    if 0<=px<WORLD_WIDTH and 0<=py<WORLD_HEIGHT and 0<=pz<WORLD_DEPTH and world_data[px][py][pz]==BlockType.EMPTY.value:
-                        if player_inventory.get(current_selected_block_type,0)>0:
-                            world_data[px][py][pz]=current_selected_block_type; player_inventory[current_selected_block_type]-=1
+        profiler.begin_frame()
+        with profiler.stage("raycast"):
+            targeted_block_info = get_targeted_block(render_pos, camera_yaw, camera_pitch) # What the crosshair is on
+        with profiler.stage("input"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: running = False
+                if event.type == pygame.MOUSEMOTION:
+                    dx,dy=event.rel
+                    camera_yaw += dx * mouse_sensitivity
+                    camera_yaw %= 360.0 # Wrap yaw
+                    camera_pitch += dy * mouse_sensitivity
+                    camera_pitch = max(-90.0, min(90.0, camera_pitch)) # Clamp pitch
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE: running = False
+                    if event.key in keys_pressed: keys_pressed[event.key] = True
+                    if pygame.K_1 <= event.key <= pygame.K_9: 
+                        idx=event.key-pygame.K_1
+                        if idx < len(hotbar_slots): current_hotbar_selection_index=idx; current_selected_block_type=hotbar_slots[idx].value
+                    if event.key == pygame.K_F3: # Toggle per-stage timing and its overlay
+                        profiler.set_enabled(not profiler.enabled); last_hud_text_ms = -hud_text_refresh_ms
+                        if not profiler.enabled: ui_renderer.hide_frame_graph()
+                    if event.key == pygame.K_F4:
+                        csv_path = profiler.dump_csv(PROFILER_CSV_DIRECTORY)
+                        print(f"Frame profile written to {csv_path}" if csv_path else "No frame profile recorded yet (F3 starts recording)")
+                if event.type == pygame.KEYUP:
+                    if event.key in keys_pressed: keys_pressed[event.key] = False
+                if event.type == pygame.MOUSEBUTTONDOWN and targeted_block_info:
+                    hit, prev = targeted_block_info.block, targeted_block_info.previous; edited_block = None; old_value = BlockType.EMPTY.value
+                    if event.button==1 and hit:
+                        hx,hy,hz=hit; rtv=world.get_block(hx,hy,hz)
+                        if rtv!=BlockType.EMPTY.value: world.set_block(hx,hy,hz,BlockType.EMPTY.value); player_inventory[rtv]=player_inventory.get(rtv,0)+1; edited_block=hit; old_value=rtv
+                    elif event.button==3 and prev:
+                        px,py,pz=prev
+                        in_bounds = 0<=py<WORLD_HEIGHT and (INFINITE_WORLD or (0<=px<WORLD_WIDTH and 0<=pz<WORLD_DEPTH))
+                        if in_bounds and world.get_block(px,py,pz)==BlockType.EMPTY.value:
+                            if player_inventory.get(current_selected_block_type,0)>0:
+                                world.set_block(px,py,pz,current_selected_block_type); player_inventory[current_selected_block_type]-=1; edited_block=prev
+                    if edited_block:
+                        rebuild_queue.mark_block_dirty(*edited_block) # Edited chunk, plus neighbours across a border, edge or corner
+                        if light_map is not None: # Relight around the edit; every chunk whose light changed is remeshed
+                            rebuild_queue.mark_many_dirty(update_light(world, light_map, *edited_block, old_value, world.get_block(*edited_block)))
         
-        player_vertical_velocity -= GRAVITY
-        og_pos=[camera_pos[0],camera_pos[1]-PLAYER_AABB_DIMS[1]/2.0-0.01,camera_pos[2]]; iog,_=check_collision(og_pos,PLAYER_AABB_DIMS)
-        if keys_pressed[pygame.K_SPACE] and iog: player_vertical_velocity = JUMP_STRENGTH
-        ry=math.radians(camera_yaw); fvx_=-math.sin(ry); fvz_=-math.cos(ry); svx_=math.cos(ry); svz_=math.sin(ry)
-        dph_=[0,0]
-        if keys_pressed[pygame.K_w]: dph_[0]+=fvx_; dph_[1]+=fvz_
-        if keys_pressed[pygame.K_s]: dph_[0]-=fvx_; dph_[1]-=fvz_
-        if keys_pressed[pygame.K_a]: dph_[0]-=svx_; dph_[1]-=svz_
-        if keys_pressed[pygame.K_d]: dph_[0]+=svx_; dph_[1]+=svz_
-        nrm=math.sqrt(dph_[0]**2+dph_[1]**2)
-        if nrm>0: dph_[0]=(dph_[0]/nrm)*move_speed; dph_[1]=(dph_[1]/nrm)*move_speed
-        cp_=list(camera_pos); npd_=[cp_[0]+dph_[0], cp_[1]+player_vertical_velocity, cp_[2]+dph_[1]]; anp_=list(cp_)
-        tmpx_=[npd_[0],cp_[1],cp_[2]]; cx_,_=check_collision(tmpx_,PLAYER_AABB_DIMS)
-        if not cx_: anp_[0]=npd_[0]
-        tmpy_=[anp_[0],npd_[1],cp_[2]]; cy_,cby_=check_collision(tmpy_,PLAYER_AABB_DIMS)
-        if not cy_: anp_[1]=npd_[1]
-        else:
-            if player_vertical_velocity<0: player_vertical_velocity=0; anp_[1]=(cby_ if cby_ is not None else round(cp_[1]-PLAYER_AABB_DIMS[1]/2.0)+PLAYER_AABB_DIMS[1]/2.0)+PLAYER_AABB_DIMS[1]/2.0+0.001
-            elif player_vertical_velocity>0: player_vertical_velocity=0
-        tmpz_=[anp_[0],anp_[1],npd_[2]]; cz_,_=check_collision(tmpz_,PLAYER_AABB_DIMS)
-        if not cz_: anp_[2]=npd_[2]
-        camera_pos=anp_
+        with profiler.stage("physics"):
+            # Consume the real time since the last frame in fixed ticks, so physics speed and cost don't depend on FPS
+            simulation_accumulator = min(simulation_accumulator + frame_ms / 1000.0, MAX_SIMULATION_STEPS * SIMULATION_DT)
+            # Horizontal basis matching the view matrix: yaw 0 looks down -Z, yaw 90 down +X
+            ry=math.radians(camera_yaw); fvx_=math.sin(ry); fvz_=-math.cos(ry); svx_=math.cos(ry); svz_=math.sin(ry)
+            dph_=[0,0]
+            if keys_pressed[pygame.K_w]: dph_[0]+=fvx_; dph_[1]+=fvz_
+            if keys_pressed[pygame.K_s]: dph_[0]-=fvx_; dph_[1]-=fvz_
+            if keys_pressed[pygame.K_a]: dph_[0]-=svx_; dph_[1]-=svz_
+            if keys_pressed[pygame.K_d]: dph_[0]+=svx_; dph_[1]+=svz_
+            nrm=math.sqrt(dph_[0]**2+dph_[1]**2)
+            if nrm>0: dph_[0]=(dph_[0]/nrm)*PLAYER_MOVE_SPEED; dph_[1]=(dph_[1]/nrm)*PLAYER_MOVE_SPEED
+            while simulation_accumulator >= SIMULATION_DT:
+                previous_camera_pos = camera_pos
+                player_vertical_velocity -= GRAVITY
+                if keys_pressed[pygame.K_SPACE] and on_ground: player_vertical_velocity = JUMP_STRENGTH
+                # One swept-AABB resolve per tick: position, velocity and contact flags in a single call
+                collision = move_and_collide(world, camera_pos, (dph_[0], player_vertical_velocity, dph_[1]), PLAYER_AABB_DIMS)
+                camera_pos = collision.position
+                player_vertical_velocity = collision.velocity[1]
+                on_ground = collision.on_ground
+                simulation_accumulator -= SIMULATION_DT
+            # Render where the player is between the last two ticks; the view lags the simulation by under one tick
+            alpha = simulation_accumulator / SIMULATION_DT
+            render_pos = [p + (c - p) * alpha for p, c in zip(previous_camera_pos, camera_pos)]
             
-        glLoadIdentity(); glRotatef(camera_pitch,1,0,0); glRotatef(camera_yaw,0,1,0); glTranslatef(-camera_pos[0],-camera_pos[1],-camera_pos[2])
-        
-        # Get frustum planes for culling
-        frustum_planes = get_frustum_planes() # This still uses fixed-function matrix state
-        
-        # Get current matrices for shader-based rendering
-        # glGetDoublev returns column-major matrices, which GLSL mat * vec expects. No transpose needed.
-        projection_matrix = np.array(glGetDoublev(GL_PROJECTION_MATRIX), dtype=np.float32)
-        view_matrix = np.array(glGetDoublev(GL_MODELVIEW_MATRIX), dtype=np.float32)
-
-        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
-        for x in range(WORLD_WIDTH):
-            for y in range(WORLD_HEIGHT):
-                for z in range(WORLD_DEPTH):
-                    block_type_value = world_data[x][y][z]
-                    if block_type_value != BlockType.EMPTY.value:
-                        if is_block_in_frustum(x, y, z, frustum_planes): # Frustum culling re-enabled
-                            current_block_type_enum = BlockType(block_type_value)
-                            draw_block_glsl(x, y, z, current_block_type_enum, view_matrix, projection_matrix)
-        
-        # Old wireframe and UI still use immediate mode logic for now
-        if targeted_block_info and targeted_block_info[0]: draw_wireframe_cube_at(*targeted_block_info[0])
-        draw_hotbar(display_width,display_height,ui_font,hotbar_slots,player_inventory,current_hotbar_selection_index)
-        
-        # Calculate and draw FPS
-        clock.tick() 
-        fps = clock.get_fps()
-        draw_fps_counter(fps, ui_font, display_width, display_height)
+        with profiler.stage("streaming"):
+            # Hand edited chunks to the background writer now and then; the copy is all the main thread does
+            if storage and pygame.time.get_ticks() - last_autosave_ms >= AUTOSAVE_INTERVAL_S * 1000.0:
+                storage.save_dirty(world); last_autosave_ms = pygame.time.get_ticks()
+
+            # Integrate streamed columns and queue new ones around the camera, within the frame budget
+            if streamer: streamer.update(camera_pos, STREAMING_BUDGET_MS / 1000.0)
+            elif lods:
+                # Fixed worlds remesh columns whose LOD level changed through the rebuild queue
+                for cx, cz in lods.update(camera_pos, world_columns):
+                    rebuild_queue.mark_many_dirty([(cx, cy, cz) for cy in range(math.ceil(WORLD_HEIGHT / CHUNK_SIZE))])
+
+            # Hand dirty chunks to the meshing workers, nearest to the camera first, and upload finished ones
+            if len(rebuild_queue):
+                camera_chunk = tuple(int(math.floor(c + 0.5)) >> CHUNK_SHIFT for c in camera_pos)
+                rebuild_queue.drain(REMESH_BUDGET_MS / 1000.0, priority_point=camera_chunk)
+            if len(mesh_jobs): mesh_jobs.collect(REMESH_BUDGET_MS / 1000.0)
+
+        with profiler.stage("culling"):
+            # Matrices are only recomputed when the camera actually moved or turned
+            camera.set_pose(render_pos, camera_yaw, camera_pitch)
+            view_matrix = camera.view_matrix
+            projection_matrix = camera.projection_matrix
+            frustum_planes = camera.frustum_planes
+            # Walk the chunk visibility graph from the camera through the frustum, so chunks hidden behind
+            # terrain are skipped; without it, test every chunk's bounds against the frustum in one batch
+            if OCCLUSION_CULLING:
+                visible_chunks = visibility.visible_chunks(render_pos, frustum_planes, world_batches.keys())
+            else:
+                visible_chunks = cull_chunks(frustum_planes, world_batches.keys())
+
+        with profiler.stage("world_draw"):
+            # View, projection and lighting go to the GPU once per frame (and not at all while the camera is still)
+            render_state.update_frame_constants(view_matrix, projection_matrix, LIGHT_DIRECTION, AMBIENT_LIGHT_STRENGTH)
+            glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+            draw_world(view_matrix, projection_matrix, visible_chunks) # One draw call per chunk mesh / instance batch
+            if targeted_block_info: ui_renderer.draw_block_outline(targeted_block_info.block, view_matrix, projection_matrix)
+
+        with profiler.stage("ui"):
+            # HUD sections are only rebuilt when their inputs change; counters refresh a few times a second
+            ui_renderer.update_hotbar(hotbar_slots, player_inventory, current_hotbar_selection_index)
+            if pygame.time.get_ticks() - last_hud_text_ms >= hud_text_refresh_ms:
+                last_hud_text_ms = pygame.time.get_ticks()
+                mesh_triangles, mesh_bytes = rendering.chunk_mesh_stats()
+                lod_levels = list(lods.levels.values()) if lods else []
+                lod_text = f", columns per LOD {'/'.join(str(lod_levels.count(level)) for level in range(len(LOD_FACTORS)))}" if lods else ""
+                ui_renderer.update_text_lines(
+                    [f"FPS: {clock.get_fps():.0f}",
+                     f"Chunks: {last_cull_stats['chunks_visible']} visible / {last_cull_stats['chunks_culled']} culled"
+                     f" / {last_cull_stats['chunks_occluded']} occluded"]
+                    + ([f"Streaming: {len(streamer.meshed)} columns, {streamer.pending_count()} jobs"] if streamer else [])
+                    + ([f"Meshes: {mesh_triangles / 1000:.0f}k triangles, {mesh_bytes / 2**20:.1f} MB{lod_text}"]
+                       if RENDER_MODE != "instanced" else [])
+                    + [f"GL state: {sum(c['skipped'] for c in render_state.state_stats.values())} skipped / "
+                       f"{sum(c['issued'] for c in render_state.state_stats.values())} issued"]
+                    + (profiler.summary_lines() if profiler.enabled else []))
+                render_state.reset_stats() # Counts cover one refresh interval
+                if profiler.enabled: ui_renderer.update_frame_graph(profiler.frame_times_ms(), PROFILER_FRAME_BUDGET_MS)
+            ui_renderer.draw_hud()
         
-        pygame.display.flip() # pygame.time.wait(10) removed
+        with profiler.stage("swap"):
+            pygame.display.flip() # Blocks for the display refresh with VSYNC
+            frame_ms = clock.tick(FRAME_RATE_CAP) # Sleeps off the rest of the frame when capped; 0 means no cap
+        profiler.end_frame()
     
+    if streamer: streamer.shutdown()
+    mesh_jobs.shutdown(); mesh_pool.shutdown()
+    if storage:
+        storage.save_dirty(world)
+        storage.save_level(player={"position": [float(c) for c in camera_pos], "yaw": camera_yaw, "pitch": camera_pitch})
+        storage.close() # Waits for the writer to finish
+
     # Cleanup loaded textures
     if atlas_id_for_cleanup:
         glDeleteTextures(1, [atlas_id_for_cleanup])
     
-    # Cleanup VBO
+    ui_renderer.delete()
+    delete_all_glyph_atlases()
+
+    # Cleanup VBOs
+    delete_all_chunk_meshes()
+    delete_all_chunk_instances()
     if vbo_id_for_cleanup:
         glDeleteBuffers(1, [vbo_id_for_cleanup])
+    render_state.delete_frame_constants_buffer()
     
     # Cleanup Shader Program and VAO
     if shader_program_id_for_cleanup:
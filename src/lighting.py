@@ -0,0 +1,254 @@
+import numpy as np
+
+from .block_type import BlockType
+from .chunked_world import CHUNK_SIZE, CHUNK_SHIFT, chunk_origin
+from .config import WORLD_HEIGHT
+
+# Light levels run from 0 (dark) to MAX_LIGHT and drop by one per block travelled, so light
+# reaches at most MAX_LIGHT blocks from its source. Sky light at MAX_LIGHT also travels straight
+# down without loss, lighting everything open to the sky.
+#
+# Both channels are stored per cell as one byte in a ChunkedWorld, sky light in the high nibble
+# and block light in the low nibble (4 KiB per chunk for both).
+MAX_LIGHT = 15
+FULL_SKY = MAX_LIGHT << 4 # Packed value of a cell under the open sky without block light
+
+# Block light emitted by each block type value; every other block emits nothing
+BLOCK_LIGHT_EMISSION = {
+    BlockType.LAMP.value: 14,
+}
+
+# Brightness factor per light level, baked into mesh vertices
+LIGHT_LEVEL_FACTORS = (0.8 ** (MAX_LIGHT - np.arange(MAX_LIGHT + 1))).astype(np.float32)
+
+# Lookup tables indexed by block value (uint8 and uint16 worlds)
+_EMISSION = np.zeros(1 << 16, dtype=np.uint8)
+for _block_value, _level in BLOCK_LIGHT_EMISSION.items():
+    _EMISSION[_block_value] = _level
+_TRANSPARENT = np.zeros(1 << 16, dtype=bool) # Only EMPTY lets light through
+_TRANSPARENT[BlockType.EMPTY.value] = True
+
+_FACE_OFFSETS = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+
+
+def column_top(world_height=WORLD_HEIGHT):
+    """Top of the lit volume: world_height rounded up to whole chunks. Everything above is open sky."""
+    return -(-world_height // CHUNK_SIZE) * CHUNK_SIZE
+
+LIGHT_COLUMN_TOP = column_top()
+
+
+def _neighbour_offsets(shape):
+    """Flat index offsets of the six face neighbours in a C-ordered array, and the offset of the one below."""
+    stride_x, stride_y = shape[1] * shape[2], shape[2]
+    return (stride_x, -stride_x, stride_y, -stride_y, 1, -1), -stride_y
+
+
+# --- Flood fill on flat arrays ---
+#
+# Queues are NumPy arrays of flat cell indices, processed a whole BFS level at a time. Arrays carry
+# a one-cell frame that is never passable, so the neighbours of queued cells are always in bounds.
+
+def _propagate(light, passable, frontier, offsets, down_offset=None):
+    """
+    Spreads light outward from the frontier cells into passable cells that are darker than
+    the light arriving there.
+
+    Args:
+        light (np.ndarray): Flat uint8 light levels of one channel, updated in place.
+        passable (np.ndarray): Flat bool array; cells light may be written into.
+        frontier (np.ndarray): Flat indices of the source cells.
+        offsets (tuple): Neighbour offsets (see _neighbour_offsets).
+        down_offset (int, optional): For sky light: full light keeps its level going down.
+    """
+    frontier = np.asarray(frontier, dtype=np.intp)
+    while frontier.size:
+        values = light[frontier].astype(np.int16)
+        reached = []
+        for offset in offsets:
+            neighbours = frontier + offset
+            arriving = values - 1
+            if offset == down_offset:
+                arriving = np.where(values == MAX_LIGHT, MAX_LIGHT, arriving)
+            brighter = passable[neighbours] & (light[neighbours] < arriving)
+            if brighter.any():
+                neighbours = neighbours[brighter]
+                np.maximum.at(light, neighbours, arriving[brighter].astype(light.dtype))
+                reached.append(neighbours)
+        frontier = np.unique(np.concatenate(reached)) if reached else frontier[:0]
+
+def _remove(light, passable, starts, offsets, down_offset=None):
+    """
+    Darkens the start cells and every cell whose light came through them. Lit cells bordering the
+    darkened area that have light of their own are returned as seeds to propagate from again.
+
+    Returns:
+        np.ndarray: Flat indices of the cells to re-propagate from.
+    """
+    frontier = np.asarray(starts, dtype=np.intp)
+    values = light[frontier].astype(np.int16)
+    light[frontier] = 0
+    reseed = [frontier[:0]]
+    while frontier.size:
+        next_cells, next_values = [], []
+        for offset in offsets:
+            neighbours = frontier + offset
+            levels = light[neighbours].astype(np.int16)
+            lit = levels > 0
+            dependent = levels < values
+            if offset == down_offset:
+                dependent |= (values == MAX_LIGHT) & (levels == MAX_LIGHT)
+            dependent &= lit & passable[neighbours]
+            reseed.append(neighbours[lit & ~dependent])
+            if dependent.any():
+                cells = neighbours[dependent]
+                next_values.append(levels[dependent])
+                light[cells] = 0
+                next_cells.append(cells)
+        if not next_cells:
+            break
+        frontier, values = np.concatenate(next_cells), np.concatenate(next_values)
+    reseed = np.unique(np.concatenate(reseed))
+    return reseed[light[reseed] > 0]
+
+
+# --- Whole regions ---
+
+def compute_light(blocks):
+    """
+    Computes sky and block light for a block region from scratch. Cells outside the region count
+    as opaque, so light near its sides is only exact at least MAX_LIGHT + 1 blocks inside.
+
+    Args:
+        blocks (np.ndarray): (X, Y, Z) block values; the top of the region is open to the sky.
+
+    Returns:
+        np.ndarray: (X, Y, Z) uint8 packed light (sky << 4 | block).
+    """
+    transparent = _TRANSPARENT[blocks]
+    passable = np.pad(transparent, 1, constant_values=False)
+    offsets, down_offset = _neighbour_offsets(passable.shape)
+    passable = passable.reshape(-1)
+
+    # Cells with nothing opaque above them get full sky light; it then spreads under overhangs
+    covered = np.maximum.accumulate(~transparent[:, ::-1, :], axis=1)[:, ::-1, :]
+    sky = np.pad(np.where(covered, 0, MAX_LIGHT).astype(np.uint8), 1).reshape(-1)
+    _propagate(sky, passable, np.flatnonzero(sky), offsets, down_offset)
+
+    block = np.pad(_EMISSION[blocks], 1).reshape(-1)
+    _propagate(block, passable, np.flatnonzero(block), offsets)
+
+    shape = tuple(s + 2 for s in blocks.shape)
+    inner = (slice(1, -1),) * 3
+    return (sky.reshape(shape)[inner] << 4) | block.reshape(shape)[inner]
+
+def column_light_region(world, column, world_top=LIGHT_COLUMN_TOP):
+    """
+    Copies the blocks a chunk column's light depends on: the column and its 8 neighbours,
+    from y = -1 to world_top inclusive (one layer of padding below and above).
+
+    Returns:
+        np.ndarray: (3 * CHUNK_SIZE, world_top + 2, 3 * CHUNK_SIZE) block values.
+    """
+    ox, _, oz = chunk_origin((column[0], 0, column[1]))
+    return world.get_region(ox - CHUNK_SIZE, -1, oz - CHUNK_SIZE, ox + 2 * CHUNK_SIZE, world_top + 1, oz + 2 * CHUNK_SIZE)
+
+def compute_column_light(region_blocks):
+    """
+    Light of a column region from column_light_region, aligned with it. The layer below the
+    world stays dark. Light travels at most MAX_LIGHT blocks, so the 8 neighbour columns hold
+    every source that can reach the centre column and the cells bordering it.
+    """
+    return np.pad(compute_light(region_blocks[:, 1:, :]), ((0, 0), (1, 0), (0, 0)))
+
+def light_column(world, light_map, column, world_top=LIGHT_COLUMN_TOP):
+    """
+    Computes and stores the light of one chunk column.
+
+    Returns:
+        np.ndarray: The packed light of the whole 3x3 column region (see column_light_region).
+    """
+    region_light = compute_column_light(column_light_region(world, column, world_top))
+    store_column_light(light_map, column, region_light)
+    return region_light
+
+def store_column_light(light_map, column, region_light):
+    """Writes the centre column of a 3x3 region's light (see column_light_region) into the light map."""
+    ox, _, oz = chunk_origin((column[0], 0, column[1]))
+    light_map.set_region(ox, 0, oz, region_light[CHUNK_SIZE:2 * CHUNK_SIZE, 1:-1, CHUNK_SIZE:2 * CHUNK_SIZE])
+
+def unload_column_light(light_map, column, world_top=LIGHT_COLUMN_TOP):
+    for cy in range(world_top >> CHUNK_SHIFT):
+        light_map.unload_chunk((column[0], cy, column[1]))
+
+
+def get_padded_chunk_light(light_map, chunk_coord, world_top=LIGHT_COLUMN_TOP, padding=1):
+    """Packed light of a chunk plus a border, like meshing.get_padded_chunk_blocks. Above world_top is open sky."""
+    ox, oy, oz = chunk_origin(chunk_coord)
+    padded = light_map.get_region(ox - padding, oy - padding, oz - padding,
+                                  ox + CHUNK_SIZE + padding, oy + CHUNK_SIZE + padding, oz + CHUNK_SIZE + padding)
+    above = max(0, world_top - (oy - padding))
+    padded[:, above:, :] = FULL_SKY
+    return padded
+
+
+# --- Incremental updates ---
+
+def update_light(world, light_map, x, y, z, old_value, new_value, world_top=LIGHT_COLUMN_TOP):
+    """
+    Updates the light around block (x, y, z) after it changed from old_value to new_value
+    (the world must already hold new_value).
+
+    Placing an opaque block or removing an emitter darkens the light that depended on the cell
+    and re-propagates from the lit cells around the darkened area; opening a cell or placing an
+    emitter propagates into it. Only the box that light from the cell can reach is read and
+    written: MAX_LIGHT blocks to each side and the full height (sky light falls any distance).
+
+    Returns:
+        set: Chunk coordinates whose meshes are affected (chunks with changed light and their neighbours).
+    """
+    reach = MAX_LIGHT + 1 # One layer beyond the writable box feeds light in but is never changed
+    x0, y0, z0 = x - reach, -1, z - reach
+    x1, y1, z1 = x + reach + 1, world_top + 1, z + reach + 1
+    blocks = world.get_region(x0, y0, z0, x1, y1, z1)
+    packed = light_map.get_region(x0, y0, z0, x1, y1, z1)
+    packed[:, -1, :] = FULL_SKY # Above the world
+    packed[:, 0, :] = 0 # Below the world
+
+    writable = np.zeros(blocks.shape, dtype=bool)
+    writable[1:-1, 1:-1, 1:-1] = True
+    passable = np.pad(_TRANSPARENT[blocks] & writable, 1, constant_values=False)
+    offsets, down_offset = _neighbour_offsets(passable.shape)
+    passable = passable.reshape(-1)
+    edited = np.ravel_multi_index((x - x0 + 1, y - y0 + 1, z - z0 + 1), tuple(s + 2 for s in blocks.shape))
+    around = np.array([edited + offset for offset in offsets], dtype=np.intp)
+
+    channels = {'sky': np.pad(packed >> 4, 1).reshape(-1), 'block': np.pad(packed & MAX_LIGHT, 1).reshape(-1)}
+    for name, light in channels.items():
+        down = down_offset if name == 'sky' else None
+        seeds = [around[:0]]
+        if not _TRANSPARENT[new_value] or (name == 'block' and _EMISSION[old_value]):
+            seeds.append(_remove(light, passable, [edited], offsets, down))
+        if name == 'block' and _EMISSION[new_value]:
+            light[edited] = _EMISSION[new_value]
+            seeds.append(np.array([edited], dtype=np.intp))
+        if _TRANSPARENT[new_value]:
+            seeds.append(around[light[around] > 0]) # Light flows into the opened cell
+        _propagate(light, passable, np.unique(np.concatenate(seeds)), offsets, down)
+
+    padded_shape = tuple(s + 2 for s in blocks.shape)
+    inner = (slice(2, -2),) * 3 # Skip the padding frame and the read-only layer
+    updated = (channels['sky'].reshape(padded_shape)[inner] << 4) | channels['block'].reshape(padded_shape)[inner]
+    previous = packed[1:-1, 1:-1, 1:-1]
+    changed = np.argwhere(updated != previous)
+    if not len(changed):
+        return set()
+    light_map.set_region(x0 + 1, y0 + 1, z0 + 1, updated)
+
+    # Faces take their light from the cell in front of them, so neighbours of changed cells are affected too
+    changed += (x0 + 1, y0 + 1, z0 + 1)
+    affected = set()
+    for offset in ((0, 0, 0),) + _FACE_OFFSETS:
+        coords = np.unique((changed + offset) >> CHUNK_SHIFT, axis=0)
+        affected.update((int(cx), int(cy), int(cz)) for cx, cy, cz in coords if 0 <= cy < (world_top >> CHUNK_SHIFT))
+    return affected
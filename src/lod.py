@@ -0,0 +1,84 @@
+import math
+
+from .chunked_world import CHUNK_SIZE
+from .config import LOD_DISTANCES_CHUNKS, LOD_HYSTERESIS_CHUNKS
+
+# LOD level n meshes a chunk from blocks downsampled by 2 ** n (see meshing.mesh_lod_padded_blocks)
+LOD_FACTORS = tuple(1 << level for level in range(len(LOD_DISTANCES_CHUNKS) + 1))
+
+
+def select_lod_level(distance, current=None, distances=LOD_DISTANCES_CHUNKS, hysteresis=LOD_HYSTERESIS_CHUNKS):
+    """
+    Picks the LOD level for a column `distance` chunks from the camera. Level n starts at
+    distances[n - 1]. Starting from the current level, a threshold has to be passed by
+    `hysteresis` chunks before the level changes, so a camera hovering around a threshold
+    doesn't make meshes flip back and forth.
+
+    Args:
+        current (int, optional): Level the column has now; None picks the level without hysteresis.
+    """
+    if current is None:
+        return sum(1 for threshold in distances if distance >= threshold)
+    level = current
+    while level < len(distances) and distance >= distances[level] + hysteresis:
+        level += 1
+    while level > 0 and distance < distances[level - 1] - hysteresis:
+        level -= 1
+    return level
+
+
+def column_distance(camera_pos, column):
+    """Horizontal distance in chunks from a world position to the centre of chunk column (cx, cz)."""
+    centre_x = column[0] * CHUNK_SIZE + (CHUNK_SIZE - 1) / 2.0 # Blocks are centred on integers
+    centre_z = column[1] * CHUNK_SIZE + (CHUNK_SIZE - 1) / 2.0
+    return math.hypot(camera_pos[0] - centre_x, camera_pos[2] - centre_z) / CHUNK_SIZE
+
+
+class ColumnLods:
+    """
+    LOD level of each chunk column, by horizontal distance from the camera. All chunks of a
+    column share its level, so LOD seams only run along vertical chunk sides.
+    """
+
+    def __init__(self, distances=LOD_DISTANCES_CHUNKS, hysteresis=LOD_HYSTERESIS_CHUNKS, min_move=1.0):
+        """
+        Args:
+            distances (tuple): Distance in chunks where each coarser level starts.
+            hysteresis (float): Distance in chunks a threshold must be passed by before a level changes.
+            min_move (float): Blocks the camera must move before levels are re-evaluated.
+        """
+        self.distances = tuple(distances)
+        self.hysteresis = hysteresis
+        self.min_move = min_move
+        self.levels = {} # column -> LOD level
+        self._last_pos = None
+
+    def level(self, column):
+        return self.levels.get(column, 0)
+
+    def discard(self, column):
+        self.levels.pop(column, None)
+
+    def update(self, camera_pos, columns):
+        """
+        Re-evaluates the levels of the given columns for a camera position. Columns seen for the
+        first time just get their level.
+
+        Returns:
+            list: Columns whose level changed.
+        """
+        changed = []
+        moved = self._last_pos is None or math.hypot(camera_pos[0] - self._last_pos[0],
+                                                     camera_pos[2] - self._last_pos[1]) >= self.min_move
+        for column in columns:
+            current = self.levels.get(column)
+            if current is not None and not moved:
+                continue
+            level = select_lod_level(column_distance(camera_pos, column), current, self.distances, self.hysteresis)
+            if level != current:
+                self.levels[column] = level
+                if current is not None:
+                    changed.append(column)
+        if moved:
+            self._last_pos = (camera_pos[0], camera_pos[2])
+        return changed
@@ -0,0 +1,245 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .visibility import face_connectivity
+
+# Picklable handle of a NumPy array living in a shared memory block
+SharedArrayRef = namedtuple('SharedArrayRef', ('name', 'shape', 'dtype'))
+
+
+# --- Moving arrays through shared memory ---
+#
+# Jobs take and return ordinary NumPy arrays (possibly inside tuples, lists and dicts). On the way
+# to a worker each array is copied into a new shared memory block and replaced by a SharedArrayRef,
+# and the worker does the same with the arrays it returns, so only the small refs are pickled.
+# Blocks are unlinked by the main process once it is done with a job (see SharedJob.release).
+
+def share_array(array, blocks):
+    """Copies an array into a new shared memory block (appended to `blocks`) and returns its ref."""
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes)) # Zero-size blocks are not allowed
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    blocks.append(block)
+    return SharedArrayRef(block.name, array.shape, array.dtype.str)
+
+def open_shared_array(ref, blocks):
+    """Maps the array behind a ref (its block is appended to `blocks`). The result is a view, not a copy."""
+    block = shared_memory.SharedMemory(name=ref.name)
+    blocks.append(block)
+    return np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=block.buf)
+
+def _convert(value, convert_array, blocks):
+    """Applies convert_array to every array (or ref) inside nested tuples, lists and dicts."""
+    if isinstance(value, (np.ndarray, SharedArrayRef)):
+        return convert_array(value, blocks)
+    if isinstance(value, dict):
+        return {key: _convert(item, convert_array, blocks) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_convert(item, convert_array, blocks) for item in value)
+    return value
+
+def _share_value(value, blocks):
+    return _convert(value, lambda array, blocks: share_array(array, blocks) if isinstance(array, np.ndarray) else array, blocks)
+
+def _open_value(value, blocks):
+    return _convert(value, lambda ref, blocks: open_shared_array(ref, blocks) if isinstance(ref, SharedArrayRef) else ref, blocks)
+
+def _close_blocks(blocks, unlink=False):
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass # A view is still alive somewhere; the mapping goes away with it
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+    blocks.clear()
+
+def _run_shared(fn, args, kwargs):
+    """Worker entry point: maps the shared inputs, runs fn and returns its arrays through new shared blocks."""
+    inputs, outputs = [], []
+    try:
+        args, kwargs = _open_value((args, kwargs), inputs)
+        result = _share_value(fn(*args, **kwargs), outputs)
+        _close_blocks(outputs) # The main process maps (and later unlinks) them by name
+        return result
+    except BaseException:
+        _close_blocks(outputs, unlink=True)
+        raise
+    finally:
+        del args, kwargs
+        _close_blocks(inputs)
+
+
+class SharedJob:
+    """A job on a MeshingPool. Holds the shared blocks of its inputs and, once read, of its result."""
+
+    def __init__(self, future, input_blocks):
+        self.future = future
+        self._inputs = input_blocks
+        self._outputs = []
+        self._opened = False
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """The job's return value with arrays as views into shared memory; valid until release()."""
+        self._opened = True
+        return _open_value(self.future.result(), self._outputs)
+
+    def release(self):
+        """Unlinks the job's shared blocks (the job must be done). Arrays from result() must not be used afterwards."""
+        future = self.future
+        if not self._opened and not future.cancelled() and future.exception() is None:
+            self.result() # Result never read (e.g. went stale); map it only to find its blocks
+        _close_blocks(self._outputs, unlink=True)
+        _close_blocks(self._inputs, unlink=True)
+
+    def discard(self):
+        """Drops the job: cancels it if it hasn't started, and frees its blocks whenever it ends."""
+        self.future.cancel()
+        self.future.add_done_callback(lambda future: self.release())
+
+
+class MeshingPool:
+    """
+    Worker processes for meshing. submit() passes arrays through shared memory in both directions
+    (see SharedJob); `executor` takes ordinary pickled jobs.
+    """
+
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (int, optional): Worker processes; defaults to one less than the CPU count (min 1).
+        """
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        self.workers = max(1, workers)
+        # Workers must share the main process's tracker of shared memory blocks; one they started
+        # themselves would "clean up" blocks the main process unlinks (or still uses) when they exit
+        resource_tracker.ensure_running()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) on a worker. Returns a SharedJob; release() it when done with the result."""
+        inputs = []
+        args, kwargs = _share_value((args, kwargs), inputs)
+        return SharedJob(self.executor.submit(_run_shared, fn, args, kwargs), inputs)
+
+    def shutdown(self):
+        """Stops the workers, dropping queued jobs (running ones finish first)."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# --- Rebuilding single chunks ---
+
+def chunk_neighbourhood(chunk_coord):
+    """The chunk and its 26 neighbours, i.e. every chunk a padded copy of it reads from."""
+    cx, cy, cz = chunk_coord
+    return [(cx + dx, cy + dy, cz + dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+def neighbourhood_revision_stamp(world, chunk_coord):
+    return tuple(world.chunk_revision(c) for c in chunk_neighbourhood(chunk_coord))
+
+def _build_chunk_job(build_mesh, chunk_coord, padded_blocks, padded_light, lod):
+    """Mesh data and face connectivity of one chunk from a padded copy with a border of 2 ** lod blocks."""
+    padding = 1 << lod
+    data = build_mesh(padded_blocks, chunk_coord, padded_light=padded_light, lod=lod)
+    return data, face_connectivity(padded_blocks[(slice(padding, -padding),) * 3])
+
+
+class ChunkMeshJobs:
+    """
+    Chunk rebuilds (edits, LOD changes, the initial build of fixed worlds) run on a MeshingPool;
+    collect() uploads the finished ones on the main thread.
+
+    Each job is stamped with the revisions of every chunk it read. A result whose chunks changed
+    meanwhile is dropped and the chunk queued on the rebuild queue again; a chunk submitted again
+    while its job is pending replaces that job.
+    """
+
+    def __init__(self, pool, world, build_mesh, upload_mesh, rebuild_queue=None, visibility=None):
+        """
+        Args:
+            pool (MeshingPool): Where the jobs run.
+            world (ChunkedWorld): Source of the revision stamps.
+            build_mesh (callable): Picklable build_mesh(padded_blocks, chunk_coord, padded_light=None, lod=0) -> data.
+            upload_mesh (callable): upload_mesh(chunk_coord, data), called on the main thread.
+            rebuild_queue (ChunkRebuildQueue, optional): Receives chunks whose result went stale.
+            visibility (ChunkVisibilityGraph, optional): Receives each chunk's face connectivity.
+        """
+        self.pool = pool
+        self.world = world
+        self.build_mesh = build_mesh
+        self.upload_mesh = upload_mesh
+        self.rebuild_queue = rebuild_queue
+        self.visibility = visibility
+        self._pending = {} # chunk_coord -> (SharedJob, revision stamp)
+        self.total_stale = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, chunk_coord, padded_blocks, padded_light=None, lod=0):
+        """Queues a chunk rebuild from padded copies taken now (see meshing.get_padded_chunk_blocks)."""
+        self.discard(chunk_coord)
+        job = self.pool.submit(_build_chunk_job, self.build_mesh, chunk_coord, padded_blocks, padded_light, lod)
+        self._pending[chunk_coord] = (job, neighbourhood_revision_stamp(self.world, chunk_coord))
+
+    def discard(self, chunk_coord):
+        pending = self._pending.pop(chunk_coord, None)
+        if pending:
+            pending[0].discard()
+
+    def collect(self, budget_seconds=None):
+        """
+        Uploads finished rebuilds until the time budget is used up (at least one per call).
+
+        Returns:
+            int: Chunks uploaded.
+        """
+        deadline = time.perf_counter() + budget_seconds if budget_seconds is not None else None
+        uploads = 0
+        for chunk_coord, (job, stamp) in list(self._pending.items()):
+            if deadline is not None and uploads and time.perf_counter() > deadline:
+                break
+            if not job.done():
+                continue
+            del self._pending[chunk_coord]
+            try:
+                if stamp != neighbourhood_revision_stamp(self.world, chunk_coord):
+                    self.total_stale += 1
+                    if self.rebuild_queue is not None:
+                        self.rebuild_queue.mark_dirty(chunk_coord)
+                    continue
+                data, connectivity = job.result()
+                self.upload_mesh(chunk_coord, data)
+                if self.visibility is not None:
+                    self.visibility.set_connectivity(chunk_coord, connectivity)
+                uploads += 1
+                del data
+            except Exception as e: # The worker raised or the pool broke; try the chunk again later
+                print(f"Error: Rebuilding chunk {chunk_coord} failed: {e!r}")
+                if self.rebuild_queue is not None:
+                    self.rebuild_queue.mark_dirty(chunk_coord)
+            finally:
+                job.release()
+        return uploads
+
+    def wait(self, poll_interval=0.002):
+        """Blocks until every pending rebuild is uploaded (e.g. the initial build before the first frame)."""
+        while self._pending:
+            if not self.collect():
+                time.sleep(poll_interval)
+
+    def shutdown(self):
+        for chunk_coord in list(self._pending):
+            self.discard(chunk_coord)
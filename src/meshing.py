@@ -0,0 +1,464 @@
+import numpy as np
+
+from .assets import std_cube_vertices, std_cube_faces, face_normals, ATLAS_UV_COORDINATES
+from .block_type import BlockType
+from .chunked_world import CHUNK_SIZE, CHUNK_SHIFT, CHUNK_MASK, chunk_origin
+from .lighting import FULL_SKY, MAX_LIGHT, LIGHT_LEVEL_FACTORS, get_padded_chunk_light
+
+# Chunk mesh vertex layout (all float32):
+#   Position (3f, chunk-local), Normal (3f), Tile UV (2f, repeats once per block),
+#   Atlas rect (4f: u_offset, v_offset, u_scale, v_scale), AO factor (1f),
+#   Light (2f: sky and block light brightness of the cell in front of the face)
+CHUNK_VERTEX_FLOATS = 15
+
+# Packed chunk vertex layout (two uint32 words, see pack_chunk_vertices):
+#   Word 0: corner position + 0.5 (6 bits per axis: x 0-5, y 6-11, z 12-17), tile UV (6 bits each: u 18-23, v 24-29)
+#   Word 1: tile index (bits 0-15, the block type), sky light level (16-19), block light level (20-23),
+#           face index (24-26, into face_normals), AO level (27-28)
+# Positions and tile UVs are whole numbers from 0 to CHUNK_SIZE, so chunks of up to 32 blocks fit.
+PACKED_VERTEX_WORDS = 2
+
+# Brightness factor per ambient occlusion level (0 = corner fully enclosed, 3 = unoccluded)
+AO_LEVEL_FACTORS = np.array([0.5, 0.7, 0.85, 1.0], dtype=np.float32)
+
+# Greedy-merge keys pack the block type with the face's four corner AO levels, so only faces
+# that shade identically are merged. Faces with non-uniform AO are never merged.
+_KEY_AO_SHIFT = 16
+_KEY_NONUNIFORM_BIT = 1 << 24
+_KEY_LIGHT_SHIFT = 25 # Packed light (8 bits) of the face, so only equally lit faces merge too
+
+# Two triangles per quad, same winding as get_interleaved_cube_vertex_data: (v0, v1, v2), (v0, v2, v3)
+_QUAD_TRIANGLE_CORNERS = np.array([0, 1, 2, 0, 2, 3], dtype=np.intp)
+_QUAD_TRIANGLE_CORNERS_FLIPPED = np.array([1, 2, 3, 1, 3, 0], dtype=np.intp) # Same winding, other diagonal
+_QUAD_UVS = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)], dtype=np.float32)
+
+
+def _build_face_tables():
+    """
+    Derives per-face lookup data from the cube definition in assets.py:
+    normal axis/sign, the two in-plane axes (s follows corner 0->1, t follows corner 0->3),
+    corner offsets relative to the block centre and which corners lie on the positive side.
+    """
+    tables = []
+    for face_idx, face_vertex_indices in enumerate(std_cube_faces):
+        normal = np.array(face_normals[face_idx], dtype=np.intp)
+        corners = np.array([std_cube_vertices[i] for i in face_vertex_indices], dtype=np.float32)
+        normal_axis = int(np.flatnonzero(normal)[0])
+        s_axis = int(np.flatnonzero(corners[1] - corners[0])[0])
+        t_axis = int(np.flatnonzero(corners[3] - corners[0])[0])
+        tables.append({
+            'normal': normal,
+            'normal_axis': normal_axis,
+            's_axis': s_axis,
+            't_axis': t_axis,
+            'corners': corners,
+            'positive_corners': (corners > 0).astype(np.float32),
+            # Per corner, the direction (-1/+1) towards it along the s and t axes
+            'corner_signs': np.sign(corners[:, [s_axis, t_axis]]).astype(np.intp),
+        })
+    return tables
+
+FACE_TABLES = _build_face_tables()
+
+
+def build_block_uv_table():
+    """
+    Builds a lookup array indexed by block type value with rows (u_offset, v_offset, u_scale, v_scale),
+    taken from ATLAS_UV_COORDINATES. Unknown types map to the full texture, like draw_block_glsl does.
+    """
+    max_value = max(block_type.value for block_type in BlockType)
+    table = np.tile(np.array([0.0, 0.0, 1.0, 1.0], dtype=np.float32), (max_value + 1, 1))
+    for block_type in BlockType:
+        uv_coords = ATLAS_UV_COORDINATES.get(block_type.name.lower())
+        if uv_coords:
+            u_min, v_min, u_max, v_max = uv_coords
+            table[block_type.value] = (u_min, v_min, u_max - u_min, v_max - v_min)
+    return table
+
+BLOCK_UV_TABLE = build_block_uv_table()
+
+# uv_table for meshes that get packed: the "atlas rect" column 0 carries the block type as the tile
+# index, and the shader looks the rect up in BLOCK_UV_TABLE (uploaded as a uniform array)
+BLOCK_TILE_TABLE = np.zeros_like(BLOCK_UV_TABLE)
+BLOCK_TILE_TABLE[:, 0] = np.arange(len(BLOCK_UV_TABLE))
+
+
+def chunks_touching_block(x, y, z):
+    """
+    Returns the chunk coordinates whose meshes can change when block (x, y, z) changes:
+    its own chunk plus every neighbouring chunk whose one-block border contains it. Baked AO
+    samples diagonal cells, so a block on a chunk edge or corner also touches the chunks across
+    that edge or corner (up to 7 neighbours).
+    """
+    coord = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT, z >> CHUNK_SHIFT)
+    # Per axis, the offsets towards chunks that see the block: always 0, plus -1 or +1 on a border
+    axis_offsets = []
+    for local in (x & CHUNK_MASK, y & CHUNK_MASK, z & CHUNK_MASK):
+        if local == 0:
+            axis_offsets.append((0, -1))
+        elif local == CHUNK_MASK:
+            axis_offsets.append((0, 1))
+        else:
+            axis_offsets.append((0,))
+    return [(coord[0] + dx, coord[1] + dy, coord[2] + dz)
+            for dx in axis_offsets[0] for dy in axis_offsets[1] for dz in axis_offsets[2]]
+
+
+def get_padded_chunk_blocks(world, chunk_coord, padding=1):
+    """
+    Returns the chunk's blocks plus a border from its neighbours, shape (CHUNK_SIZE + 2 * padding,)*3.
+    LOD meshes use a border of one coarse cell (padding = the LOD factor).
+    """
+    ox, oy, oz = chunk_origin(chunk_coord)
+    return world.get_region(ox - padding, oy - padding, oz - padding,
+                            ox + CHUNK_SIZE + padding, oy + CHUNK_SIZE + padding, oz + CHUNK_SIZE + padding)
+
+
+def _exposed_face_masks(padded_blocks):
+    """
+    Yields (face_idx, exposed_keys) where exposed_keys is a (CHUNK_SIZE,)*3 array holding the block type
+    of every cell whose face_idx face is exposed (neighbour is EMPTY), and 0 elsewhere.
+    """
+    size = padded_blocks.shape[0] - 2
+    center = padded_blocks[1:-1, 1:-1, 1:-1]
+    solid = center != BlockType.EMPTY.value
+    for face_idx, table in enumerate(FACE_TABLES):
+        nx, ny, nz = table['normal']
+        neighbour = padded_blocks[1 + nx:size + 1 + nx, 1 + ny:size + 1 + ny, 1 + nz:size + 1 + nz]
+        exposed = solid & (neighbour == BlockType.EMPTY.value)
+        yield face_idx, np.where(exposed, center, 0)
+
+
+def _corner_ao_levels(padded_solid, face_idx):
+    """
+    Computes the ambient occlusion level (0-3) of the four corners of face face_idx for every cell
+    of the chunk at once, by shifting the padded solid mask.
+
+    For each corner, the two side neighbours and the diagonal neighbour in the layer in front of
+    the face are sampled; two solid sides fully occlude the corner regardless of the diagonal.
+
+    Returns:
+        np.ndarray: (CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE, 4) uint8 array.
+    """
+    table = FACE_TABLES[face_idx]
+    size = padded_solid.shape[0] - 2
+
+    def shifted(offset):
+        ox, oy, oz = offset
+        return padded_solid[1 + ox:size + 1 + ox, 1 + oy:size + 1 + oy, 1 + oz:size + 1 + oz]
+
+    levels = np.empty((size, size, size, 4), dtype=np.uint8)
+    for corner_idx, (sign_s, sign_t) in enumerate(table['corner_signs']):
+        offset_s = table['normal'].copy(); offset_s[table['s_axis']] += sign_s
+        offset_t = table['normal'].copy(); offset_t[table['t_axis']] += sign_t
+        offset_c = offset_s.copy(); offset_c[table['t_axis']] += sign_t
+        side_s, side_t, diagonal = shifted(offset_s), shifted(offset_t), shifted(offset_c)
+        occluders = side_s.astype(np.uint8) + side_t + diagonal
+        levels[..., corner_idx] = np.where(side_s & side_t, 0, 3 - occluders)
+    return levels
+
+
+def _emit_quads(face_idx, base_blocks, size_s, size_t, block_types, uv_table, ao_levels, light):
+    """
+    Expands quads into triangle vertices in the chunk vertex layout.
+
+    Args:
+        face_idx (int): Index into std_cube_faces / face_normals.
+        base_blocks (np.ndarray): (N, 3) chunk-local coordinates of each quad's minimum block.
+        size_s, size_t (np.ndarray): (N,) quad extents in blocks along the face's s and t axes.
+        block_types (np.ndarray): (N,) block type values.
+        uv_table (np.ndarray): Block type -> atlas rect lookup (see build_block_uv_table).
+        ao_levels (np.ndarray): (N, 4) AO level of each quad corner.
+        light (np.ndarray): (N,) packed light (sky << 4 | block) in front of each quad.
+
+    Returns:
+        np.ndarray: (N * 6, CHUNK_VERTEX_FLOATS) float32 vertex data.
+    """
+    table = FACE_TABLES[face_idx]
+    count = base_blocks.shape[0]
+    full_size = np.ones((count, 3), dtype=np.float32)
+    full_size[:, table['s_axis']] = size_s
+    full_size[:, table['t_axis']] = size_t
+
+    vertices = np.empty((count, 4, CHUNK_VERTEX_FLOATS), dtype=np.float32)
+    # Corners on the positive side of an axis belong to the last block of the quad along that axis
+    vertices[:, :, 0:3] = (base_blocks[:, None, :] + table['positive_corners'][None] * (full_size[:, None, :] - 1.0)
+                           + table['corners'][None])
+    vertices[:, :, 3:6] = table['normal']
+    vertices[:, :, 6:8] = _QUAD_UVS[None] * np.stack((size_s, size_t), axis=1)[:, None, :]
+    vertices[:, :, 8:12] = uv_table[block_types][:, None, :]
+    vertices[:, :, 12] = AO_LEVEL_FACTORS[ao_levels]
+    vertices[:, :, 13] = LIGHT_LEVEL_FACTORS[light >> 4][:, None]
+    vertices[:, :, 14] = LIGHT_LEVEL_FACTORS[light & MAX_LIGHT][:, None]
+    # Split along the diagonal with the brighter ends so AO interpolates symmetrically (no anisotropy seams)
+    flip = (ao_levels[:, 0].astype(np.intp) + ao_levels[:, 2]) < (ao_levels[:, 1].astype(np.intp) + ao_levels[:, 3])
+    triangle_corners = np.where(flip[:, None], _QUAD_TRIANGLE_CORNERS_FLIPPED, _QUAD_TRIANGLE_CORNERS)
+    return np.take_along_axis(vertices, triangle_corners[:, :, None], axis=1).reshape(-1, CHUNK_VERTEX_FLOATS)
+
+
+def _greedy_quads(face_idx, exposed_keys):
+    """
+    Merges coplanar exposed faces with equal keys into rectangles, slice by slice.
+    Keys carrying _KEY_NONUNIFORM_BIT are emitted as single faces.
+    Returns (base_blocks, size_s, size_t, keys) arrays for _emit_quads.
+    """
+    table = FACE_TABLES[face_idx]
+    n_axis, s_axis, t_axis = table['normal_axis'], table['s_axis'], table['t_axis']
+    slices = np.transpose(exposed_keys, (n_axis, s_axis, t_axis))
+    size_s_max, size_t_max = slices.shape[1], slices.shape[2]
+
+    bases, sizes_s, sizes_t, keys = [], [], [], []
+    for layer in np.flatnonzero(slices.any(axis=(1, 2))):
+        mask = slices[layer].copy()
+        for t in range(size_t_max):
+            row = mask[:, t]
+            s = 0
+            while s < size_s_max:
+                key = row[s]
+                if key == 0:
+                    s += 1
+                    continue
+                width = height = 1
+                if not key & _KEY_NONUNIFORM_BIT:
+                    while s + width < size_s_max and row[s + width] == key:
+                        width += 1
+                    while t + height < size_t_max and (mask[s:s + width, t + height] == key).all():
+                        height += 1
+                mask[s:s + width, t:t + height] = 0
+                base = [0, 0, 0]
+                base[n_axis], base[s_axis], base[t_axis] = layer, s, t
+                bases.append(base); sizes_s.append(width); sizes_t.append(height); keys.append(key)
+                s += width
+
+    return (np.array(bases, dtype=np.float32).reshape(-1, 3), np.array(sizes_s, dtype=np.float32),
+            np.array(sizes_t, dtype=np.float32), np.array(keys, dtype=np.intp))
+
+
+def mesh_padded_blocks(padded_blocks, greedy=False, uv_table=None, padded_light=None):
+    """
+    Builds the mesh of one chunk from its padded block array (see get_padded_chunk_blocks).
+    Only faces bordering an EMPTY cell are emitted; with greedy=True, coplanar faces of the
+    same block type, ambient occlusion and light are merged into larger quads. Per-corner AO
+    and the light of the cell in front of each face are baked into the vertices.
+
+    Args:
+        padded_light (np.ndarray, optional): Packed light with the same padding (see
+            lighting.get_padded_chunk_light). Without it every face is fully sky-lit.
+
+    Returns:
+        np.ndarray: (vertex_count, CHUNK_VERTEX_FLOATS) float32 array, chunk-local positions.
+    """
+    if uv_table is None:
+        uv_table = BLOCK_UV_TABLE
+    size = padded_blocks.shape[0] - 2
+    padded_solid = padded_blocks != BlockType.EMPTY.value
+    parts = []
+    for face_idx, exposed_keys in _exposed_face_masks(padded_blocks):
+        exposed = exposed_keys != 0
+        if not exposed.any():
+            continue
+        ao_levels = _corner_ao_levels(padded_solid, face_idx)
+        if padded_light is None:
+            face_light = np.full(exposed.shape, FULL_SKY, dtype=np.int64)
+        else:
+            nx, ny, nz = FACE_TABLES[face_idx]['normal']
+            face_light = padded_light[1 + nx:size + 1 + nx, 1 + ny:size + 1 + ny, 1 + nz:size + 1 + nz].astype(np.int64)
+        if greedy:
+            keys = exposed_keys.astype(np.int64) | (face_light << _KEY_LIGHT_SHIFT)
+            for corner_idx in range(4):
+                keys |= ao_levels[..., corner_idx].astype(np.int64) << (_KEY_AO_SHIFT + 2 * corner_idx)
+            nonuniform = (ao_levels != ao_levels[..., :1]).any(axis=-1)
+            keys[nonuniform] |= _KEY_NONUNIFORM_BIT
+            keys[~exposed] = 0
+            base_blocks, size_s, size_t, keys = _greedy_quads(face_idx, keys)
+            block_types = keys & ((1 << _KEY_AO_SHIFT) - 1)
+            quad_ao = np.stack([(keys >> (_KEY_AO_SHIFT + 2 * c)) & 3 for c in range(4)], axis=1)
+            quad_light = (keys >> _KEY_LIGHT_SHIFT) & 0xFF
+        else:
+            base_blocks = np.argwhere(exposed).astype(np.float32)
+            block_types = exposed_keys[exposed].astype(np.intp)
+            size_s = size_t = np.ones(len(block_types), dtype=np.float32)
+            quad_ao = ao_levels[exposed]
+            quad_light = face_light[exposed]
+        parts.append(_emit_quads(face_idx, base_blocks, size_s, size_t, block_types, uv_table,
+                                 quad_ao.astype(np.intp), quad_light.astype(np.intp)))
+    if not parts:
+        return np.empty((0, CHUNK_VERTEX_FLOATS), dtype=np.float32)
+    return np.concatenate(parts)
+
+
+# --- Level of detail ---
+#
+# Distant chunks are meshed from a coarser grid in which each cell stands for factor^3 blocks
+# (factor = 2 ** LOD level), then scaled back up. The coarse mesh has about factor^2 fewer quads.
+
+def downsample_blocks(blocks, factor):
+    """
+    Reduces a block array by `factor` along each axis. A coarse cell is solid if at least half of
+    its blocks are, and takes the most common type among the top blocks of its sub-columns, so
+    terrain keeps its surface colour (grass stays grass).
+    """
+    if factor == 1:
+        return blocks
+    nx, ny, nz = (size // factor for size in blocks.shape)
+    # (nx, ny, nz, x, z, y) within each cell, with y last
+    cells = blocks.reshape(nx, factor, ny, factor, nz, factor).transpose(0, 2, 4, 1, 5, 3)
+    solid = cells != BlockType.EMPTY.value
+    occupied = solid.sum(axis=(3, 4, 5)) * 2 >= factor ** 3
+    top_index = factor - 1 - np.argmax(solid[..., ::-1], axis=-1)
+    tops = np.take_along_axis(cells, top_index[..., None], axis=-1)[..., 0].reshape(nx, ny, nz, factor * factor)
+    tops = np.where(solid.any(axis=-1).reshape(tops.shape), tops, BlockType.EMPTY.value)
+    types = np.unique(tops[tops != BlockType.EMPTY.value])
+    if not len(types):
+        return np.zeros((nx, ny, nz), dtype=blocks.dtype)
+    counts = np.stack([(tops == block_type).sum(axis=-1) for block_type in types], axis=-1)
+    return np.where(occupied, types[np.argmax(counts, axis=-1)], BlockType.EMPTY.value).astype(blocks.dtype)
+
+def downsample_light(light, factor):
+    """Reduces packed light like downsample_blocks, taking the brightest sky and block light in each cell."""
+    if factor == 1:
+        return light
+    nx, ny, nz = (size // factor for size in light.shape)
+    cells = light.reshape(nx, factor, ny, factor, nz, factor)
+    return (cells >> 4).max(axis=(1, 3, 5)) << 4 | (cells & MAX_LIGHT).max(axis=(1, 3, 5))
+
+def _skirt_quads(padded_blocks, uv_table, padded_light):
+    """
+    Seam cover for LOD meshes: on the four vertical chunk sides, surface cells (open above) whose
+    outward face is hidden by the neighbouring chunk get that face anyway. A neighbour drawn at a
+    different level has a slightly different surface, and the skirt fills the gap between the two.
+    Skirts are lit like the open cell above them and have no AO.
+    """
+    size = padded_blocks.shape[0] - 2
+    center = padded_blocks[1:-1, 1:-1, 1:-1]
+    open_above = padded_blocks[1:-1, 2:, 1:-1] == BlockType.EMPTY.value
+    parts = []
+    for face_idx, table in enumerate(FACE_TABLES):
+        axis = table['normal_axis']
+        if axis == 1:
+            continue
+        nx, ny, nz = table['normal']
+        neighbour = padded_blocks[1 + nx:size + 1 + nx, 1 + ny:size + 1 + ny, 1 + nz:size + 1 + nz]
+        skirt = (center != BlockType.EMPTY.value) & (neighbour != BlockType.EMPTY.value) & open_above
+        border = [slice(None)] * 3
+        border[axis] = slice(1, None) if table['normal'][axis] < 0 else slice(None, -1)
+        skirt[tuple(border)] = False # Only the layer on the chunk side
+        if not skirt.any():
+            continue
+        cells = np.argwhere(skirt)
+        if padded_light is None:
+            light = np.full(len(cells), FULL_SKY, dtype=np.intp)
+        else:
+            light = padded_light[cells[:, 0] + 1, cells[:, 1] + 2, cells[:, 2] + 1].astype(np.intp)
+        ones = np.ones(len(cells), dtype=np.float32)
+        parts.append(_emit_quads(face_idx, cells.astype(np.float32), ones, ones, center[skirt].astype(np.intp),
+                                 uv_table, np.full((len(cells), 4), 3, dtype=np.intp), light))
+    return parts
+
+def mesh_lod_padded_blocks(padded_blocks, factor, greedy=False, uv_table=None, padded_light=None):
+    """
+    Builds a chunk mesh from blocks downsampled by `factor` (1 = full detail, same as
+    mesh_padded_blocks), with skirts along the chunk sides to cover seams between levels.
+
+    Args:
+        padded_blocks (np.ndarray): Chunk blocks with a border of `factor` blocks
+            (get_padded_chunk_blocks(world, chunk_coord, padding=factor)).
+        padded_light (np.ndarray, optional): Packed light with the same border.
+
+    Returns:
+        np.ndarray: (vertex_count, CHUNK_VERTEX_FLOATS) float32 array in the usual chunk-local layout;
+        tile UVs are scaled so textures keep their size per block.
+    """
+    if factor == 1:
+        return mesh_padded_blocks(padded_blocks, greedy=greedy, uv_table=uv_table, padded_light=padded_light)
+    if uv_table is None:
+        uv_table = BLOCK_UV_TABLE
+    coarse = downsample_blocks(padded_blocks, factor)
+    coarse_light = downsample_light(padded_light, factor) if padded_light is not None else None
+    parts = [mesh_padded_blocks(coarse, greedy=greedy, uv_table=uv_table, padded_light=coarse_light)]
+    vertices = np.concatenate(parts + _skirt_quads(coarse, uv_table, coarse_light))
+    # Coarse cell i covers blocks i*factor .. i*factor + factor - 1 (blocks are centred on integers)
+    vertices[:, 0:3] = (vertices[:, 0:3] + 0.5) * factor - 0.5
+    vertices[:, 6:8] *= factor
+    return vertices
+
+
+# --- Packed vertices ---
+
+# Face index by normal, keyed by normal . (1, 3, 9) + 13
+_FACE_OF_NORMAL = np.zeros(27, dtype=np.uint32)
+for _face_idx, _normal in enumerate(face_normals):
+    _FACE_OF_NORMAL[np.dot(_normal, (1, 3, 9)) + 13] = _face_idx
+
+def pack_chunk_vertices(vertices):
+    """
+    Packs chunk vertices into PACKED_VERTEX_WORDS uint32 words each (8 instead of 60 bytes).
+
+    Args:
+        vertices (np.ndarray): (vertex_count, CHUNK_VERTEX_FLOATS) float32 chunk vertices built with
+            uv_table=BLOCK_TILE_TABLE, so the atlas rect column holds the block type.
+
+    Returns:
+        np.ndarray: (vertex_count, PACKED_VERTEX_WORDS) uint32 array in the packed layout.
+    """
+    corners = np.rint(vertices[:, 0:3] + 0.5).astype(np.uint32) # Blocks are centred on integers
+    tile_uvs = np.rint(vertices[:, 6:8]).astype(np.uint32)
+    faces = _FACE_OF_NORMAL[np.rint(vertices[:, 3:6]).astype(np.intp) @ (1, 3, 9) + 13]
+    # AO and light factors are copied from the level tables, so the levels can be looked up exactly
+    ao_levels = np.searchsorted(AO_LEVEL_FACTORS, vertices[:, 12]).astype(np.uint32)
+    sky_levels = np.searchsorted(LIGHT_LEVEL_FACTORS, vertices[:, 13]).astype(np.uint32)
+    block_levels = np.searchsorted(LIGHT_LEVEL_FACTORS, vertices[:, 14]).astype(np.uint32)
+
+    packed = np.empty((len(vertices), PACKED_VERTEX_WORDS), dtype=np.uint32)
+    packed[:, 0] = (corners[:, 0] | corners[:, 1] << 6 | corners[:, 2] << 12
+                    | tile_uvs[:, 0] << 18 | tile_uvs[:, 1] << 24)
+    packed[:, 1] = (vertices[:, 8].astype(np.uint32) | sky_levels << 16 | block_levels << 20
+                    | faces << 24 | ao_levels << 27)
+    return packed
+
+
+# Per-instance layout for instanced block drawing (float32): Block position (3f), Atlas rect (4f)
+BLOCK_INSTANCE_FLOATS = 7
+
+def build_block_instances(padded_blocks, origin, uv_table=None):
+    """
+    Builds per-instance data for the blocks of one chunk that have at least one exposed face
+    (fully buried blocks are skipped).
+
+    Args:
+        padded_blocks (np.ndarray): Chunk blocks with a one-block border (see get_padded_chunk_blocks).
+        origin (tuple): World coordinates of the chunk's block (0, 0, 0).
+
+    Returns:
+        np.ndarray: (instance_count, BLOCK_INSTANCE_FLOATS) float32 array with world positions.
+    """
+    if uv_table is None:
+        uv_table = BLOCK_UV_TABLE
+    visible = np.zeros(tuple(s - 2 for s in padded_blocks.shape), dtype=bool)
+    for _, exposed_keys in _exposed_face_masks(padded_blocks):
+        visible |= exposed_keys != 0
+    positions = np.argwhere(visible)
+    instances = np.empty((len(positions), BLOCK_INSTANCE_FLOATS), dtype=np.float32)
+    instances[:, 0:3] = positions + np.asarray(origin)
+    instances[:, 3:7] = uv_table[padded_blocks[1:-1, 1:-1, 1:-1][visible].astype(np.intp)]
+    return instances
+
+def build_chunk_instances(world, chunk_coord):
+    """Builds per-instance block data for a loaded chunk of the given ChunkedWorld (see build_block_instances)."""
+    return build_block_instances(get_padded_chunk_blocks(world, chunk_coord), chunk_origin(chunk_coord))
+
+
+def build_chunk_mesh(world, chunk_coord, greedy=False, light_map=None, lod=0, packed=False):
+    """
+    Builds the vertex data for a loaded chunk of the given ChunkedWorld (see mesh_padded_blocks),
+    lit from light_map (a ChunkedWorld of packed light, see lighting.py) if given, at LOD level
+    `lod` (blocks downsampled by 2 ** lod, see mesh_lod_padded_blocks). With packed=True the
+    vertices come in the packed layout (see pack_chunk_vertices).
+    """
+    factor = 1 << lod
+    padded_light = get_padded_chunk_light(light_map, chunk_coord, padding=factor) if light_map is not None else None
+    padded_blocks = get_padded_chunk_blocks(world, chunk_coord, padding=factor)
+    if packed:
+        return pack_chunk_vertices(mesh_lod_padded_blocks(padded_blocks, factor, greedy=greedy, uv_table=BLOCK_TILE_TABLE,
+                                                          padded_light=padded_light))
+    return mesh_lod_padded_blocks(padded_blocks, factor, greedy=greedy, padded_light=padded_light)
@@ -0,0 +1,92 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# position/velocity: resolved values after the move; on_ground: the downward move was stopped by a block;
+# hit_ceiling: the upward move was stopped; hit_wall: horizontal movement was stopped on X or Z.
+CollisionResult = namedtuple('CollisionResult', ['position', 'velocity', 'on_ground', 'hit_ceiling', 'hit_wall'])
+
+COLLISION_SKIN = 1e-4 # Gap kept between the player and a block after contact
+
+
+def gather_solid_boxes(world, box_min, box_max):
+    """
+    Returns the min corners (N, 3) of every solid unit block overlapping the box [box_min, box_max],
+    read from the world in a single bulk region access. Blocks are centred on integer coordinates.
+    """
+    cell_min = [math.floor(v + 0.5) for v in box_min]
+    cell_max = [math.floor(v + 0.5) for v in box_max]
+    region = world.get_region(cell_min[0], cell_min[1], cell_min[2], cell_max[0] + 1, cell_max[1] + 1, cell_max[2] + 1)
+    cells = np.argwhere(region)
+    return cells.astype(np.float64) + np.asarray(cell_min, dtype=np.float64) - 0.5
+
+
+def _sweep_axis(axis, amount, player_min, player_max, block_mins):
+    """
+    Time of impact along one axis: how far the player box can move by `amount` along `axis`
+    before touching any candidate block that overlaps it on the other two axes.
+    """
+    if amount == 0 or len(block_mins) == 0:
+        return amount, False
+    block_maxs = block_mins + 1.0
+    other_axes = [a for a in range(3) if a != axis]
+    overlapping = np.ones(len(block_mins), dtype=bool)
+    for other in other_axes:
+        overlapping &= (block_mins[:, other] < player_max[other]) & (block_maxs[:, other] > player_min[other])
+    if not overlapping.any():
+        return amount, False
+    if amount > 0:
+        gaps = block_mins[overlapping, axis] - player_max[axis]
+        gaps = gaps[gaps >= -COLLISION_SKIN] # Only blocks ahead of the player
+        if len(gaps) and gaps.min() < amount:
+            return max(0.0, float(gaps.min()) - COLLISION_SKIN), True
+    else:
+        gaps = player_min[axis] - block_maxs[overlapping, axis]
+        gaps = gaps[gaps >= -COLLISION_SKIN]
+        if len(gaps) and gaps.min() < -amount:
+            return -max(0.0, float(gaps.min()) - COLLISION_SKIN), True
+    return amount, False
+
+
+def move_and_collide(world, center, velocity, dims):
+    """
+    Moves an axis-aligned box through the voxel world with swept collision.
+
+    Candidate solid blocks are gathered once from the box enclosing the whole move; the move is then
+    resolved Y first, then X and Z, each axis clipped to its exact time of impact, so fast movement
+    cannot tunnel through blocks and the landing height does not depend on iteration order.
+
+    Args:
+        world (ChunkedWorld): Voxel store.
+        center (sequence): Box centre (x, y, z).
+        velocity (sequence): Displacement for this step (x, y, z).
+        dims (sequence): Box size (width, height, depth).
+
+    Returns:
+        CollisionResult
+    """
+    half = [d / 2.0 for d in dims]
+    player_min = [center[i] - half[i] for i in range(3)]
+    player_max = [center[i] + half[i] for i in range(3)]
+    sweep_min = [min(player_min[i], player_min[i] + velocity[i]) - 1.0 for i in range(3)]
+    sweep_max = [max(player_max[i], player_max[i] + velocity[i]) + 1.0 for i in range(3)]
+    block_mins = gather_solid_boxes(world, sweep_min, sweep_max)
+
+    resolved_velocity = list(velocity)
+    clipped = [False, False, False]
+    for axis in (1, 0, 2):
+        moved, clipped[axis] = _sweep_axis(axis, velocity[axis], player_min, player_max, block_mins)
+        player_min[axis] += moved
+        player_max[axis] += moved
+        if clipped[axis]:
+            resolved_velocity[axis] = 0.0
+
+    position = [player_min[i] + half[i] for i in range(3)]
+    return CollisionResult(
+        position=position,
+        velocity=resolved_velocity,
+        on_ground=clipped[1] and velocity[1] < 0,
+        hit_ceiling=clipped[1] and velocity[1] > 0,
+        hit_wall=clipped[0] or clipped[2],
+    )
@@ -0,0 +1,127 @@
+import contextlib
+import csv
+import os
+import time
+
+import numpy as np
+
+# Stages of the main loop, in the order they run
+FRAME_STAGES = ("raycast", "input", "physics", "streaming", "culling", "world_draw", "ui", "swap")
+PERCENTILES = (50, 95, 99)
+
+_NULL_SCOPE = contextlib.nullcontext() # Returned by stage() while disabled; reusable and free to enter
+
+
+class _StageTimer:
+    """Reusable scope that adds its elapsed time to one stage of the current frame."""
+    __slots__ = ('totals', 'index', 'start')
+
+    def __init__(self, totals, index):
+        self.totals = totals
+        self.index = index
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.totals[self.index] += time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timings kept in a fixed-size ring buffer.
+
+    Wrap each stage of the loop in `with profiler.stage(name):` between begin_frame() and end_frame().
+    A stage entered several times in one frame accumulates; nested stages are counted in both.
+    Each finished frame becomes one row of `history` (milliseconds per stage plus the whole frame),
+    overwriting the oldest once the buffer is full. While disabled, stage() returns a shared null
+    context and begin/end_frame return immediately, so the instrumentation costs next to nothing.
+    """
+
+    def __init__(self, stages=FRAME_STAGES, history_frames=1024, enabled=False):
+        self.stages = tuple(stages)
+        self.enabled = enabled
+        self.history = np.zeros((history_frames, len(self.stages) + 1), dtype=np.float32) # Last column: whole frame
+        self.frame_count = 0 # Frames recorded so far (the ring buffer holds the last len(history))
+        self._totals = [0.0] * len(self.stages) # Seconds per stage in the frame being recorded
+        self._timers = {name: _StageTimer(self._totals, i) for i, name in enumerate(self.stages)}
+        self._frame_start = None
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self._frame_start = None # A frame in progress while toggling is dropped
+
+    def stage(self, name):
+        """Returns the context manager timing one stage (a no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return self._timers[name]
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        for i in range(len(self._totals)):
+            self._totals[i] = 0.0
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        row = self.history[self.frame_count % len(self.history)]
+        row[:-1] = self._totals
+        row[-1] = time.perf_counter() - self._frame_start
+        row *= 1000.0
+        self.frame_count += 1
+        self._frame_start = None
+
+    def recorded_frames(self):
+        """Returns the recorded rows in chronological order, as an (N, stages + 1) array in milliseconds."""
+        size = len(self.history)
+        if self.frame_count <= size:
+            return self.history[:self.frame_count]
+        return np.roll(self.history, -(self.frame_count % size), axis=0)
+
+    def frame_times_ms(self, count=None):
+        """Whole-frame times of the last `count` recorded frames (all of them by default), oldest first."""
+        frames = self.recorded_frames()[:, -1]
+        return frames if count is None else frames[-count:]
+
+    def percentiles(self):
+        """
+        Returns:
+            dict: {stage: (p50, p95, p99) in ms} over the recorded history, with "frame" for whole frames;
+            empty if nothing has been recorded.
+        """
+        frames = self.recorded_frames()
+        if not len(frames):
+            return {}
+        values = np.percentile(frames, PERCENTILES, axis=0)
+        return {name: tuple(float(v) for v in values[:, i]) for i, name in enumerate(self.stages + ("frame",))}
+
+    def summary_lines(self):
+        """One HUD line per stage: "<stage> p50/p95/p99: a / b / c ms"."""
+        return [f"{name:<10} p50/p95/p99: {p50:5.2f} / {p95:5.2f} / {p99:5.2f} ms"
+                for name, (p50, p95, p99) in self.percentiles().items()]
+
+    def dump_csv(self, directory):
+        """
+        Writes the recorded history to a new timestamped CSV file in the given directory.
+
+        Returns:
+            str: Path of the written file, or None if there was nothing to write.
+        """
+        frames = self.recorded_frames()
+        if not len(frames):
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, time.strftime("frames_%Y%m%d_%H%M%S.csv"))
+        first_frame = self.frame_count - len(frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in self.stages] + ["frame_ms"])
+            for i, row in enumerate(frames):
+                writer.writerow([first_frame + i] + [f"{v:.4f}" for v in row])
+        return path
@@ -0,0 +1,158 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from .block_type import BlockType
+
+# block: (x, y, z) of the hit block; previous: the empty cell the ray came from (None if the ray
+# started inside the block); normal: (nx, ny, nz) of the face that was hit; distance: along the ray.
+RaycastHit = namedtuple('RaycastHit', ['block', 'previous', 'normal', 'distance'])
+
+
+def _setup_axis(origin, direction, cell):
+    """Amanatides-Woo setup for one axis: (step, t_max, t_delta)."""
+    if direction > 0:
+        return 1, (cell + 1 - origin) / direction, 1.0 / direction
+    if direction < 0:
+        return -1, (origin - cell) / -direction, -1.0 / direction
+    return 0, math.inf, math.inf
+
+
+def raycast_voxels(world, origin, direction, max_distance=5.0):
+    """
+    Exact grid traversal (Amanatides & Woo) through unit blocks centred on integer coordinates.
+    Every cell the ray passes through is visited exactly once, in order.
+
+    Args:
+        world (ChunkedWorld): Voxel store to test against.
+        origin (tuple): Ray start in world space.
+        direction (tuple): Ray direction (need not be normalized; distances are in units of its length).
+        max_distance (float): Maximum ray length.
+
+    Returns:
+        RaycastHit or None: The first solid block hit, or None within max_distance.
+    """
+    length = math.sqrt(direction[0] ** 2 + direction[1] ** 2 + direction[2] ** 2)
+    if length == 0:
+        return None
+    dx, dy, dz = direction[0] / length, direction[1] / length, direction[2] / length
+    # Shift by half a block so cell boundaries fall on integers and floor() gives the cell
+    ox, oy, oz = origin[0] + 0.5, origin[1] + 0.5, origin[2] + 0.5
+    x, y, z = math.floor(ox), math.floor(oy), math.floor(oz)
+
+    if world.get_block(x, y, z) != BlockType.EMPTY.value:
+        return RaycastHit((x, y, z), None, (0, 0, 0), 0.0)
+
+    step_x, t_max_x, t_delta_x = _setup_axis(ox, dx, x)
+    step_y, t_max_y, t_delta_y = _setup_axis(oy, dy, y)
+    step_z, t_max_z, t_delta_z = _setup_axis(oz, dz, z)
+
+    while True:
+        previous = (x, y, z)
+        if t_max_x <= t_max_y and t_max_x <= t_max_z:
+            t = t_max_x; x += step_x; t_max_x += t_delta_x; normal = (-step_x, 0, 0)
+        elif t_max_y <= t_max_z:
+            t = t_max_y; y += step_y; t_max_y += t_delta_y; normal = (0, -step_y, 0)
+        else:
+            t = t_max_z; z += step_z; t_max_z += t_delta_z; normal = (0, 0, -step_z)
+        if t > max_distance:
+            return None
+        if world.get_block(x, y, z) != BlockType.EMPTY.value:
+            return RaycastHit((x, y, z), previous, normal, t)
+
+
+def raycast_voxels_batch(world, origins, directions, max_distance=5.0):
+    """
+    Casts many rays at once (e.g. for AI line-of-sight or tooling), stepping all rays in lockstep
+    with the same traversal as raycast_voxels and looking blocks up in one vectorized gather per step.
+
+    Args:
+        origins, directions (np.ndarray): (N, 3) ray starts and directions.
+        max_distance (float or np.ndarray): Maximum length, scalar or per ray.
+
+    Returns:
+        dict of np.ndarray: 'hit' (N,) bool, 'block' (N, 3), 'previous' (N, 3), 'has_previous' (N,) bool,
+        'normal' (N, 3), 'distance' (N,) — entries for rays that hit nothing are zero / inf. Like
+        raycast_voxels, a ray starting inside a solid block hits it at distance 0 with no previous
+        cell: has_previous is False and 'previous' is zero (do not place blocks there).
+    """
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    count = len(origins)
+    max_distance = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (count,))
+
+    lengths = np.linalg.norm(directions, axis=1)
+    valid = lengths > 0
+    directions = np.divide(directions, lengths[:, None], out=np.zeros_like(directions), where=valid[:, None])
+
+    shifted = origins + 0.5
+    cells = np.floor(shifted).astype(np.int64)
+    step = np.sign(directions).astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_delta = np.where(step != 0, 1.0 / np.abs(directions), np.inf)
+        t_max = np.where(step > 0, (cells + 1 - shifted) / directions,
+                         np.where(step < 0, (shifted - cells) / -directions, np.inf))
+
+    hit = np.zeros(count, dtype=bool)
+    hit_block = np.zeros((count, 3), dtype=np.int64)
+    hit_previous = np.zeros((count, 3), dtype=np.int64)
+    has_previous = np.zeros(count, dtype=bool)
+    hit_normal = np.zeros((count, 3), dtype=np.int64)
+    hit_distance = np.full(count, np.inf)
+
+    # Rays starting inside a solid block hit it at distance 0, with no previous cell
+    start_solid = valid & (world.get_blocks(cells[:, 0], cells[:, 1], cells[:, 2]) != BlockType.EMPTY.value)
+    hit[start_solid] = True
+    hit_block[start_solid] = cells[start_solid]
+    hit_distance[start_solid] = 0.0
+    active = np.flatnonzero(valid & ~start_solid)
+
+    while len(active):
+        axis = np.argmin(t_max[active], axis=1)
+        t = t_max[active, axis]
+        within = t <= max_distance[active]
+        active, axis, t = active[within], axis[within], t[within]
+        if not len(active):
+            break
+        previous = cells[active].copy()
+        cells[active, axis] += step[active, axis]
+        t_max[active, axis] += t_delta[active, axis]
+
+        current = cells[active]
+        solid = world.get_blocks(current[:, 0], current[:, 1], current[:, 2]) != BlockType.EMPTY.value
+        if solid.any():
+            rays = active[solid]
+            hit[rays] = True
+            hit_block[rays] = current[solid]
+            hit_previous[rays] = previous[solid]
+            has_previous[rays] = True
+            hit_normal[rays, axis[solid]] = -step[rays, axis[solid]]
+            hit_distance[rays] = t[solid]
+        active = active[~solid]
+
+    return {'hit': hit, 'block': hit_block, 'previous': hit_previous, 'has_previous': has_previous,
+            'normal': hit_normal, 'distance': hit_distance}
+
+
+class RaycastCache:
+    """
+    Caches one raycast result, reusing it while the ray origin, direction, range and the
+    world revision are unchanged (e.g. the crosshair target while the player stands still).
+    """
+
+    def __init__(self):
+        self._key = None
+        self._result = None
+        self.hits = 0
+        self.misses = 0
+
+    def cast(self, world, origin, direction, max_distance=5.0):
+        key = (tuple(origin), tuple(direction), max_distance, id(world), world.revision)
+        if key == self._key:
+            self.hits += 1
+            return self._result
+        self.misses += 1
+        self._result = raycast_voxels(world, origin, direction, max_distance)
+        self._key = key
+        return self._result
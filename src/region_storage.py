@@ -0,0 +1,338 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from .chunked_world import CHUNK_SIZE
+
+# Region files group REGION_SIZE^3 chunks. Layout:
+#   header:  magic (4s), format version (u16), block itemsize (u8), reserved (u8), padding to 16 bytes
+#   table:   one entry per chunk slot: sector offset (u32), sector count (u16), codec (u8), reserved (u8), payload bytes (u32)
+#   payload: per-chunk compressed data, each starting on a SECTOR_BYTES boundary
+# A slot with codec CODEC_NONE was never saved; CODEC_EMPTY records a saved all-EMPTY chunk (no payload).
+REGION_SHIFT = 3
+REGION_SIZE = 1 << REGION_SHIFT
+REGION_MASK = REGION_SIZE - 1
+REGION_MAGIC = b"VXRG"
+REGION_VERSION = 1
+SECTOR_BYTES = 256
+_PREAMBLE_FORMAT = "<4sHBB8x"
+_ENTRY_FORMAT = "<IHBBI"
+_PREAMBLE_BYTES = struct.calcsize(_PREAMBLE_FORMAT)
+_ENTRY_BYTES = struct.calcsize(_ENTRY_FORMAT)
+_HEADER_BYTES = _PREAMBLE_BYTES + _ENTRY_BYTES * REGION_SIZE ** 3
+_HEADER_SECTORS = -(-_HEADER_BYTES // SECTOR_BYTES)
+
+CODEC_NONE = 0
+CODEC_EMPTY = 1
+CODEC_ZLIB = 2
+CODEC_RLE = 3
+CODECS = {"zlib": CODEC_ZLIB, "rle": CODEC_RLE}
+
+LEVEL_FILE = "level.json"
+
+
+# --- Chunk codecs ---
+
+def encode_rle(blocks):
+    """Run-length encodes a block array (C order): run count (u32), run lengths (u16), run values."""
+    flat = np.ascontiguousarray(blocks).reshape(-1)
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(flat))).astype('<u2') # Chunks hold at most 4096 cells
+    values = flat[starts].astype(flat.dtype.newbyteorder('<'))
+    return struct.pack("<I", len(starts)) + lengths.tobytes() + values.tobytes()
+
+def decode_rle(payload, dtype):
+    dtype = np.dtype(dtype).newbyteorder('<')
+    (runs,) = struct.unpack_from("<I", payload, 0)
+    lengths = np.frombuffer(payload, dtype='<u2', count=runs, offset=4)
+    values = np.frombuffer(payload, dtype=dtype, count=runs, offset=4 + 2 * runs)
+    return np.repeat(values, lengths)
+
+def encode_chunk(blocks, codec):
+    """Returns (codec, payload bytes) for a chunk array; all-EMPTY chunks need no payload."""
+    if not blocks.any():
+        return CODEC_EMPTY, b""
+    if codec == CODEC_RLE:
+        return CODEC_RLE, encode_rle(blocks)
+    return CODEC_ZLIB, zlib.compress(np.ascontiguousarray(blocks).astype(blocks.dtype.newbyteorder('<')).tobytes(), 6)
+
+def decode_chunk(codec, payload, dtype):
+    """Inverse of encode_chunk; returns a (CHUNK_SIZE,)*3 array of the given dtype."""
+    shape = (CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+    if codec == CODEC_EMPTY:
+        return np.zeros(shape, dtype=dtype)
+    if codec == CODEC_RLE:
+        flat = decode_rle(payload, dtype)
+    elif codec == CODEC_ZLIB:
+        flat = np.frombuffer(zlib.decompress(payload), dtype=np.dtype(dtype).newbyteorder('<'))
+    else:
+        raise ValueError(f"Unknown chunk codec {codec}")
+    return flat.astype(dtype).reshape(shape)
+
+
+def region_coords(chunk_coord):
+    """Splits a chunk coordinate into (region coordinate, slot index within the region)."""
+    cx, cy, cz = chunk_coord
+    region = (cx >> REGION_SHIFT, cy >> REGION_SHIFT, cz >> REGION_SHIFT)
+    slot = ((cx & REGION_MASK) * REGION_SIZE + (cy & REGION_MASK)) * REGION_SIZE + (cz & REGION_MASK)
+    return region, slot
+
+
+class RegionFile:
+    """
+    One region file. Reads go through a read-only mmap, so opening a region only maps it and
+    reading a chunk touches just its table entry and payload pages. Writes go through the file
+    descriptor: a payload is rewritten in place when it still fits its sectors, otherwise it is
+    appended at the end of the file (the old sectors are abandoned), and the table entry is
+    updated last. All access is serialized by a per-file lock (readers and the writer thread).
+    """
+
+    def __init__(self, path, itemsize):
+        self.path = path
+        self.itemsize = itemsize
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(struct.pack(_PREAMBLE_FORMAT, REGION_MAGIC, REGION_VERSION, itemsize, 0))
+                f.truncate(_HEADER_SECTORS * SECTOR_BYTES)
+        self._fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        self._map = None
+        self._remap()
+        magic, version, file_itemsize, _ = struct.unpack_from(_PREAMBLE_FORMAT, self._map, 0)
+        if magic != REGION_MAGIC or version != REGION_VERSION:
+            raise ValueError(f"{path} is not a version {REGION_VERSION} region file")
+        if file_itemsize != itemsize:
+            raise ValueError(f"{path} stores {file_itemsize}-byte blocks, expected {itemsize}")
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+
+    def _entry(self, slot):
+        return struct.unpack_from(_ENTRY_FORMAT, self._map, _PREAMBLE_BYTES + slot * _ENTRY_BYTES)
+
+    def has_chunk(self, slot):
+        with self._lock:
+            return self._entry(slot)[2] != CODEC_NONE
+
+    def read_chunk(self, slot):
+        """Returns (codec, payload bytes) of a slot; codec is CODEC_NONE if it was never saved."""
+        with self._lock:
+            sector, _, codec, _, length = self._entry(slot)
+            if codec in (CODEC_NONE, CODEC_EMPTY):
+                return codec, b""
+            start = sector * SECTOR_BYTES
+            if start + length > len(self._map): # The file grew since it was mapped
+                self._remap()
+            return codec, self._map[start:start + length]
+
+    def write_chunk(self, slot, codec, payload):
+        with self._lock:
+            sector, sector_count, _, _, _ = self._entry(slot)
+            needed = -(-len(payload) // SECTOR_BYTES)
+            if needed == 0:
+                sector, sector_count = 0, 0
+            elif needed > sector_count or sector == 0:
+                sector = -(-os.fstat(self._fd).st_size // SECTOR_BYTES)
+                sector_count = needed
+            if payload:
+                os.lseek(self._fd, sector * SECTOR_BYTES, os.SEEK_SET)
+                os.write(self._fd, payload)
+                # Pad to the sector boundary so the next append starts aligned
+                os.write(self._fd, b"\0" * (sector_count * SECTOR_BYTES - len(payload)))
+            os.lseek(self._fd, _PREAMBLE_BYTES + slot * _ENTRY_BYTES, os.SEEK_SET)
+            os.write(self._fd, struct.pack(_ENTRY_FORMAT, sector, sector_count, codec, 0, len(payload)))
+
+    def saved_slots(self):
+        """Slots that hold a saved chunk (scans the table)."""
+        with self._lock:
+            return [slot for slot in range(REGION_SIZE ** 3) if self._entry(slot)[2] != CODEC_NONE]
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.close(self._fd)
+
+
+class WorldStorage:
+    """
+    Persists a ChunkedWorld as a directory of region files plus level.json (seed and metadata).
+
+    Only chunks edited since they were loaded or generated are saved: the storage remembers each
+    chunk's revision when it became clean (mark_clean) and save_dirty() compares it with
+    world.chunk_revision(). Chunks that were never saved are regenerated from the seed.
+    Encoding and file writes run on a background thread; the main thread only copies the
+    dirty chunk arrays. Opening a world reads level.json only; region files are opened on
+    first access.
+    """
+
+    def __init__(self, directory, dtype=np.uint8, codec="zlib"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}; use one of {sorted(CODECS)}")
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.codec = CODECS[codec]
+        os.makedirs(directory, exist_ok=True)
+        self.level = {}
+        level_path = os.path.join(directory, LEVEL_FILE)
+        if os.path.exists(level_path):
+            with open(level_path) as f:
+                self.level = json.load(f)
+            if self.level.get("chunk_size", CHUNK_SIZE) != CHUNK_SIZE:
+                raise ValueError(f"{directory} was saved with chunk size {self.level['chunk_size']}, not {CHUNK_SIZE}")
+
+        self._regions = {} # region coord -> RegionFile
+        self._regions_lock = threading.Lock()
+        self._clean_revisions = {} # chunk_coord -> world revision stamp when last loaded/saved
+        self._pending = {} # chunk_coord -> array snapshot queued for writing (served to readers until written)
+        self._pending_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="WorldStorageWriter", daemon=True)
+        self._writer.start()
+        # Counters
+        self.chunks_written = 0
+        self.chunks_read = 0
+
+    # --- Level metadata ---
+
+    def save_level(self, **values):
+        """Updates and writes level.json (e.g. seed, world_height, player position)."""
+        self.level.update(values, chunk_size=CHUNK_SIZE, dtype=self.dtype.name)
+        path = os.path.join(self.directory, LEVEL_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.level, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    # --- Regions ---
+
+    def _region(self, region_coord, create=False):
+        with self._regions_lock:
+            region = self._regions.get(region_coord)
+            if region is None:
+                path = os.path.join(self.directory, "r.{}.{}.{}.vxr".format(*region_coord))
+                if not create and not os.path.exists(path):
+                    return None
+                region = RegionFile(path, self.dtype.itemsize)
+                self._regions[region_coord] = region
+            return region
+
+    # --- Reading ---
+
+    def has_chunk(self, chunk_coord):
+        """True if the chunk has been saved (including saved as all-EMPTY)."""
+        with self._pending_lock:
+            if chunk_coord in self._pending:
+                return True
+        region_coord, slot = region_coords(chunk_coord)
+        region = self._region(region_coord)
+        return region is not None and region.has_chunk(slot)
+
+    def load_chunk(self, chunk_coord):
+        """Returns the saved block array of a chunk, or None if it was never saved."""
+        with self._pending_lock:
+            pending = self._pending.get(chunk_coord)
+        if pending is not None:
+            return pending.copy()
+        region_coord, slot = region_coords(chunk_coord)
+        region = self._region(region_coord)
+        if region is None:
+            return None
+        codec, payload = region.read_chunk(slot)
+        if codec == CODEC_NONE:
+            return None
+        self.chunks_read += 1
+        return decode_chunk(codec, payload, self.dtype)
+
+    def saved_chunk_coords(self):
+        """Coordinates of every saved chunk (scans all region tables; for fixed-size worlds)."""
+        coords = []
+        for name in os.listdir(self.directory):
+            parts = name.split(".")
+            if len(parts) != 5 or parts[0] != "r" or parts[4] != "vxr":
+                continue
+            rx, ry, rz = (int(p) for p in parts[1:4])
+            for slot in self._region((rx, ry, rz)).saved_slots():
+                lx, rest = divmod(slot, REGION_SIZE * REGION_SIZE)
+                ly, lz = divmod(rest, REGION_SIZE)
+                coords.append(((rx << REGION_SHIFT) + lx, (ry << REGION_SHIFT) + ly, (rz << REGION_SHIFT) + lz))
+        saved = set(coords)
+        with self._pending_lock:
+            coords.extend(c for c in self._pending if c not in saved)
+        return coords
+
+    # --- Dirty tracking ---
+
+    def mark_clean(self, chunk_coord, revision):
+        """Records that the chunk at this world revision stamp matches what is saved (or generated)."""
+        self._clean_revisions[chunk_coord] = revision
+
+    def forget(self, chunk_coord):
+        """Drops dirty tracking for an unloaded chunk."""
+        self._clean_revisions.pop(chunk_coord, None)
+
+    def mark_all_clean(self, world):
+        """Marks every loaded chunk of the world clean (e.g. after generating and loading a fixed-size world)."""
+        for chunk_coord, revision in world.chunk_revisions.items():
+            self._clean_revisions[chunk_coord] = revision
+
+    def is_dirty(self, world, chunk_coord):
+        return world.chunk_revision(chunk_coord) != self._clean_revisions.get(chunk_coord, 0)
+
+    # --- Writing ---
+
+    def save_chunk(self, world, chunk_coord):
+        """Queues one chunk for writing if it changed since it was loaded/saved. Returns True if queued."""
+        if not self.is_dirty(world, chunk_coord):
+            return False
+        chunk = world.get_chunk(chunk_coord)
+        snapshot = chunk.copy() if chunk is not None else np.zeros((CHUNK_SIZE,) * 3, dtype=self.dtype)
+        with self._pending_lock:
+            self._pending[chunk_coord] = snapshot
+        self._queue.put((chunk_coord, snapshot))
+        self.mark_clean(chunk_coord, world.chunk_revision(chunk_coord))
+        return True
+
+    def save_dirty(self, world):
+        """Queues every loaded chunk that changed since it was loaded/saved. Returns the number queued."""
+        return sum(self.save_chunk(world, chunk_coord) for chunk_coord in list(world.chunk_revisions))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                chunk_coord, snapshot = item
+                codec, payload = encode_chunk(snapshot, self.codec)
+                region_coord, slot = region_coords(chunk_coord)
+                self._region(region_coord, create=True).write_chunk(slot, codec, payload)
+                self.chunks_written += 1
+                with self._pending_lock:
+                    if self._pending.get(chunk_coord) is snapshot: # Not re-queued meanwhile
+                        del self._pending[chunk_coord]
+            except Exception as e:
+                print(f"Error: Failed to save chunk {item[0]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Blocks until every queued chunk is written."""
+        self._queue.join()
+
+    def close(self):
+        """Writes outstanding chunks, stops the writer thread and closes the region files."""
+        self._queue.put(None)
+        self._writer.join()
+        with self._regions_lock:
+            for region in self._regions.values():
+                region.close()
+            self._regions.clear()
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+
+from .meshing import chunks_touching_block
+
+
+class ChunkRebuildQueue:
+    """
+    Tracks which chunks need their mesh rebuilt and rebuilds them incrementally.
+
+    Edits mark chunks dirty (the edited chunk plus border neighbours); drain() then
+    rebuilds queued chunks until a per-frame time budget is spent, so an edit never
+    rebuilds the whole world or stalls a frame. A chunk queued several times is rebuilt once.
+    """
+
+    def __init__(self, rebuild_chunk):
+        """
+        Args:
+            rebuild_chunk (callable): rebuild_chunk(chunk_coord) builds and uploads one chunk mesh.
+        """
+        self.rebuild_chunk = rebuild_chunk
+        self._queue = OrderedDict() # chunk_coord -> None, insertion-ordered set
+        # Counters
+        self.total_rebuilds = 0
+        self.total_rebuild_time = 0.0
+        self.max_rebuild_time = 0.0
+        self.last_drain_count = 0
+        self.last_drain_time = 0.0
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def is_dirty(self, chunk_coord):
+        return chunk_coord in self._queue
+
+    def mark_dirty(self, chunk_coord):
+        """Queues a chunk for rebuilding (no-op if it is already queued)."""
+        self._queue[chunk_coord] = None
+
+    def mark_many_dirty(self, chunk_coords):
+        for chunk_coord in chunk_coords:
+            self._queue[chunk_coord] = None
+
+    def mark_block_dirty(self, x, y, z):
+        """Queues every chunk whose mesh depends on block (x, y, z)."""
+        self.mark_many_dirty(chunks_touching_block(x, y, z))
+
+    def discard(self, chunk_coord):
+        """Drops a chunk from the queue, e.g. when it is unloaded."""
+        self._queue.pop(chunk_coord, None)
+
+    def drain(self, budget_seconds=None, priority_point=None):
+        """
+        Rebuilds queued chunks until the queue is empty or the time budget is used up.
+        At least one chunk is rebuilt per call so the queue always makes progress.
+
+        Args:
+            budget_seconds (float, optional): Time budget for this call. None means no limit.
+            priority_point (tuple, optional): Chunk coordinate to rebuild nearest-first around
+                (e.g. the camera's chunk). Defaults to queue order.
+
+        Returns:
+            int: Number of chunks rebuilt.
+        """
+        start = time.perf_counter()
+        rebuilt = 0
+        if priority_point is not None and len(self._queue) > 1:
+            px, py, pz = priority_point
+            ordered = sorted(self._queue, key=lambda c: (c[0] - px) ** 2 + (c[1] - py) ** 2 + (c[2] - pz) ** 2)
+            self._queue = OrderedDict.fromkeys(ordered)
+
+        while self._queue:
+            chunk_coord, _ = self._queue.popitem(last=False)
+            rebuild_start = time.perf_counter()
+            self.rebuild_chunk(chunk_coord)
+            rebuild_time = time.perf_counter() - rebuild_start
+            rebuilt += 1
+            self.total_rebuilds += 1
+            self.total_rebuild_time += rebuild_time
+            self.max_rebuild_time = max(self.max_rebuild_time, rebuild_time)
+            if budget_seconds is not None and time.perf_counter() - start >= budget_seconds:
+                break
+
+        self.last_drain_count = rebuilt
+        self.last_drain_time = time.perf_counter() - start
+        return rebuilt
+
+    def stats(self):
+        """Returns the queue counters as a dict (for debug output)."""
+        return {
+            'queue_depth': len(self._queue),
+            'total_rebuilds': self.total_rebuilds,
+            'avg_rebuild_ms': (self.total_rebuild_time / self.total_rebuilds * 1000.0) if self.total_rebuilds else 0.0,
+            'max_rebuild_ms': self.max_rebuild_time * 1000.0,
+            'last_drain_count': self.last_drain_count,
+            'last_drain_ms': self.last_drain_time * 1000.0,
+        }
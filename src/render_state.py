@@ -0,0 +1,153 @@
+from OpenGL.GL import *
+import numpy as np
+
+# Shadow copy of the GL binding state. All program/VAO/texture binds and uniform writes of the
+# renderer go through this module, which skips calls that would not change anything. Code that
+# binds these objects directly must call invalidate() afterwards.
+_state = {
+    'program': None,
+    'vertex_array': None,
+    'active_texture_unit': None,
+    'textures': {}, # (unit, target) -> texture id
+    'uniforms': {}, # (program, location) -> last value written (bytes)
+}
+
+# Per-kind counts of GL calls issued and skipped as redundant
+state_stats = {kind: {'issued': 0, 'skipped': 0} for kind in ('program', 'vertex_array', 'texture', 'uniform', 'frame_constants')}
+
+# std140 block shared by the world shaders, bound once to FRAME_CONSTANTS_BINDING:
+#   mat4 view (offset 0), mat4 projection (64), vec4 lightDir (128, xyz used), float ambientStrength (144)
+FRAME_CONSTANTS_BLOCK = "FrameConstants"
+FRAME_CONSTANTS_BINDING = 0
+FRAME_CONSTANTS_FLOATS = 40 # 148 bytes of data, padded to a multiple of 16
+_frame_constants = {'buffer_id': None, 'data': None}
+
+
+def _count(kind, issued):
+    state_stats[kind]['issued' if issued else 'skipped'] += 1
+
+def reset_stats():
+    for counts in state_stats.values():
+        counts['issued'] = counts['skipped'] = 0
+
+def invalidate():
+    """Forgets the tracked bindings, e.g. after code outside this module changed GL state."""
+    _state['program'] = None
+    _state['vertex_array'] = None
+    _state['active_texture_unit'] = None
+    _state['textures'].clear()
+
+
+# --- Bindings ---
+
+def use_program(program_id):
+    if _state['program'] == program_id:
+        _count('program', False)
+        return
+    glUseProgram(program_id)
+    _state['program'] = program_id
+    _count('program', True)
+
+def bind_vertex_array(vao_id):
+    if _state['vertex_array'] == vao_id:
+        _count('vertex_array', False)
+        return
+    glBindVertexArray(vao_id)
+    _state['vertex_array'] = vao_id
+    _count('vertex_array', True)
+
+def bind_texture(unit, texture_id, target=GL_TEXTURE_2D):
+    """Binds a texture to a texture unit index (0 for GL_TEXTURE0), switching the active unit only if needed."""
+    if _state['textures'].get((unit, target)) == texture_id:
+        _count('texture', False)
+        return
+    if _state['active_texture_unit'] != unit:
+        glActiveTexture(GL_TEXTURE0 + unit)
+        _state['active_texture_unit'] = unit
+    glBindTexture(target, texture_id)
+    _state['textures'][(unit, target)] = texture_id
+    _count('texture', True)
+
+def forget_program(program_id):
+    """Call when deleting a program, so a new object reusing the id is not mistaken for it."""
+    if _state['program'] == program_id:
+        _state['program'] = None
+    for key in [k for k in _state['uniforms'] if k[0] == program_id]:
+        del _state['uniforms'][key]
+
+def forget_vertex_array(vao_id):
+    if _state['vertex_array'] == vao_id:
+        _state['vertex_array'] = None
+
+def forget_texture(texture_id):
+    for key in [k for k, v in _state['textures'].items() if v == texture_id]:
+        del _state['textures'][key]
+
+
+# --- Uniforms (of the program currently bound with use_program) ---
+
+def _set_uniform(location, value, setter):
+    key = (_state['program'], location)
+    if _state['uniforms'].get(key) == value:
+        _count('uniform', False)
+        return False
+    _state['uniforms'][key] = value
+    _count('uniform', True)
+    setter()
+    return True
+
+def set_uniform_1i(location, value):
+    _set_uniform(location, ('1i', int(value)), lambda: glUniform1i(location, value))
+
+def set_uniform_1f(location, value):
+    _set_uniform(location, ('1f', float(value)), lambda: glUniform1f(location, value))
+
+def set_uniform_3f(location, x, y, z):
+    _set_uniform(location, ('3f', float(x), float(y), float(z)), lambda: glUniform3f(location, x, y, z))
+
+def set_uniform_matrix4(location, matrix):
+    """Sets a GL-layout 4x4 matrix (see camera.py) with transpose=GL_FALSE."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    _set_uniform(location, ('m4', matrix.tobytes()), lambda: glUniformMatrix4fv(location, 1, GL_FALSE, matrix))
+
+
+# --- Per-frame constants (uniform buffer) ---
+
+def create_frame_constants_buffer():
+    """Creates the FrameConstants uniform buffer and attaches it to FRAME_CONSTANTS_BINDING."""
+    buffer_id = glGenBuffers(1)
+    glBindBuffer(GL_UNIFORM_BUFFER, buffer_id)
+    glBufferData(GL_UNIFORM_BUFFER, FRAME_CONSTANTS_FLOATS * 4, None, GL_DYNAMIC_DRAW)
+    glBindBuffer(GL_UNIFORM_BUFFER, 0)
+    glBindBufferBase(GL_UNIFORM_BUFFER, FRAME_CONSTANTS_BINDING, buffer_id)
+    _frame_constants['buffer_id'] = buffer_id
+    _frame_constants['data'] = None
+    return buffer_id
+
+def bind_frame_constants_block(program_id):
+    """Points a program's FrameConstants block at the shared binding (once, after linking)."""
+    block_index = glGetUniformBlockIndex(program_id, FRAME_CONSTANTS_BLOCK)
+    if block_index != GL_INVALID_INDEX:
+        glUniformBlockBinding(program_id, block_index, FRAME_CONSTANTS_BINDING)
+
+def update_frame_constants(view_matrix, projection_matrix, light_direction, ambient_strength):
+    """Uploads the per-frame constants, unless they are identical to what the buffer already holds."""
+    data = np.zeros(FRAME_CONSTANTS_FLOATS, dtype=np.float32)
+    data[0:16] = np.asarray(view_matrix, dtype=np.float32).reshape(-1) # GL layout is std140's column-major
+    data[16:32] = np.asarray(projection_matrix, dtype=np.float32).reshape(-1)
+    data[32:35] = light_direction
+    data[36] = ambient_strength
+    if _frame_constants['data'] is not None and np.array_equal(_frame_constants['data'], data):
+        _count('frame_constants', False)
+        return
+    glBindBuffer(GL_UNIFORM_BUFFER, _frame_constants['buffer_id'])
+    glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+    glBindBuffer(GL_UNIFORM_BUFFER, 0)
+    _frame_constants['data'] = data
+    _count('frame_constants', True)
+
+def delete_frame_constants_buffer():
+    if _frame_constants['buffer_id']:
+        glDeleteBuffers(1, [_frame_constants['buffer_id']])
+    _frame_constants['buffer_id'] = None
+    _frame_constants['data'] = None
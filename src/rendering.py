@@ -4,14 +4,21 @@ from OpenGL.GL import sizeof, GLfloat # For VAO configuration
 import ctypes # For VAO configuration
 import pygame
 import numpy as np
-import math
+import mmap
+import os
 
-from .assets import (std_cube_vertices, std_cube_faces, face_normals, tex_coords, cube_edges,
-                     get_interleaved_cube_vertex_data, create_vbo, ATLAS_UV_COORDINATES) # Added VBO functions and ATLAS_UV_COORDINATES
-from .config import LIGHT_DIRECTION, AMBIENT_LIGHT_STRENGTH, WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH 
+from .assets import (std_cube_faces, face_normals, tex_coords,
+                     get_interleaved_cube_vertex_data, create_vbo, ATLAS_UV_COORDINATES, ATLAS_MANIFEST,
+                     ATLAS_MANIFEST_PATH) # Added VBO functions and ATLAS_UV_COORDINATES
+from .config import LIGHT_DIRECTION, AMBIENT_LIGHT_STRENGTH, WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH, PACKED_CHUNK_VERTICES
 from .world_management import is_block_solid 
-from .block_type import BlockType, BLOCK_COLORS 
 from .shader_utils import create_shader_program # For loading shaders
+from .meshing import (CHUNK_VERTEX_FLOATS, PACKED_VERTEX_WORDS, BLOCK_INSTANCE_FLOATS, BLOCK_UV_TABLE,
+                      AO_LEVEL_FACTORS)
+from .lighting import LIGHT_LEVEL_FACTORS
+from .chunked_world import chunk_origin
+from .camera import extract_frustum_planes
+from . import render_state
 
 # Module-level variables for rendering pipeline
 texture_atlas_id = None
@@ -20,24 +27,13 @@ cube_vertex_count = 0 # Set by init_generic_cube_vbo
 shader_program_id = None
 cube_vao_id = None
 uniform_locations = {}
+packed_program_id = None # Variant of the world shader for packed chunk vertices (PACKED_CHUNK_VERTICES)
+packed_uniform_locations = {}
+chunk_meshes = {} # chunk_coord -> (vao_id, vbo_id, vertex_count)
+chunk_instance_batches = {} # chunk_coord -> (vao_id, instance_vbo_id, instance_count)
 
-# --- Old Utility Functions (to be commented out/removed) ---
-
-# def dot_product(vec1, vec2):
-#     return sum(a * b for a, b in zip(vec1, vec2))
-
-# def get_vertex_ao_factor(v_world_x, v_world_y, v_world_z): # Calculates AO factor for a vertex
-#     num_occluders = 0
-#     for sx_offset in [-0.5, 0.5]:
-#         for sy_offset in [-0.5, 0.5]:
-#             for sz_offset in [-0.5, 0.5]:
-#                 check_x = math.floor(v_world_x + sx_offset)
-#                 check_y = math.floor(v_world_y + sy_offset)
-#                 check_z = math.floor(v_world_z + sz_offset)
-#                 if is_block_solid(check_x, check_y, check_z):
-#                     num_occluders += 1
-#     ao_factor = 1.0 - num_occluders * 0.075 
-#     return max(0.3, ao_factor) 
+# Vertex ambient occlusion used to be sampled per vertex at draw time (8 is_block_solid calls each);
+# it is now baked into chunk meshes in bulk, see meshing._corner_ao_levels.
 
 # --- VBO Initialization (already exists) ---
 def init_generic_cube_vbo():
@@ -83,19 +79,19 @@ def init_rendering_pipeline():
         # Potentially fall back to old rendering or exit
         return False
 
-    # Get uniform locations
+    # Get uniform locations. View, projection and lighting live in the FrameConstants uniform buffer.
     uniform_locations['model'] = glGetUniformLocation(shader_program_id, "model")
-    uniform_locations['view'] = glGetUniformLocation(shader_program_id, "view")
-    uniform_locations['projection'] = glGetUniformLocation(shader_program_id, "projection")
     uniform_locations['textureSampler'] = glGetUniformLocation(shader_program_id, "textureSampler")
-    uniform_locations['lightDir'] = glGetUniformLocation(shader_program_id, "lightDir")
-    uniform_locations['ambientStrength'] = glGetUniformLocation(shader_program_id, "ambientStrength")
-    uniform_locations['uv_offset_scale'] = glGetUniformLocation(shader_program_id, "uv_offset_scale")
+    render_state.bind_frame_constants_block(shader_program_id)
+    render_state.create_frame_constants_buffer()
+    if PACKED_CHUNK_VERTICES and not init_packed_chunk_program():
+        return False
+    # The atlas rect is vertex attribute 4 (per-vertex in chunk meshes, constant for single blocks)
     # uniform_locations['vertex_ao_factors_array'] = glGetUniformLocation(shader_program_id, "vertex_ao_factors_array") # AO temporarily removed
 
     # Create and configure VAO
     cube_vao_id = glGenVertexArrays(1)
-    glBindVertexArray(cube_vao_id)
+    render_state.bind_vertex_array(cube_vao_id)
 
     glBindBuffer(GL_ARRAY_BUFFER, cube_vbo_id) # VBO is already populated by init_generic_cube_vbo
 
@@ -110,86 +106,138 @@ def init_rendering_pipeline():
     # Texture Coords (loc 2)
     glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * sizeof(GLfloat)))
     glEnableVertexAttribArray(2)
-    # AO Factor (loc 3) - attribute is disabled in shader and data removed from VBO for now
+    # AO Factor (loc 3) - baked into chunk meshes only; the generic cube has none
 
     glBindBuffer(GL_ARRAY_BUFFER, 0)
-    glBindVertexArray(0)
+    render_state.bind_vertex_array(0)
+
+    # Attributes without a buffer in a VAO read these constant values:
+    # AO (loc 3) is fully lit, the instance offset (loc 5) is zero unless drawing instanced,
+    # and light (loc 6) is full sky light and no block light
+    glVertexAttrib1f(3, 1.0)
+    glVertexAttrib3f(5, 0.0, 0.0, 0.0)
+    glVertexAttrib2f(6, 1.0, 0.0)
     
     print("Rendering pipeline initialized (Shaders, VAO).")
     return shader_program_id, cube_vao_id
 
 
-# --- Texture Loading and Text Rendering ---
+def init_packed_chunk_program():
+    """
+    Creates the world shader variant that unpacks chunk vertices in the packed layout (see
+    meshing.pack_chunk_vertices) and fills its lookup tables, which never change afterwards.
+    """
+    global packed_program_id
+    try:
+        packed_program_id = create_shader_program("shaders/basic_vertex.glsl", "shaders/basic_fragment.glsl",
+                                                  defines={"PACKED_VERTICES": None, "TILE_COUNT": len(BLOCK_UV_TABLE)})
+        if not packed_program_id:
+            raise Exception("Failed to create packed vertex shader program.")
+    except Exception as e:
+        print(f"CRITICAL: Rendering pipeline initialization failed during shader program creation: {e}")
+        return False
+
+    for name in ("textureSampler", "chunkOrigin", "tileRects", "faceNormals", "aoFactors", "lightFactors"):
+        packed_uniform_locations[name] = glGetUniformLocation(packed_program_id, name)
+    render_state.bind_frame_constants_block(packed_program_id)
+    render_state.use_program(packed_program_id)
+    glUniform4fv(packed_uniform_locations['tileRects'], len(BLOCK_UV_TABLE), BLOCK_UV_TABLE)
+    glUniform3fv(packed_uniform_locations['faceNormals'], len(face_normals), np.array(face_normals, dtype=np.float32))
+    glUniform1fv(packed_uniform_locations['aoFactors'], len(AO_LEVEL_FACTORS), AO_LEVEL_FACTORS)
+    glUniform1fv(packed_uniform_locations['lightFactors'], len(LIGHT_LEVEL_FACTORS), LIGHT_LEVEL_FACTORS)
+    render_state.use_program(0)
+    return True
+
+
+# --- Texture Loading ---
 
 def load_main_texture_atlas():
-    """Loads the main texture atlas and stores its ID."""
+    """
+    Loads the main texture atlas and stores its ID. Uses the precomputed mip chain listed in the
+    atlas manifest when there is one, otherwise decodes atlas.png and builds mipmaps on the CPU.
+    """
     global texture_atlas_id
-    texture_atlas_id = load_texture("textures/atlas.png")
+    texture_atlas_id = None
+    if ATLAS_MANIFEST and "mip_chain" in ATLAS_MANIFEST:
+        mip_chain_path = os.path.join(os.path.dirname(ATLAS_MANIFEST_PATH), ATLAS_MANIFEST["mip_chain"]["file"])
+        texture_atlas_id = load_mip_chain_texture(mip_chain_path, ATLAS_MANIFEST["mip_chain"]["levels"])
+    if texture_atlas_id is None:
+        texture_atlas_id = load_texture("textures/atlas.png")
     if texture_atlas_id is None:
         print("CRITICAL: Failed to load texture atlas 'textures/atlas.png'. Game may not render correctly.")
     # else:
         # print(f"Texture atlas loaded successfully. ID: {texture_atlas_id}")
     return texture_atlas_id
 
+def load_mip_chain_texture(filename, levels):
+    """
+    Creates a mipmapped RGBA texture from a raw mip chain file (see create_texture.write_mip_chain).
+    The file is memory-mapped and each level is handed to glTexImage2D as is: no decoding, no
+    CPU mip generation and no intermediate copies.
+
+    Args:
+        filename (str): Path of the raw pixel file.
+        levels (list): Manifest entries {"level", "width", "height", "offset", "size"}, level 0 first.
+
+    Returns:
+        int or None: The texture ID, or None if the file is missing or does not match the manifest.
+    """
+    try:
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pixels:
+            if any(level["offset"] + level["size"] > len(pixels) or level["size"] != level["width"] * level["height"] * 4
+                   for level in levels):
+                print(f"Warning: Mip chain '{filename}' does not match the atlas manifest. Rebuild it with create_texture.py.")
+                return None
+            tex_id = glGenTextures(1); render_state.bind_texture(0, tex_id)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT); glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+            for level in levels:
+                level_pixels = np.frombuffer(pixels, dtype=np.uint8, count=level["size"], offset=level["offset"])
+                glTexImage2D(GL_TEXTURE_2D, level["level"], GL_RGBA, level["width"], level["height"], 0,
+                             GL_RGBA, GL_UNSIGNED_BYTE, level_pixels)
+                del level_pixels # The mmap cannot close while a view of it is alive
+            return tex_id
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load mip chain '{filename}': {e}")
+        return None
+
 def load_texture(filename):
     try:
         surf = pygame.image.load(filename); data = pygame.image.tostring(surf, 'RGBA', True)
         w, h = surf.get_width(), surf.get_height()
     except Exception as e: print(f"Error loading texture {filename}: {e}"); return None
-    tex_id = glGenTextures(1); glBindTexture(GL_TEXTURE_2D, tex_id)
+    tex_id = glGenTextures(1); render_state.bind_texture(0, tex_id)
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
     glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT); glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
     gluBuild2DMipmaps(GL_TEXTURE_2D, GL_RGBA, w, h, GL_RGBA, GL_UNSIGNED_BYTE, data)
     return tex_id
 
-def text_to_texture(text, font, color=(255, 255, 255)):
-    text_surface = font.render(text, True, color); text_data = pygame.image.tostring(text_surface, "RGBA", True)
-    width, height = text_surface.get_width(), text_surface.get_height()
-    tex_id = glGenTextures(1); glBindTexture(GL_TEXTURE_2D, tex_id)
-    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR); glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
-    return tex_id, width, height
-
 # --- Frustum Culling ---
 
-def get_frustum_planes():
-    mvm = np.array(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4,4, order='F') 
-    pm = np.array(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4,4, order='F')  
-    clip_matrix_col_major = np.dot(pm, mvm) 
-    clip_matrix = clip_matrix_col_major.T 
-
-    planes = []
-    planes.append(clip_matrix[3] + clip_matrix[0]) # Left
-    planes.append(clip_matrix[3] - clip_matrix[0]) # Right
-    planes.append(clip_matrix[3] + clip_matrix[1]) # Bottom
-    planes.append(clip_matrix[3] - clip_matrix[1]) # Top
-    planes.append(clip_matrix[3] + clip_matrix[2]) # Near
-    planes.append(clip_matrix[3] - clip_matrix[2]) # Far
-
-    normalized_planes = []
-    for plane in planes:
-        magnitude = np.sqrt(plane[0]**2 + plane[1]**2 + plane[2]**2)
-        if magnitude == 0: 
-            normalized_planes.append(plane) 
-            continue
-        normalized_planes.append(plane / magnitude)
-    return normalized_planes
+def get_frustum_planes(view_matrix=None, projection_matrix=None):
+    """
+    Returns the six normalized frustum planes (Left, Right, Bottom, Top, Near, Far).
+    Pass the camera's view/projection matrices (GL layout, see camera.py) to avoid reading
+    the fixed-function matrices back from the driver; without them the GL state is queried.
+    """
+    if view_matrix is None or projection_matrix is None:
+        view_matrix = np.array(glGetDoublev(GL_MODELVIEW_MATRIX)).reshape(4, 4)
+        projection_matrix = np.array(glGetDoublev(GL_PROJECTION_MATRIX)).reshape(4, 4)
+    return extract_frustum_planes(view_matrix, projection_matrix)
 
 def is_block_in_frustum(block_world_x, block_world_y, block_world_z, frustum_planes):
+    """Scalar test of one unit block against all six planes. See culling.py for batched versions."""
     half_extent = 0.5 
-    for plane_idx, plane in enumerate(frustum_planes):
+    for plane in frustum_planes:
         # Indices: 0:Left, 1:Right, 2:Bottom, 3:Top, 4:Near, 5:Far
-        if plane_idx not in [4, 5]: # Only check Near and Far planes for now
-            continue
-
         nx, ny, nz, d_plane = plane[0], plane[1], plane[2], plane[3]
         r_eff = half_extent * (abs(nx) + abs(ny) + abs(nz))
         dist_center_to_plane = nx * block_world_x + ny * block_world_y + nz * block_world_z + d_plane
         
         if dist_center_to_plane < -r_eff:
-            # Optional: print a message when a block is culled by Near/Far
-            # print(f"Block ({block_world_x},{block_world_y},{block_world_z}) culled by plane {plane_idx}")
             return False 
     return True
 
@@ -229,6 +277,17 @@ def is_block_in_frustum(block_world_x, block_world_y, block_world_z, frustum_pla
 #     # if current_block_texture_id: glBindTexture(GL_TEXTURE_2D, 0)
 #     # glPopMatrix()
 
+def begin_world_pass(view_matrix, projection_matrix, packed=False):
+    """
+    Binds the world shader (its packed vertex variant with packed=True) and atlas and makes sure
+    the frame constants hold these matrices.
+    """
+    program_id, locations = (packed_program_id, packed_uniform_locations) if packed else (shader_program_id, uniform_locations)
+    render_state.use_program(program_id)
+    render_state.update_frame_constants(view_matrix, projection_matrix, LIGHT_DIRECTION, AMBIENT_LIGHT_STRENGTH)
+    render_state.bind_texture(0, texture_atlas_id)
+    render_state.set_uniform_1i(locations['textureSampler'], 0)
+
 def draw_block_glsl(block_world_x, block_world_y, block_world_z, block_type_enum, view_matrix, projection_matrix):
     global shader_program_id, cube_vao_id, texture_atlas_id, uniform_locations, cube_vertex_count
 
@@ -236,26 +295,15 @@ def draw_block_glsl(block_world_x, block_world_y, block_world_z, block_type_enum
         print("Error: Shader, VAO, or VBO not initialized for draw_block_glsl.")
         return
 
-    glUseProgram(shader_program_id)
-    glBindVertexArray(cube_vao_id)
+    # Program, atlas, sampler and frame constants are only sent to GL when they actually change,
+    # so drawing many blocks in a row only pays for the model matrix and the atlas rect
+    begin_world_pass(view_matrix, projection_matrix)
+    render_state.bind_vertex_array(cube_vao_id)
 
     # Set Model Matrix
     model_m = np.identity(4, dtype=np.float32)
     model_m[3,0:3] = [block_world_x, block_world_y, block_world_z]
-    glUniformMatrix4fv(uniform_locations['model'], 1, GL_FALSE, model_m)
-
-    # Set View and Projection Matrices (passed as arguments)
-    glUniformMatrix4fv(uniform_locations['view'], 1, GL_FALSE, view_matrix)
-    glUniformMatrix4fv(uniform_locations['projection'], 1, GL_FALSE, projection_matrix)
-
-    # Set Texture Atlas Sampler
-    glActiveTexture(GL_TEXTURE0)
-    glBindTexture(GL_TEXTURE_2D, texture_atlas_id)
-    glUniform1i(uniform_locations['textureSampler'], 0)
-
-    # Set Lighting Uniforms
-    glUniform3fv(uniform_locations['lightDir'], 1, LIGHT_DIRECTION)
-    glUniform1f(uniform_locations['ambientStrength'], AMBIENT_LIGHT_STRENGTH)
+    render_state.set_uniform_matrix4(uniform_locations['model'], model_m)
 
     # Set UV Transform Uniforms
     block_name = block_type_enum.name.lower()
@@ -264,81 +312,197 @@ def draw_block_glsl(block_world_x, block_world_y, block_world_z, block_type_enum
         u_min, v_min, u_max, v_max = uv_coords
         uv_offset = [u_min, v_min]
         uv_scale = [u_max - u_min, v_max - v_min]
-        glUniform4f(uniform_locations['uv_offset_scale'], uv_offset[0], uv_offset[1], uv_scale[0], uv_scale[1])
+        glVertexAttrib4f(4, uv_offset[0], uv_offset[1], uv_scale[0], uv_scale[1])
     else:
         # Default to full texture if not found (or a specific part like stone)
-        glUniform4f(uniform_locations['uv_offset_scale'], 0.0, 0.0, 1.0, 1.0)
+        glVertexAttrib4f(4, 0.0, 0.0, 1.0, 1.0)
         print(f"Warning: UV coordinates for block type '{block_name}' not found in ATLAS_UV_COORDINATES. Using default UVs.")
 
     # Draw the cube
     glDrawArrays(GL_TRIANGLES, 0, cube_vertex_count) # cube_vertex_count should be 36
 
-    glBindVertexArray(0)
-    glUseProgram(0)
 
+# --- Chunk Mesh Rendering ---
 
-def draw_wireframe_cube_at(pos_x, pos_y, pos_z):
-    glPushMatrix(); glTranslatef(float(pos_x), float(pos_y), float(pos_z))
-    glDisable(GL_TEXTURE_2D); glColor3f(0.0,0.0,0.0); glLineWidth(2.0)
-    glBegin(GL_LINES)
-    for edge in cube_edges:
-        for v_idx in edge: glVertex3fv(std_cube_vertices[v_idx])
-    glEnd(); glPopMatrix()
+def upload_chunk_mesh(chunk_coord, vertex_data):
+    """
+    Uploads the mesh of one chunk (see meshing.build_chunk_mesh) into its own VBO/VAO,
+    replacing any previous mesh for that chunk. Empty meshes just free the old buffers.
+    With PACKED_CHUNK_VERTICES the mesh must be in the packed layout (build_chunk_mesh(..., packed=True)).
+    """
+    delete_chunk_mesh(chunk_coord)
+    if vertex_data is None or len(vertex_data) == 0:
+        return
 
-# --- UI Drawing Functions ---
+    vertex_data = np.ascontiguousarray(vertex_data, dtype=np.uint32 if PACKED_CHUNK_VERTICES else np.float32)
+    vbo_id = create_vbo(vertex_data)
+    if not vbo_id:
+        print(f"Error: Failed to create VBO for chunk {chunk_coord}.")
+        return
 
-def draw_hotbar(screen_width, screen_height, font, hotbar_slots_types, player_inventory, current_selection_idx):
-    glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity()
-    gluOrtho2D(0, screen_width, 0, screen_height)
-    glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
-    glDisable(GL_DEPTH_TEST); glDisable(GL_CULL_FACE); glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    
-    slot_size=50; padding=5; num_slots=len(hotbar_slots_types); hotbar_width=num_slots*slot_size+(num_slots-1)*padding
-    start_x=(screen_width-hotbar_width)/2; start_y=20
-    
-    glColor4f(0.2,0.2,0.2,0.7); glBegin(GL_QUADS); glVertex2f(start_x-padding,start_y-padding); glVertex2f(start_x+hotbar_width+padding,start_y-padding); glVertex2f(start_x+hotbar_width+padding,start_y+slot_size+padding); glVertex2f(start_x-padding,start_y+slot_size+padding); glEnd()
-    
-    for i, block_type_enum in enumerate(hotbar_slots_types): # block_type_enum is a BlockType instance
-        slot_x = start_x+i*(slot_size+padding)
-        glColor4f(0.4,0.4,0.4,0.7); glBegin(GL_QUADS); glVertex2f(slot_x,start_y); glVertex2f(slot_x+slot_size,start_y); glVertex2f(slot_x+slot_size,start_y+slot_size); glVertex2f(slot_x,start_y+slot_size); glEnd()
-        
-        block_color=BLOCK_COLORS.get(block_type_enum,(100,100,100)); glColor3ub(*block_color); inner_pad=5
-        glBegin(GL_QUADS); glVertex2f(slot_x+inner_pad,start_y+inner_pad); glVertex2f(slot_x+slot_size-inner_pad,start_y+inner_pad); glVertex2f(slot_x+slot_size-inner_pad,start_y+slot_size-inner_pad); glVertex2f(slot_x+inner_pad,start_y+slot_size-inner_pad); glEnd()
-        
-        glColor3f(1,1,1); quantity=player_inventory.get(block_type_enum.value,0) # Use .value here
-        if quantity > 0:
-            qty_tex_id,qty_w,qty_h=text_to_texture(str(quantity),font,(255,255,255))
-            glEnable(GL_TEXTURE_2D); glBindTexture(GL_TEXTURE_2D,qty_tex_id)
-            glBegin(GL_QUADS); glTexCoord2f(0,0); glVertex2f(slot_x+slot_size-qty_w-2,start_y+2); glTexCoord2f(1,0); glVertex2f(slot_x+slot_size-2,start_y+2); glTexCoord2f(1,1); glVertex2f(slot_x+slot_size-2,start_y+qty_h+2); glTexCoord2f(0,1); glVertex2f(slot_x+slot_size-qty_w-2,start_y+qty_h+2); glEnd()
-            glDisable(GL_TEXTURE_2D); glDeleteTextures(1,[qty_tex_id])
-            
-        if i == current_selection_idx:
-            glColor4f(1.0,1.0,0.0,0.5); glLineWidth(3.0)
-            glBegin(GL_LINE_LOOP); glVertex2f(slot_x-1,start_y-1); glVertex2f(slot_x+slot_size+1,start_y-1); glVertex2f(slot_x+slot_size+1,start_y+slot_size+1); glVertex2f(slot_x-1,start_y+slot_size+1); glEnd()
-            glLineWidth(1.0)
-            
-    glEnable(GL_DEPTH_TEST); glEnable(GL_CULL_FACE); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW); glPopMatrix(); glDisable(GL_BLEND)
-
-def draw_fps_counter(fps_value, font, screen_width, screen_height):
-    fps_text = f"FPS: {fps_value:.0f}"
-    fps_tex_id, fps_tex_w, fps_tex_h = text_to_texture(fps_text, font, color=(255, 255, 0))
-
-    glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity()
-    gluOrtho2D(0, screen_width, 0, screen_height)
-    glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
-
-    glDisable(GL_DEPTH_TEST); glEnable(GL_BLEND); glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-    glEnable(GL_TEXTURE_2D); glBindTexture(GL_TEXTURE_2D, fps_tex_id)
-
-    x_pos = 10; y_pos = screen_height - fps_tex_h - 10
-    glBegin(GL_QUADS)
-    glTexCoord2f(0, 0); glVertex2f(x_pos, y_pos)
-    glTexCoord2f(1, 0); glVertex2f(x_pos + fps_tex_w, y_pos)
-    glTexCoord2f(1, 1); glVertex2f(x_pos + fps_tex_w, y_pos + fps_tex_h)
-    glTexCoord2f(0, 1); glVertex2f(x_pos, y_pos + fps_tex_h)
-    glEnd()
-
-    glDisable(GL_TEXTURE_2D); glDeleteTextures(1, [fps_tex_id])
-    glDisable(GL_BLEND); glEnable(GL_DEPTH_TEST)
-    glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW); glPopMatrix()
+    vao_id = glGenVertexArrays(1)
+    render_state.bind_vertex_array(vao_id)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo_id)
+    if PACKED_CHUNK_VERTICES:
+        # Both words go to one integer attribute (uvec2), unpacked by the vertex shader
+        glVertexAttribIPointer(0, PACKED_VERTEX_WORDS, GL_UNSIGNED_INT, PACKED_VERTEX_WORDS * 4, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        render_state.bind_vertex_array(0)
+        chunk_meshes[chunk_coord] = (vao_id, vbo_id, len(vertex_data))
+        return
+    # Stride is CHUNK_VERTEX_FLOATS floats: 3 Pos, 3 Norm, 2 Tile UV, 4 Atlas rect, 1 AO, 2 Light
+    stride = CHUNK_VERTEX_FLOATS * sizeof(GLfloat)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(1)
+    glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(2)
+    glVertexAttribPointer(4, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(8 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(4)
+    glVertexAttribPointer(3, 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(12 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(3)
+    glVertexAttribPointer(6, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(13 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(6)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    render_state.bind_vertex_array(0)
+
+    chunk_meshes[chunk_coord] = (vao_id, vbo_id, len(vertex_data))
+
+def chunk_mesh_stats():
+    """Returns (triangle count, vertex buffer bytes) over all uploaded chunk meshes."""
+    vertex_count = sum(count for _, _, count in chunk_meshes.values())
+    vertex_bytes = PACKED_VERTEX_WORDS * 4 if PACKED_CHUNK_VERTICES else CHUNK_VERTEX_FLOATS * 4
+    return vertex_count // 3, vertex_count * vertex_bytes
+
+def delete_chunk_mesh(chunk_coord):
+    """Frees the GPU buffers of a chunk mesh, if one exists."""
+    mesh = chunk_meshes.pop(chunk_coord, None)
+    if mesh:
+        vao_id, vbo_id, _ = mesh
+        render_state.forget_vertex_array(vao_id)
+        glDeleteVertexArrays(1, [vao_id])
+        glDeleteBuffers(1, [vbo_id])
+
+def delete_all_chunk_meshes():
+    for chunk_coord in list(chunk_meshes.keys()):
+        delete_chunk_mesh(chunk_coord)
+
+def draw_chunk_meshes(view_matrix, projection_matrix, chunk_coords=None):
+    """
+    Draws chunk meshes with one glDrawArrays per chunk. Per-frame constants come from the uniform buffer;
+    each chunk only sets its origin (the model matrix, or the chunkOrigin uniform for packed vertices).
+
+    Args:
+        chunk_coords (iterable, optional): Chunks to draw (e.g. the visible ones). Defaults to all meshes.
+
+    Returns:
+        int: Number of draw calls issued.
+    """
+    if not shader_program_id or not chunk_meshes:
+        return 0
+
+    begin_world_pass(view_matrix, projection_matrix, packed=PACKED_CHUNK_VERTICES)
+
+    model_m = np.identity(4, dtype=np.float32)
+    draw_calls = 0
+    for chunk_coord in (chunk_meshes.keys() if chunk_coords is None else chunk_coords):
+        mesh = chunk_meshes.get(chunk_coord)
+        if not mesh:
+            continue
+        vao_id, _, vertex_count = mesh
+        if PACKED_CHUNK_VERTICES:
+            render_state.set_uniform_3f(packed_uniform_locations['chunkOrigin'], *chunk_origin(chunk_coord))
+        else:
+            model_m[3, 0:3] = chunk_origin(chunk_coord) # Column-major translation, as in draw_block_glsl
+            render_state.set_uniform_matrix4(uniform_locations['model'], model_m)
+        render_state.bind_vertex_array(vao_id)
+        glDrawArrays(GL_TRIANGLES, 0, vertex_count)
+        draw_calls += 1
+    return draw_calls
+
+
+# --- Instanced Block Rendering ---
+
+def upload_chunk_instances(chunk_coord, instance_data):
+    """
+    Uploads per-instance block data (see meshing.build_chunk_instances) for one chunk.
+    The batch's VAO reuses the generic cube VBO for per-vertex data and reads block position (loc 5)
+    and atlas rect (loc 4) per instance. Empty batches just free the old buffers.
+    """
+    delete_chunk_instances(chunk_coord)
+    if instance_data is None or len(instance_data) == 0 or not cube_vbo_id:
+        return
+
+    instance_data = np.ascontiguousarray(instance_data, dtype=np.float32)
+    instance_vbo_id = create_vbo(instance_data)
+    if not instance_vbo_id:
+        print(f"Error: Failed to create instance VBO for chunk {chunk_coord}.")
+        return
+
+    vao_id = glGenVertexArrays(1)
+    render_state.bind_vertex_array(vao_id)
+
+    # Per-vertex cube data (stride is 8 floats: 3 Pos, 3 Norm, 2 UV), shared by all batches
+    glBindBuffer(GL_ARRAY_BUFFER, cube_vbo_id)
+    stride = 8 * sizeof(GLfloat)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(1)
+    glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(2)
+
+    # Per-instance data (stride is BLOCK_INSTANCE_FLOATS floats: 3 Block position, 4 Atlas rect)
+    glBindBuffer(GL_ARRAY_BUFFER, instance_vbo_id)
+    instance_stride = BLOCK_INSTANCE_FLOATS * sizeof(GLfloat)
+    glVertexAttribPointer(5, 3, GL_FLOAT, GL_FALSE, instance_stride, ctypes.c_void_p(0))
+    glEnableVertexAttribArray(5)
+    glVertexAttribDivisor(5, 1)
+    glVertexAttribPointer(4, 4, GL_FLOAT, GL_FALSE, instance_stride, ctypes.c_void_p(3 * sizeof(GLfloat)))
+    glEnableVertexAttribArray(4)
+    glVertexAttribDivisor(4, 1)
+
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    render_state.bind_vertex_array(0)
+
+    chunk_instance_batches[chunk_coord] = (vao_id, instance_vbo_id, len(instance_data))
+
+def delete_chunk_instances(chunk_coord):
+    """Frees the GPU buffers of a chunk's instance batch, if one exists."""
+    batch = chunk_instance_batches.pop(chunk_coord, None)
+    if batch:
+        vao_id, instance_vbo_id, _ = batch
+        render_state.forget_vertex_array(vao_id)
+        glDeleteVertexArrays(1, [vao_id])
+        glDeleteBuffers(1, [instance_vbo_id])
+
+def delete_all_chunk_instances():
+    for chunk_coord in list(chunk_instance_batches.keys()):
+        delete_chunk_instances(chunk_coord)
+
+def draw_chunk_instances(view_matrix, projection_matrix, chunk_coords=None):
+    """
+    Draws block instance batches with one glDrawArraysInstanced per chunk batch.
+    Block positions come from the instance buffer, so the model matrix stays the identity.
+
+    Returns:
+        int: Number of draw calls issued.
+    """
+    if not shader_program_id or not chunk_instance_batches:
+        return 0
+
+    begin_world_pass(view_matrix, projection_matrix)
+    render_state.set_uniform_matrix4(uniform_locations['model'], np.identity(4, dtype=np.float32))
+
+    draw_calls = 0
+    for chunk_coord in (chunk_instance_batches.keys() if chunk_coords is None else chunk_coords):
+        batch = chunk_instance_batches.get(chunk_coord)
+        if not batch:
+            continue
+        vao_id, _, instance_count = batch
+        render_state.bind_vertex_array(vao_id)
+        glDrawArraysInstanced(GL_TRIANGLES, 0, cube_vertex_count, instance_count)
+        draw_calls += 1
+    return draw_calls
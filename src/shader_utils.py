@@ -1,4 +1,17 @@
 from OpenGL.GL import *
+import ctypes
+import hashlib
+import os
+import struct
+
+from .config import SHADER_CACHE_ENABLED, SHADER_CACHE_DIRECTORY
+
+# Cached program binary file: magic, binary format enum, then the driver's blob
+_BINARY_HEADER = struct.Struct("<4sI")
+_BINARY_MAGIC = b"VXSB"
+
+_driver_id = None # "vendor|renderer|version" of the current context, read on first use
+shader_cache_stats = {'hits': 0, 'misses': 0, 'rejected': 0}
 
 def load_shader_source(filepath: str) -> str:
     """
@@ -25,6 +38,27 @@ def load_shader_source(filepath: str) -> str:
         print(f"Error loading shader file '{filepath}': {e}")
         raise
 
+def inject_defines(source: str, defines=None) -> str:
+    """
+    Adds `#define NAME VALUE` lines to a shader source, right after its #version line
+    (which must stay first), so one file can be compiled into several variants.
+
+    Args:
+        source (str): The shader source code.
+        defines (dict, optional): NAME -> value; a value of None defines just the name.
+
+    Returns:
+        str: The source of the variant.
+    """
+    if not defines:
+        return source
+    define_lines = "".join(f"#define {name}{'' if value is None else f' {value}'}\n"
+                           for name, value in sorted(defines.items()))
+    if source.lstrip().startswith("#version"):
+        version_line, _, rest = source.lstrip().partition("\n")
+        return f"{version_line}\n{define_lines}{rest}"
+    return define_lines + source
+
 def compile_shader(source: str, shader_type: GLenum) -> int:
     """
     Compiles a shader from source code.
@@ -56,24 +90,85 @@ def compile_shader(source: str, shader_type: GLenum) -> int:
     
     return shader
 
-def create_shader_program(vertex_shader_filepath: str, fragment_shader_filepath: str) -> int:
+def _get_driver_id() -> str:
+    global _driver_id
+    if _driver_id is None:
+        _driver_id = "|".join((glGetString(name) or b"").decode(errors="replace") for name in (GL_VENDOR, GL_RENDERER, GL_VERSION))
+    return _driver_id
+
+def _program_cache_path(vertex_source: str, fragment_source: str) -> str:
+    """Cache file of a program: hash of both (variant) sources plus the driver, whose binaries are not portable."""
+    digest = hashlib.sha256()
+    for part in (vertex_source, fragment_source, _get_driver_id()):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return os.path.join(SHADER_CACHE_DIRECTORY, digest.hexdigest() + ".bin")
+
+def _load_program_binary(cache_path: str) -> int:
     """
-    Creates a shader program from vertex and fragment shader files.
+    Creates a program from a cached binary.
+
+    Returns:
+        int: The program ID, or 0 if there is no cached binary or the driver rejected it (e.g. after an update).
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return 0
+    if len(data) <= _BINARY_HEADER.size or data[:4] != _BINARY_MAGIC:
+        print(f"Warning: Ignoring malformed shader cache file '{cache_path}'")
+        return 0
+    _, binary_format = _BINARY_HEADER.unpack_from(data)
+    binary = data[_BINARY_HEADER.size:]
+    program = glCreateProgram()
+    try:
+        glProgramBinary(program, binary_format, binary, len(binary))
+        if glGetProgramiv(program, GL_LINK_STATUS):
+            return program
+    except Exception as e: # Entry point missing or the driver raised on the blob
+        print(f"Warning: Could not load cached shader program '{cache_path}': {e}")
+    glDeleteProgram(program)
+    shader_cache_stats['rejected'] += 1
+    try:
+        os.remove(cache_path) # Stale for this driver; recompiling writes a fresh one
+    except OSError:
+        pass
+    return 0
+
+def _save_program_binary(program: int, cache_path: str) -> None:
+    """Stores a linked program's binary. Failures only cost the next launch a recompile."""
+    try:
+        length = glGetProgramiv(program, GL_PROGRAM_BINARY_LENGTH)
+        if not length:
+            return
+        binary = (ctypes.c_ubyte * length)()
+        written, binary_format = GLsizei(0), GLenum(0)
+        glGetProgramBinary(program, length, ctypes.byref(written), ctypes.byref(binary_format), binary)
+        os.makedirs(SHADER_CACHE_DIRECTORY, exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(_BINARY_HEADER.pack(_BINARY_MAGIC, binary_format.value))
+            f.write(bytes(binary)[:written.value])
+        os.replace(temp_path, cache_path) # Never leave a half-written binary under the real name
+    except Exception as e:
+        print(f"Warning: Could not write shader cache '{cache_path}': {e}")
+
+def link_program(vertex_source: str, fragment_source: str, retrievable: bool = False) -> int:
+    """
+    Compiles and links a program from vertex and fragment shader sources.
 
     Args:
-        vertex_shader_filepath (str): Path to the vertex shader source file.
-        fragment_shader_filepath (str): Path to the fragment shader source file.
+        vertex_source (str): Vertex shader source code.
+        fragment_source (str): Fragment shader source code.
+        retrievable (bool): Ask the driver to keep the binary available for glGetProgramBinary.
 
     Returns:
-        int: The ID of the created shader program.
+        int: The ID of the linked program.
 
     Raises:
-        Exception: If loading, compiling, or linking shaders fails.
+        Exception: If compiling or linking fails.
     """
-    # Load shader sources
-    vertex_source = load_shader_source(vertex_shader_filepath)
-    fragment_source = load_shader_source(fragment_shader_filepath)
-
     # Compile shaders
     vertex_shader_id = compile_shader(vertex_source, GL_VERTEX_SHADER)
     fragment_shader_id = compile_shader(fragment_source, GL_FRAGMENT_SHADER)
@@ -88,6 +183,11 @@ def create_shader_program(vertex_shader_filepath: str, fragment_shader_filepath:
 
     glAttachShader(program, vertex_shader_id)
     glAttachShader(program, fragment_shader_id)
+    if retrievable:
+        try:
+            glProgramParameteri(program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+        except Exception: # No GL 4.1 / ARB_get_program_binary; saving the binary will then fail quietly too
+            pass
     glLinkProgram(program)
 
     # Check for linking errors
@@ -111,3 +211,39 @@ def create_shader_program(vertex_shader_filepath: str, fragment_shader_filepath:
     glDeleteShader(fragment_shader_id)
 
     return program
+
+def create_shader_program(vertex_shader_filepath: str, fragment_shader_filepath: str, defines=None) -> int:
+    """
+    Creates a shader program from vertex and fragment shader files.
+
+    With SHADER_CACHE_ENABLED, linked program binaries are kept in SHADER_CACHE_DIRECTORY, keyed by
+    the sources (after define injection) and the driver's vendor/renderer/version strings, and later
+    launches load them with glProgramBinary. A missing or rejected binary falls back to compiling.
+
+    Args:
+        vertex_shader_filepath (str): Path to the vertex shader source file.
+        fragment_shader_filepath (str): Path to the fragment shader source file.
+        defines (dict, optional): Preprocessor defines selecting a variant (see inject_defines);
+            every variant is cached separately.
+
+    Returns:
+        int: The ID of the created shader program.
+
+    Raises:
+        Exception: If loading, compiling, or linking shaders fails.
+    """
+    # Load shader sources
+    vertex_source = inject_defines(load_shader_source(vertex_shader_filepath), defines)
+    fragment_source = inject_defines(load_shader_source(fragment_shader_filepath), defines)
+
+    if not SHADER_CACHE_ENABLED:
+        return link_program(vertex_source, fragment_source)
+    cache_path = _program_cache_path(vertex_source, fragment_source)
+    program = _load_program_binary(cache_path)
+    if program:
+        shader_cache_stats['hits'] += 1
+        return program
+    shader_cache_stats['misses'] += 1
+    program = link_program(vertex_source, fragment_source, retrievable=True)
+    _save_program_binary(program, cache_path)
+    return program
@@ -0,0 +1,421 @@
+import math
+import time
+
+import numpy as np
+
+from .chunked_world import CHUNK_SIZE, CHUNK_SHIFT, chunk_origin
+from .meshing import (get_padded_chunk_blocks, mesh_lod_padded_blocks, build_block_instances, pack_chunk_vertices,
+                      BLOCK_TILE_TABLE)
+from .lighting import (FULL_SKY, column_top, column_light_region, compute_column_light, store_column_light,
+                       unload_column_light)
+from .terrain import _generate_chunk_column_job
+from .visibility import face_connectivity
+from .mesh_pool import MeshingPool, neighbourhood_revision_stamp
+
+
+# --- Worker entry points (module-level so they can be pickled) ---
+
+def build_mesh_job(padded_blocks, chunk_coord, greedy=False, padded_light=None, lod=0, packed=False):
+    """
+    Chunk mesh vertex data from a padded block copy (see meshing.mesh_lod_padded_blocks),
+    in the packed layout with packed=True (see meshing.pack_chunk_vertices).
+    """
+    if packed:
+        return pack_chunk_vertices(mesh_lod_padded_blocks(padded_blocks, 1 << lod, greedy=greedy,
+                                                          uv_table=BLOCK_TILE_TABLE, padded_light=padded_light))
+    return mesh_lod_padded_blocks(padded_blocks, 1 << lod, greedy=greedy, padded_light=padded_light)
+
+def build_instances_job(padded_blocks, chunk_coord, padded_light=None, lod=0):
+    """
+    Per-block instance data from a padded block copy (see meshing.build_block_instances).
+    Instances are unlit and always full detail (lod must be 0).
+    """
+    return build_block_instances(padded_blocks, chunk_origin(chunk_coord))
+
+def _build_column_job(build_mesh, padded_chunks, lod=0):
+    """
+    Builds every chunk of one column at an LOD level: [(chunk_coord, padded_blocks), ...] ->
+    ({chunk_coord: data}, {chunk_coord: face connectivity (see visibility.face_connectivity)}).
+    Padded copies have a border of 2 ** lod blocks.
+    """
+    inner = (slice(1 << lod, -(1 << lod)),) * 3 # The chunk itself inside a padded copy
+    meshes = {chunk_coord: build_mesh(padded, chunk_coord, lod=lod) for chunk_coord, padded in padded_chunks}
+    return meshes, {chunk_coord: face_connectivity(padded[inner]) for chunk_coord, padded in padded_chunks}
+
+def _build_lit_column_job(build_mesh, region_blocks, chunk_coords, lod=0):
+    """
+    Lights a column from its 3x3 column region (see lighting.column_light_region), then builds
+    the listed chunks of the centre column at an LOD level with the light baked in.
+
+    Returns:
+        tuple: ({chunk_coord: data}, {chunk_coord: face connectivity}, region light aligned with region_blocks).
+    """
+    region_light = compute_column_light(region_blocks)
+    padding = 1 << lod
+    blocks, light = region_blocks, region_light
+    if padding > 1: # The region has one layer below and above the world; LOD borders need more
+        extra = ((0, 0), (padding - 1, padding - 1), (0, 0))
+        blocks, light = np.pad(region_blocks, extra), np.pad(region_light, extra)
+        light[:, -(padding - 1):, :] = FULL_SKY
+    inner = (slice(padding, -padding),) * 3
+    meshes, connectivity = {}, {}
+    for chunk_coord in chunk_coords:
+        # Padded chunk bounds inside the region, whose y now starts at -padding
+        y0 = chunk_coord[1] * CHUNK_SIZE
+        padded = (slice(CHUNK_SIZE - padding, 2 * CHUNK_SIZE + padding), slice(y0, y0 + CHUNK_SIZE + 2 * padding),
+                  slice(CHUNK_SIZE - padding, 2 * CHUNK_SIZE + padding))
+        meshes[chunk_coord] = build_mesh(blocks[padded], chunk_coord, padded_light=light[padded], lod=lod)
+        connectivity[chunk_coord] = face_connectivity(blocks[padded][inner])
+    return meshes, connectivity, region_light
+
+
+class ChunkStreamer:
+    """
+    Keeps the chunk columns around the player loaded in an unbounded (in X/Z) world.
+
+    Columns within load_radius are generated and meshed on a process pool (a MeshingPool, so
+    block copies and vertex data travel through shared memory rather than pickles); update() only
+    collects finished results, integrates/uploads them under a per-frame time budget and
+    submits new jobs, so it never waits on a worker. A column is meshed once its 8 horizontal
+    neighbours are generated (its border faces depend on them). Columns beyond unload_radius
+    are evicted from the world together with their GPU buffers; the gap between the two radii
+    keeps columns near the boundary from loading and unloading repeatedly.
+
+    Meshes are built from block copies taken on the main thread, stamped with the revisions of
+    every chunk they read. If any of those chunks changed while the job ran (e.g. a block edit),
+    the result is discarded and the chunk is queued on the rebuild queue instead.
+
+    With an LOD tracker (ColumnLods), each column is meshed at the level its distance from the
+    camera calls for, and meshed columns whose level changes are rebuilt the same way; the old
+    meshes stay up until the new ones arrive.
+
+    With a light map, the job also lights the column (from a copy of it and its 8 neighbours,
+    as far as light can travel) and the meshes are built with that light. The light and the
+    meshes are only kept if none of the 3x3 columns changed meanwhile; otherwise the column is
+    submitted again.
+    """
+
+    def __init__(self, world, generator, build_mesh, upload_mesh, free_chunk, rebuild_queue=None,
+                 load_radius=6, unload_radius=8, workers=None, max_uploads_per_frame=8, storage=None,
+                 light_map=None, visibility=None, lods=None, pool=None):
+        """
+        Args:
+            world (ChunkedWorld): Voxel store the columns are loaded into.
+            generator (TerrainGenerator): Terrain source (pickled to the workers).
+            build_mesh (callable): Picklable build_mesh(padded_blocks, chunk_coord, padded_light=None) -> data,
+                e.g. build_mesh_job or build_instances_job.
+            upload_mesh (callable): upload_mesh(chunk_coord, data), called on the main thread.
+            free_chunk (callable): free_chunk(chunk_coord) releases a chunk's GPU buffers.
+            rebuild_queue (ChunkRebuildQueue, optional): Receives chunks whose async mesh went stale.
+            load_radius (int): Columns within this many chunks of the camera are loaded and drawn.
+            unload_radius (int): Columns farther than this are evicted; must exceed load_radius + 1.
+            workers (int, optional): Worker processes of the streamer's own pool; defaults to one
+                less than the CPU count (min 1). Ignored when a pool is given.
+            max_uploads_per_frame (int): Cap on chunk uploads per update() call.
+            storage (WorldStorage, optional): Saved chunks replace generated ones on load, and
+                edited chunks are saved when their column is evicted.
+            light_map (ChunkedWorld, optional): Packed light of the world (see lighting.py); columns
+                are lit as they are meshed and their light is dropped on eviction.
+            visibility (ChunkVisibilityGraph, optional): Receives the face connectivity of each
+                chunk built, computed on the workers alongside the mesh.
+            lods (ColumnLods, optional): LOD level per column; without it everything is full detail.
+            pool (MeshingPool, optional): Shared worker pool (e.g. with ChunkMeshJobs); shutdown()
+                leaves it running. Without one the streamer starts its own.
+        """
+        if unload_radius <= load_radius + 1:
+            raise ValueError(f"unload_radius ({unload_radius}) must be greater than load_radius + 1 ({load_radius + 1})")
+        self.world = world
+        self.generator = generator
+        self.build_mesh = build_mesh
+        self.upload_mesh = upload_mesh
+        self.free_chunk = free_chunk
+        self.rebuild_queue = rebuild_queue
+        self.storage = storage
+        self.light_map = light_map
+        self.visibility = visibility
+        self.lods = lods
+        self.light_top = column_top(generator.world_height)
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius
+        self.max_uploads_per_frame = max_uploads_per_frame
+        self.column_chunk_count = math.ceil(generator.world_height / CHUNK_SIZE)
+
+        self._owns_pool = pool is None
+        self._pool = MeshingPool(workers) if pool is None else pool
+        self.workers = self._pool.workers
+        self.max_in_flight = self.workers * 2
+
+        self.generated = set() # Columns whose chunks are in the world
+        self.meshed = set() # Columns whose chunks have been uploaded
+        self.meshed_lods = {} # Meshed column -> LOD level of its uploaded meshes
+        self._pending_generation = {} # column -> Future of {chunk_coord: blocks}
+        # column -> (SharedJob of ({chunk_coord: data}, {chunk_coord: connectivity}), {chunk_coord: revision stamp}, LOD level),
+        # or with a light map (SharedJob of (meshes, connectivity, region light), revision stamp of the 3x3 columns, LOD level)
+        self._pending_meshing = {}
+        self._center = None # Camera column the wanted list was computed for
+        self._wanted = [] # Columns within load_radius + 1, nearest first (the outer ring is generated only)
+
+        # Counters
+        self.total_generated = 0
+        self.total_meshed = 0
+        self.total_evicted = 0
+        self.total_stale = 0
+        self.last_update_time = 0.0
+
+    # --- Helpers ---
+
+    def _column_chunks(self, column):
+        cx, cz = column
+        return [(cx, cy, cz) for cy in range(self.column_chunk_count)]
+
+    def _distance_sq(self, column):
+        return (column[0] - self._center[0]) ** 2 + (column[1] - self._center[1]) ** 2
+
+    def _revision_stamp(self, chunk_coord):
+        return neighbourhood_revision_stamp(self.world, chunk_coord)
+
+    def _column_region_stamp(self, column):
+        """Revisions of every chunk in the column and its 8 neighbours (everything its light depends on)."""
+        cx, cz = column
+        return tuple(self.world.chunk_revision((cx + dx, cy, cz + dz))
+                     for dx in (-1, 0, 1) for dz in (-1, 0, 1) for cy in range(self.column_chunk_count))
+
+    def _neighbours_generated(self, column):
+        cx, cz = column
+        return all((cx + dx, cz + dz) in self.generated for dx in (-1, 0, 1) for dz in (-1, 0, 1))
+
+    def _set_center(self, center):
+        """Recomputes the wanted columns and evicts far ones; only runs when the camera changes column."""
+        self._center = center
+        reach = self.load_radius + 1
+        cx, cz = center
+        wanted = [(cx + dx, cz + dz) for dx in range(-reach, reach + 1) for dz in range(-reach, reach + 1)
+                  if dx * dx + dz * dz <= reach * reach]
+        wanted.sort(key=self._distance_sq)
+        self._wanted = wanted
+
+        unload_sq = self.unload_radius * self.unload_radius
+        for column in [c for c in self._pending_generation if self._distance_sq(c) > unload_sq]:
+            self._pending_generation.pop(column).cancel()
+        for column in [c for c in self._pending_meshing if self._distance_sq(c) > unload_sq]:
+            self._pending_meshing.pop(column)[0].discard()
+        for column in [c for c in self.meshed if self._distance_sq(c) > unload_sq]:
+            self.free_column_meshes(column)
+        # Block data is kept while a meshed neighbour still depends on it, so meshes never go stale
+        for column in [c for c in self.generated if self._distance_sq(c) > unload_sq and not self._has_meshed_neighbour(c)]:
+            self.evict_column(column)
+
+    def _has_meshed_neighbour(self, column):
+        cx, cz = column
+        return any((cx + dx, cz + dz) in self.meshed or (cx + dx, cz + dz) in self._pending_meshing
+                   for dx in (-1, 0, 1) for dz in (-1, 0, 1))
+
+    def free_column_meshes(self, column):
+        """Frees the GPU buffers of a column's chunks."""
+        for chunk_coord in self._column_chunks(column):
+            self.free_chunk(chunk_coord)
+            if self.rebuild_queue is not None:
+                self.rebuild_queue.discard(chunk_coord)
+        self.meshed.discard(column)
+        self.meshed_lods.pop(column, None)
+
+    def evict_column(self, column):
+        """Unloads a column's chunks and frees their GPU buffers."""
+        self.free_column_meshes(column)
+        for chunk_coord in self._column_chunks(column):
+            if self.storage is not None:
+                self.storage.save_chunk(self.world, chunk_coord) # No-op unless edited
+                self.storage.forget(chunk_coord)
+            self.world.unload_chunk(chunk_coord)
+        if self.light_map is not None:
+            unload_column_light(self.light_map, column, self.light_top)
+        if self.lods is not None:
+            self.lods.discard(column)
+        self.generated.discard(column)
+        self.total_evicted += 1
+
+    # --- Integrating results ---
+
+    def _integrate_generation(self, column, column_chunks):
+        for chunk_coord in self._column_chunks(column):
+            blocks = column_chunks.get(chunk_coord)
+            if self.storage is not None:
+                saved = self.storage.load_chunk(chunk_coord)
+                if saved is not None: # Saved edits win over freshly generated terrain
+                    blocks = saved if saved.any() else None
+            if blocks is None:
+                continue
+            self.world.set_chunk(chunk_coord, blocks)
+            if self.storage is not None:
+                self.storage.mark_clean(chunk_coord, self.world.chunk_revision(chunk_coord))
+        self.generated.add(column)
+        self.total_generated += 1
+
+    def _upload(self, chunk_coord, data, connectivity):
+        self.upload_mesh(chunk_coord, data)
+        if self.visibility is not None:
+            self.visibility.set_connectivity(chunk_coord, connectivity)
+
+    def _integrate_mesh(self, column, result, stamps, lod):
+        meshes, connectivity = result
+        for chunk_coord, data in meshes.items():
+            if stamps[chunk_coord] == self._revision_stamp(chunk_coord):
+                self._upload(chunk_coord, data, connectivity[chunk_coord])
+            else:
+                # A chunk the job read from changed meanwhile; rebuild from the current blocks instead
+                self.total_stale += 1
+                if self.rebuild_queue is not None:
+                    self.rebuild_queue.mark_dirty(chunk_coord)
+        self.meshed.add(column)
+        self.meshed_lods[column] = lod
+        self.total_meshed += 1
+        return len(meshes)
+
+    def _integrate_lit_mesh(self, column, result, stamp, lod):
+        if stamp != self._column_region_stamp(column):
+            # The light depends on all 3x3 columns; drop the result and let _submit light the column again
+            self.total_stale += 1
+            return 0
+        meshes, connectivity, region_light = result
+        store_column_light(self.light_map, column, region_light)
+        for chunk_coord, data in meshes.items():
+            self._upload(chunk_coord, data, connectivity[chunk_coord])
+        self.meshed.add(column)
+        self.meshed_lods[column] = lod
+        self.total_meshed += 1
+        return len(meshes)
+
+    def _collect(self, deadline):
+        """Integrates finished jobs until the deadline or the upload cap is reached."""
+        uploads = 0
+        for column, future in list(self._pending_generation.items()):
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+            if future.done():
+                del self._pending_generation[column]
+                try:
+                    chunks = future.result()
+                except Exception as e: # Worker raised or the pool broke; _submit generates the column again
+                    print(f"Error: Generating chunk column {column} failed: {e!r}")
+                    continue
+                self._integrate_generation(column, chunks)
+        for column, (job, stamps, lod) in list(self._pending_meshing.items()):
+            if uploads >= self.max_uploads_per_frame or (deadline is not None and time.perf_counter() > deadline):
+                return
+            if job.done():
+                del self._pending_meshing[column]
+                integrate = self._integrate_mesh if self.light_map is None else self._integrate_lit_mesh
+                try:
+                    uploads += integrate(column, job.result(), stamps, lod)
+                except Exception as e: # The column stays unmeshed, so _submit meshes it again
+                    print(f"Error: Meshing chunk column {column} failed: {e!r}")
+                finally:
+                    job.release() # Uploads and the light map hold copies; the shared blocks can go
+
+    # --- Submitting jobs ---
+
+    def _lod_level(self, column):
+        return self.lods.level(column) if self.lods is not None else 0
+
+    def _submit_meshing(self, column):
+        lod = self._lod_level(column)
+        if self.light_map is not None:
+            # All-EMPTY chunks have no faces of their own but still pass light, so only meshing skips them
+            chunk_coords = [c for c in self._column_chunks(column) if self.world.get_chunk(c) is not None]
+            job = self._pool.submit(_build_lit_column_job, self.build_mesh,
+                                    column_light_region(self.world, column, self.light_top), chunk_coords, lod)
+            self._pending_meshing[column] = (job, self._column_region_stamp(column), lod)
+            return
+        padded_chunks, stamps = [], {}
+        for chunk_coord in self._column_chunks(column):
+            if self.world.get_chunk(chunk_coord) is None:
+                continue # All-EMPTY chunk: no faces of its own
+            padded_chunks.append((chunk_coord, get_padded_chunk_blocks(self.world, chunk_coord, padding=1 << lod)))
+            stamps[chunk_coord] = self._revision_stamp(chunk_coord)
+        job = self._pool.submit(_build_column_job, self.build_mesh, padded_chunks, lod)
+        self._pending_meshing[column] = (job, stamps, lod)
+
+    def _submit(self, deadline):
+        """Submits jobs for the nearest columns that need work, up to the in-flight limit."""
+        mesh_radius_sq = self.load_radius * self.load_radius
+        for column in self._wanted:
+            if len(self._pending_generation) + len(self._pending_meshing) >= self.max_in_flight:
+                return
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+            if column not in self.generated:
+                if self.storage is not None and column not in self._pending_generation and all(
+                        self.storage.has_chunk(c) for c in self._column_chunks(column)):
+                    self._integrate_generation(column, {}) # Fully saved column: nothing to generate
+                elif column not in self._pending_generation:
+                    self._pending_generation[column] = self._pool.executor.submit(
+                        _generate_chunk_column_job, self.generator, column[0], column[1])
+            elif (column not in self.meshed and column not in self._pending_meshing
+                  and self._distance_sq(column) <= mesh_radius_sq and self._neighbours_generated(column)):
+                self._submit_meshing(column)
+            elif (column in self.meshed and column not in self._pending_meshing
+                  and self.meshed_lods.get(column) != self._lod_level(column)):
+                self._submit_meshing(column) # LOD level changed; rebuild the column at the new level
+
+    # --- Public API ---
+
+    def camera_column(self, camera_pos):
+        """Chunk column (cx, cz) containing a world position (blocks are centred on integers)."""
+        return (math.floor(camera_pos[0] + 0.5) >> CHUNK_SHIFT, math.floor(camera_pos[2] + 0.5) >> CHUNK_SHIFT)
+
+    def update(self, camera_pos, budget_seconds=None):
+        """
+        Per-frame step: integrates finished jobs, then keeps the workers busy with the nearest
+        missing columns. Never blocks on a worker.
+
+        Args:
+            camera_pos (sequence): Camera position in world space.
+            budget_seconds (float, optional): Time budget for integrating/uploading. None means no limit.
+        """
+        start = time.perf_counter()
+        deadline = start + budget_seconds if budget_seconds is not None else None
+        center = self.camera_column(camera_pos)
+        if center != self._center:
+            self._set_center(center)
+        if self.lods is not None:
+            self.lods.update(camera_pos, self._wanted)
+        self._collect(deadline)
+        self._submit(deadline)
+        self.last_update_time = time.perf_counter() - start
+
+    def is_ready(self, camera_pos, radius):
+        """True once every column within `radius` of the camera's column is meshed."""
+        cx, cz = self.camera_column(camera_pos)
+        return all((cx + dx, cz + dz) in self.meshed for dx in range(-radius, radius + 1)
+                   for dz in range(-radius, radius + 1) if dx * dx + dz * dz <= radius * radius)
+
+    def load_around_sync(self, camera_pos, radius=2, poll_interval=0.005):
+        """Blocks until the columns within `radius` are meshed (e.g. before the first frame)."""
+        radius = min(radius, self.load_radius)
+        while not self.is_ready(camera_pos, radius):
+            self.update(camera_pos)
+            time.sleep(poll_interval)
+
+    def pending_count(self):
+        return len(self._pending_generation) + len(self._pending_meshing)
+
+    def stats(self):
+        return {
+            'columns_generated': len(self.generated),
+            'columns_meshed': len(self.meshed),
+            'jobs_pending': self.pending_count(),
+            'total_evicted': self.total_evicted,
+            'total_stale': self.total_stale,
+            'last_update_ms': self.last_update_time * 1000.0,
+        }
+
+    def shutdown(self):
+        """Drops queued jobs and stops the worker pool if the streamer started it."""
+        for future in self._pending_generation.values():
+            future.cancel()
+        for job, _, _ in self._pending_meshing.values():
+            job.discard()
+        self._pending_generation.clear()
+        self._pending_meshing.clear()
+        if self._owns_pool:
+            self._pool.shutdown() # Waits only for jobs already running
@@ -0,0 +1,193 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .block_type import BlockType
+from .chunked_world import CHUNK_SIZE, CHUNK_SHIFT
+
+# Tree placement: one candidate per TREE_CELL x TREE_CELL area (jittered grid), so trees never overlap
+TREE_CELL = 5
+TREE_CANOPY_RADIUS = 2
+
+
+# --- Hashing and noise (vectorized, deterministic for a given seed) ---
+
+def hash_2d(ix, iz, seed):
+    """Hashes integer lattice coordinates (arrays) and a seed to uniformly distributed uint32 values."""
+    h = (np.asarray(ix, dtype=np.int64).astype(np.uint32) * np.uint32(0x8DA6B343)
+         ^ np.asarray(iz, dtype=np.int64).astype(np.uint32) * np.uint32(0xD8163841)
+         ^ np.uint32((seed * 0xCB1AB31F) & 0xFFFFFFFF))
+    h ^= h >> np.uint32(13)
+    h *= np.uint32(0x5BD1E995)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x27D4EB2F)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def gradient_noise_2d(x, z, seed):
+    """2D gradient (Perlin-style) noise over float arrays, roughly in [-0.7, 0.7]."""
+    x0, z0 = np.floor(x), np.floor(z)
+    fx, fz = x - x0, z - z0
+    ix, iz = x0.astype(np.int64), z0.astype(np.int64)
+
+    def corner(dx, dz):
+        angle = hash_2d(ix + dx, iz + dz, seed).astype(np.float64) * (2.0 * math.pi / 4294967296.0)
+        return np.cos(angle) * (fx - dx) + np.sin(angle) * (fz - dz)
+
+    u, v = _fade(fx), _fade(fz)
+    bottom = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+    top = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+    return bottom + v * (top - bottom)
+
+
+def fractal_noise_2d(x, z, seed, octaves=4, persistence=0.5, lacunarity=2.0):
+    """Layered (fBm) gradient noise, normalized to roughly [-1, 1]."""
+    total = np.zeros(np.broadcast(x, z).shape, dtype=np.float64)
+    amplitude, frequency, amplitude_sum = 1.0, 1.0, 0.0
+    for octave in range(octaves):
+        total += amplitude * gradient_noise_2d(x * frequency, z * frequency, seed + octave * 1013)
+        amplitude_sum += amplitude
+        amplitude *= persistence
+        frequency *= lacunarity
+    return total / (amplitude_sum * 0.7)
+
+
+# --- Terrain generator ---
+
+class TerrainGenerator:
+    """
+    Seeded terrain: a fractal-noise heightmap with grass/dirt/stone strata and trees.
+    Whole chunk columns are produced with NumPy at once; the same seed always yields the same world.
+    """
+
+    def __init__(self, seed, world_height, base_height=None, height_amplitude=None, noise_scale=1.0 / 48.0,
+                 dirt_depth=3, tree_chance=0.35):
+        self.seed = int(seed)
+        self.world_height = int(world_height)
+        self.base_height = int(base_height if base_height is not None else world_height // 3)
+        self.height_amplitude = float(height_amplitude if height_amplitude is not None else max(1, world_height // 6))
+        self.noise_scale = float(noise_scale)
+        self.dirt_depth = int(dirt_depth)
+        self.tree_chance = float(tree_chance)
+
+    def surface_heights(self, xs, zs):
+        """Surface (grass) height at integer world positions; xs and zs are broadcastable arrays."""
+        xs = np.asarray(xs, dtype=np.float64)
+        zs = np.asarray(zs, dtype=np.float64)
+        noise = fractal_noise_2d(xs * self.noise_scale, zs * self.noise_scale, self.seed)
+        heights = np.floor(self.base_height + self.height_amplitude * noise).astype(np.int64)
+        return np.clip(heights, 1, self.world_height - 1)
+
+    def heightmap(self, x0, z0, width, depth):
+        """Surface (grass) height for every column in [x0, x0+width) x [z0, z0+depth), indexed [x, z]."""
+        return self.surface_heights(np.arange(x0, x0 + width)[:, None], np.arange(z0, z0 + depth)[None, :])
+
+    def _trees_near(self, x0, z0, x1, z1):
+        """Yields (x, z, surface_y, trunk_height) for trees whose canopy can reach [x0, x1) x [z0, z1)."""
+        pad = TREE_CANOPY_RADIUS
+        cell_x0, cell_z0 = (x0 - pad) // TREE_CELL, (z0 - pad) // TREE_CELL
+        cell_x1, cell_z1 = (x1 + pad - 1) // TREE_CELL, (z1 + pad - 1) // TREE_CELL
+        cells_x, cells_z = np.meshgrid(np.arange(cell_x0, cell_x1 + 1), np.arange(cell_z0, cell_z1 + 1), indexing='ij')
+        h = hash_2d(cells_x, cells_z, self.seed ^ 0x5EED7EE)
+        chosen = (h % np.uint32(1000)).astype(np.float64) < self.tree_chance * 1000.0
+        if not chosen.any():
+            return
+        offsets_x = (h >> np.uint32(10)) % np.uint32(TREE_CELL)
+        offsets_z = (h >> np.uint32(16)) % np.uint32(TREE_CELL)
+        tree_x = (cells_x * TREE_CELL + offsets_x)[chosen]
+        tree_z = (cells_z * TREE_CELL + offsets_z)[chosen]
+        trunk_heights = 4 + ((h >> np.uint32(24)) % np.uint32(2)).astype(np.int64)[chosen]
+        surface_ys = self.surface_heights(tree_x, tree_z)
+        for x, z, surface_y, trunk_height in zip(tree_x, tree_z, surface_ys, trunk_heights):
+            if surface_y + trunk_height + 2 < self.world_height:
+                yield int(x), int(z), int(surface_y), int(trunk_height)
+
+    def generate_column(self, x0, z0, width=CHUNK_SIZE, depth=CHUNK_SIZE):
+        """
+        Generates the blocks of a full-height column [x0, x0+width) x [0, world_height) x [z0, z0+depth).
+
+        Returns:
+            np.ndarray: uint8 array indexed [x - x0, y, z - z0].
+        """
+        heights = self.heightmap(x0, z0, width, depth)[:, None, :]
+        ys = np.arange(self.world_height, dtype=np.int64)[None, :, None]
+        column = np.where(ys < heights - self.dirt_depth, BlockType.STONE.value,
+                          np.where(ys < heights, BlockType.DIRT.value,
+                                   np.where(ys == heights, BlockType.GRASS.value, BlockType.EMPTY.value))).astype(np.uint8)
+
+        for tree_x, tree_z, surface_y, trunk_height in self._trees_near(x0, z0, x0 + width, z0 + depth):
+            top_y = surface_y + trunk_height
+            # Canopy: two 5x5 layers below the top, then a 3x3 layer and a cap
+            for layer_y, radius in ((top_y - 1, 2), (top_y, 2), (top_y + 1, 1), (top_y + 2, 0)):
+                ax, bx = max(tree_x - radius - x0, 0), min(tree_x + radius + 1 - x0, width)
+                az, bz = max(tree_z - radius - z0, 0), min(tree_z + radius + 1 - z0, depth)
+                if ax < bx and az < bz and 0 <= layer_y < self.world_height:
+                    layer = column[ax:bx, layer_y, az:bz]
+                    layer[layer == BlockType.EMPTY.value] = BlockType.LEAVES.value
+            lx, lz = tree_x - x0, tree_z - z0
+            if 0 <= lx < width and 0 <= lz < depth:
+                column[lx, surface_y + 1:top_y + 1, lz] = BlockType.WOOD.value
+                column[lx, surface_y, lz] = BlockType.DIRT.value # No grass under the trunk
+        return column
+
+    def generate_chunk_column(self, cx, cz):
+        """
+        Generates the chunk column at chunk coordinates (cx, cz), split into chunks.
+
+        Returns:
+            dict: {(cx, cy, cz): uint8 block array} for every chunk in the column that is not all EMPTY.
+        """
+        column = self.generate_column(cx << CHUNK_SHIFT, cz << CHUNK_SHIFT)
+        chunks = {}
+        for cy in range(math.ceil(self.world_height / CHUNK_SIZE)):
+            part = column[:, cy * CHUNK_SIZE:(cy + 1) * CHUNK_SIZE, :]
+            if not part.any():
+                continue
+            if part.shape[1] < CHUNK_SIZE: # World height not a multiple of the chunk size
+                part = np.pad(part, ((0, 0), (0, CHUNK_SIZE - part.shape[1]), (0, 0)))
+            chunks[(cx, cy, cz)] = np.ascontiguousarray(part)
+        return chunks
+
+
+def _generate_chunk_column_job(generator, cx, cz):
+    """Process pool entry point (module-level so it can be pickled)."""
+    return generator.generate_chunk_column(cx, cz)
+
+
+def generate_chunk_columns(generator, column_coords, processes=None, min_parallel_columns=16):
+    """
+    Generates many chunk columns, fanning out across a process pool when there are enough of them.
+    Results are identical to serial generation for the same seed.
+
+    Args:
+        generator (TerrainGenerator): Generator to use (pickled to the workers).
+        column_coords (iterable): (cx, cz) chunk column coordinates.
+        processes (int, optional): Worker count; defaults to os.cpu_count(). 0 or 1 runs serially.
+        min_parallel_columns (int): Below this many columns, the pool startup isn't worth it.
+
+    Returns:
+        dict: {(cx, cy, cz): uint8 block array} for all non-empty chunks.
+    """
+    column_coords = list(column_coords)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    chunks = {}
+    if processes <= 1 or len(column_coords) < min_parallel_columns:
+        for cx, cz in column_coords:
+            chunks.update(generator.generate_chunk_column(cx, cz))
+        return chunks
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunksize = max(1, len(column_coords) // (processes * 4))
+        results = pool.map(_generate_chunk_column_job, [generator] * len(column_coords),
+                           [c[0] for c in column_coords], [c[1] for c in column_coords], chunksize=chunksize)
+        for column_chunks in results:
+            chunks.update(column_chunks)
+    return chunks
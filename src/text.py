@@ -0,0 +1,120 @@
+from collections import OrderedDict
+
+from OpenGL.GL import *
+import pygame
+import numpy as np
+
+from . import render_state
+
+# Characters rasterized into the atlas; anything else is drawn as FALLBACK_CHAR
+ATLAS_CHARACTERS = "".join(chr(c) for c in range(32, 127))
+FALLBACK_CHAR = "?"
+ATLAS_WIDTH = 512
+TEXT_CACHE_SIZE = 256 # Number of distinct strings whose quads are kept
+
+_glyph_atlases = {} # id(font) -> GlyphAtlas
+
+
+class GlyphAtlas:
+    """
+    All glyphs of one pygame font rasterized once into a single GL texture.
+
+    Strings are built as batches of textured quads from the cached glyph metrics, and the
+    quads of recently built strings are cached too, so steady-state HUD text costs
+    no rasterization or texture uploads. Glyphs are rendered white, so the text colour can be
+    applied per vertex.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.line_height = font.get_linesize()
+        self.glyphs = {} # char -> (advance, width, height, u0, v0, u1, v1)
+        self._cache = OrderedDict() # text -> (positions (N, 2), uvs (N, 2), width, height)
+
+        # Pack glyph surfaces left to right in rows of line_height
+        surfaces = {ch: font.render(ch, True, (255, 255, 255)) for ch in ATLAS_CHARACTERS}
+        placements, x, y = {}, 0, 0
+        for ch, surface in surfaces.items():
+            w = surface.get_width()
+            if x + w > ATLAS_WIDTH:
+                x, y = 0, y + self.line_height
+            placements[ch] = (x, y)
+            x += w + 1 # One pixel gap against linear filtering bleed
+        atlas_height = 1 << max(0, (y + self.line_height - 1).bit_length()) # Power of two
+        atlas = pygame.Surface((ATLAS_WIDTH, atlas_height), pygame.SRCALPHA)
+        atlas.fill((0, 0, 0, 0))
+        for ch, surface in surfaces.items():
+            gx, gy = placements[ch]
+            atlas.blit(surface, (gx, gy))
+            w, h = surface.get_size()
+            # The atlas is uploaded bottom row first, so v runs upwards from the bottom of the image
+            self.glyphs[ch] = (w, w, h, gx / ATLAS_WIDTH, 1.0 - (gy + h) / atlas_height,
+                               (gx + w) / ATLAS_WIDTH, 1.0 - gy / atlas_height)
+
+        self.texture_id = glGenTextures(1)
+        render_state.bind_texture(0, self.texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR); glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE); glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ATLAS_WIDTH, atlas_height, 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     pygame.image.tostring(atlas, "RGBA", True))
+        # Counters
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _glyph(self, ch):
+        return self.glyphs.get(ch) or self.glyphs[FALLBACK_CHAR]
+
+    def measure(self, text):
+        """Returns (width, height) of a single line of text in pixels."""
+        return sum(self._glyph(ch)[0] for ch in text), self.line_height
+
+    def build_text_quads(self, text):
+        """
+        Returns the quads of a single line of text with its bottom-left corner at (0, 0), y up.
+        Results are cached per string (LRU), so unchanged text is never rebuilt.
+
+        Returns:
+            tuple: (positions (N, 2) float32, uvs (N, 2) float32, width, height), 4 vertices per glyph.
+        """
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        glyphs = np.array([self._glyph(ch) for ch in text], dtype=np.float32).reshape(-1, 7)
+        advances, widths, heights = glyphs[:, 0], glyphs[:, 1], glyphs[:, 2]
+        left = np.cumsum(advances) - advances # Pen position before each glyph
+        bottom = self.line_height - heights # Glyph surfaces are top-aligned within the line
+        x0, x1, y0, y1 = left, left + widths, bottom, bottom + heights
+        u0, v0, u1, v1 = glyphs[:, 3], glyphs[:, 4], glyphs[:, 5], glyphs[:, 6]
+        positions = np.stack([np.stack(p, axis=1) for p in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))], axis=1).reshape(-1, 2)
+        uvs = np.stack([np.stack(t, axis=1) for t in ((u0, v0), (u1, v0), (u1, v1), (u0, v1))], axis=1).reshape(-1, 2)
+        cached = (np.ascontiguousarray(positions, dtype=np.float32), np.ascontiguousarray(uvs, dtype=np.float32),
+                  float(advances.sum()), self.line_height)
+        self._cache[text] = cached
+        if len(self._cache) > TEXT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return cached
+
+    def delete(self):
+        if self.texture_id:
+            render_state.forget_texture(self.texture_id)
+            glDeleteTextures(1, [self.texture_id])
+            self.texture_id = None
+        self._cache.clear()
+
+
+def get_glyph_atlas(font):
+    """Returns the glyph atlas of a pygame font, building it on first use."""
+    atlas = _glyph_atlases.get(id(font))
+    if atlas is None:
+        atlas = GlyphAtlas(font)
+        _glyph_atlases[id(font)] = atlas
+    return atlas
+
+def delete_all_glyph_atlases():
+    for atlas in _glyph_atlases.values():
+        atlas.delete()
+    _glyph_atlases.clear()
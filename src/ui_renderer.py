@@ -0,0 +1,265 @@
+from OpenGL.GL import *
+from OpenGL.GL import sizeof, GLfloat
+import ctypes
+import numpy as np
+
+from .assets import std_cube_vertices, cube_edges
+from .block_type import BLOCK_COLORS
+from .camera import orthographic_matrix
+from .shader_utils import create_shader_program
+from .text import get_glyph_atlas
+from . import render_state
+
+# Per-vertex layout (float32): Position (3f), Glyph UV + textured flag (3f), Colour RGBA (4f)
+UI_VERTEX_FLOATS = 10
+
+# Hotbar layout, in pixels
+HOTBAR_SLOT_SIZE = 50
+HOTBAR_PADDING = 5
+HOTBAR_BOTTOM = 20
+HOTBAR_SELECTION_WIDTH = 3
+CROSSHAIR_SIZE = 16
+CROSSHAIR_THICKNESS = 2
+# Frame-time graph of the profiler overlay (top-right corner), in pixels
+FRAME_GRAPH_WIDTH = 240 # One column per frame
+FRAME_GRAPH_HEIGHT = 80 # Spans twice the frame budget
+FRAME_GRAPH_MARGIN = 10
+
+_QUAD_TRIANGLE_CORNERS = np.array([0, 1, 2, 0, 2, 3], dtype=np.intp)
+
+
+def _rect_vertices(x0, y0, x1, y1, color):
+    """Two triangles covering [x0, x1] x [y0, y1] in a solid colour."""
+    vertices = np.zeros((6, UI_VERTEX_FLOATS), dtype=np.float32)
+    corners = np.array([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], dtype=np.float32)
+    vertices[:, 0:2] = corners[_QUAD_TRIANGLE_CORNERS]
+    vertices[:, 6:10] = color
+    return vertices
+
+def _frame_vertices(x0, y0, x1, y1, thickness, color):
+    """A rectangular border of the given thickness, drawn as four solid rects inside [x0, x1] x [y0, y1]."""
+    return np.concatenate([
+        _rect_vertices(x0, y0, x1, y0 + thickness, color),
+        _rect_vertices(x0, y1 - thickness, x1, y1, color),
+        _rect_vertices(x0, y0 + thickness, x0 + thickness, y1 - thickness, color),
+        _rect_vertices(x1 - thickness, y0 + thickness, x1, y1 - thickness, color),
+    ])
+
+def _text_vertices(glyph_atlas, text, x, y, color):
+    """Triangles for a line of text with its bottom-left corner at (x, y), from the atlas' cached quads."""
+    positions, uvs, _, _ = glyph_atlas.build_text_quads(text)
+    quad_count = len(positions) // 4
+    corner_idx = (np.arange(quad_count)[:, None] * 4 + _QUAD_TRIANGLE_CORNERS).reshape(-1)
+    vertices = np.zeros((len(corner_idx), UI_VERTEX_FLOATS), dtype=np.float32)
+    vertices[:, 0:2] = positions[corner_idx] + (x, y)
+    vertices[:, 3:5] = uvs[corner_idx]
+    vertices[:, 5] = 1.0
+    vertices[:, 6:10] = color
+    return vertices
+
+
+class UIBatchRenderer:
+    """
+    Retained-mode HUD renderer: the hotbar, crosshair and text lines are built into one
+    dynamic VBO and drawn with a single glDrawArrays using a small shader of its own.
+
+    The HUD is split into sections, each rebuilt only when its inputs change (inventory,
+    selection, text or screen size); the VBO is re-uploaded only when some section changed.
+    The block selection outline is a static line VBO drawn with its own transform.
+    """
+
+    def __init__(self, font, screen_width, screen_height):
+        self.program_id = create_shader_program("shaders/ui_vertex.glsl", "shaders/ui_fragment.glsl")
+        self.uniform_locations = {
+            'transform': glGetUniformLocation(self.program_id, "transform"),
+            'uiTexture': glGetUniformLocation(self.program_id, "uiTexture"),
+        }
+        self.glyph_atlas = get_glyph_atlas(font)
+        self._sections = {} # name -> (key, vertices)
+        self._dirty = True
+        self._vertex_count = 0
+        self._capacity_bytes = 0
+
+        self.vao_id, self.vbo_id = self._create_vertex_array(None)
+        self.outline_vao_id, self.outline_vbo_id = self._create_vertex_array(self._outline_vertices())
+        self.outline_vertex_count = len(cube_edges) * 2
+        # Counters
+        self.section_rebuilds = 0
+        self.uploads = 0
+        self.set_screen_size(screen_width, screen_height)
+
+    def _create_vertex_array(self, vertex_data):
+        vao_id = glGenVertexArrays(1)
+        vbo_id = glGenBuffers(1)
+        render_state.bind_vertex_array(vao_id)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo_id)
+        if vertex_data is not None:
+            glBufferData(GL_ARRAY_BUFFER, vertex_data.nbytes, vertex_data, GL_STATIC_DRAW)
+        stride = UI_VERTEX_FLOATS * sizeof(GLfloat)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * sizeof(GLfloat)))
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(2, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * sizeof(GLfloat)))
+        glEnableVertexAttribArray(2)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        render_state.bind_vertex_array(0)
+        return vao_id, vbo_id
+
+    @staticmethod
+    def _outline_vertices():
+        vertices = np.zeros((len(cube_edges) * 2, UI_VERTEX_FLOATS), dtype=np.float32)
+        vertices[:, 0:3] = [std_cube_vertices[v_idx] for edge in cube_edges for v_idx in edge]
+        vertices[:, 6:10] = (0.0, 0.0, 0.0, 1.0)
+        return vertices
+
+    # --- Sections ---
+
+    def _set_section(self, name, key, build):
+        """Rebuilds a section's vertices only if its key changed."""
+        section = self._sections.get(name)
+        if section is not None and section[0] == key:
+            return
+        self._sections[name] = (key, build())
+        self._dirty = True
+        self.section_rebuilds += 1
+
+    def set_screen_size(self, screen_width, screen_height):
+        self.screen_width, self.screen_height = screen_width, screen_height
+        self.projection = orthographic_matrix(0, screen_width, 0, screen_height)
+        self._set_section('crosshair', (screen_width, screen_height), self._build_crosshair)
+
+    def _build_crosshair(self):
+        cx, cy = self.screen_width / 2.0, self.screen_height / 2.0
+        half, half_t = CROSSHAIR_SIZE / 2.0, CROSSHAIR_THICKNESS / 2.0
+        color = (1.0, 1.0, 1.0, 0.8)
+        return np.concatenate([
+            _rect_vertices(cx - half, cy - half_t, cx + half, cy + half_t, color),
+            _rect_vertices(cx - half_t, cy - half, cx + half_t, cy - half_t, color),
+            _rect_vertices(cx - half_t, cy + half_t, cx + half_t, cy + half, color),
+        ])
+
+    def update_hotbar(self, hotbar_slots_types, player_inventory, current_selection_idx):
+        quantities = tuple(player_inventory.get(block_type.value, 0) for block_type in hotbar_slots_types)
+        key = (self.screen_width, self.screen_height, tuple(hotbar_slots_types), quantities, current_selection_idx)
+        self._set_section('hotbar', key, lambda: self._build_hotbar(hotbar_slots_types, quantities, current_selection_idx))
+
+    def _build_hotbar(self, hotbar_slots_types, quantities, current_selection_idx):
+        slot_size, padding = HOTBAR_SLOT_SIZE, HOTBAR_PADDING
+        num_slots = len(hotbar_slots_types)
+        hotbar_width = num_slots * slot_size + (num_slots - 1) * padding
+        start_x = (self.screen_width - hotbar_width) / 2.0; start_y = HOTBAR_BOTTOM
+        parts = [_rect_vertices(start_x - padding, start_y - padding, start_x + hotbar_width + padding,
+                                start_y + slot_size + padding, (0.2, 0.2, 0.2, 0.7))]
+        for i, (block_type_enum, quantity) in enumerate(zip(hotbar_slots_types, quantities)):
+            slot_x = start_x + i * (slot_size + padding)
+            parts.append(_rect_vertices(slot_x, start_y, slot_x + slot_size, start_y + slot_size, (0.4, 0.4, 0.4, 0.7)))
+            block_color = [c / 255.0 for c in BLOCK_COLORS.get(block_type_enum, (100, 100, 100))] + [1.0]
+            inner_pad = 5
+            parts.append(_rect_vertices(slot_x + inner_pad, start_y + inner_pad, slot_x + slot_size - inner_pad,
+                                        start_y + slot_size - inner_pad, block_color))
+            if quantity > 0:
+                qty_text = str(quantity); qty_w, _ = self.glyph_atlas.measure(qty_text)
+                parts.append(_text_vertices(self.glyph_atlas, qty_text, slot_x + slot_size - qty_w - 2, start_y + 2,
+                                            (1.0, 1.0, 1.0, 1.0)))
+            if i == current_selection_idx:
+                offset = 1 + HOTBAR_SELECTION_WIDTH / 2.0 # Border centred on the old 1px-outset outline
+                parts.append(_frame_vertices(slot_x - offset, start_y - offset, slot_x + slot_size + offset,
+                                             start_y + slot_size + offset, HOTBAR_SELECTION_WIDTH, (1.0, 1.0, 0.0, 0.5)))
+        return np.concatenate(parts)
+
+    def update_text_lines(self, lines, color=(1.0, 1.0, 0.0, 1.0)):
+        """Sets the debug text lines in the top-left corner (FPS counter etc.)."""
+        key = (self.screen_width, self.screen_height, tuple(lines), tuple(color))
+        self._set_section('text', key, lambda: self._build_text_lines(lines, color))
+
+    def _build_text_lines(self, lines, color):
+        parts = [np.empty((0, UI_VERTEX_FLOATS), dtype=np.float32)]
+        x_pos = 10; y_pos = self.screen_height - 10
+        for line in lines:
+            y_pos -= self.glyph_atlas.line_height
+            parts.append(_text_vertices(self.glyph_atlas, line, x_pos, y_pos, color))
+            y_pos -= 2
+        return np.concatenate(parts)
+
+    def update_frame_graph(self, frame_times_ms, budget_ms):
+        """Sets the frame-time graph: one bar per frame (newest on the right) and a line at the budget."""
+        frame_times_ms = np.asarray(frame_times_ms, dtype=np.float32)[-FRAME_GRAPH_WIDTH:]
+        key = (self.screen_width, self.screen_height, frame_times_ms.tobytes(), budget_ms)
+        self._set_section('frame_graph', key, lambda: self._build_frame_graph(frame_times_ms, budget_ms))
+
+    def hide_frame_graph(self):
+        if self._sections.pop('frame_graph', None) is not None:
+            self._dirty = True
+
+    def _build_frame_graph(self, frame_times_ms, budget_ms):
+        x1 = self.screen_width - FRAME_GRAPH_MARGIN; x0 = x1 - FRAME_GRAPH_WIDTH
+        y1 = self.screen_height - FRAME_GRAPH_MARGIN; y0 = y1 - FRAME_GRAPH_HEIGHT
+        scale = FRAME_GRAPH_HEIGHT / (2.0 * budget_ms)
+        # All bars at once: (N, 6) triangle corners of unit-width rects
+        count = len(frame_times_ms)
+        lefts = x1 - count + np.arange(count, dtype=np.float32)
+        tops = y0 + np.minimum(frame_times_ms * scale, FRAME_GRAPH_HEIGHT)
+        corners_x = np.stack([lefts, lefts + 1, lefts + 1, lefts], axis=1)[:, _QUAD_TRIANGLE_CORNERS]
+        corners_y = np.stack([np.full(count, y0, np.float32), np.full(count, y0, np.float32), tops, tops], axis=1)[:, _QUAD_TRIANGLE_CORNERS]
+        bars = np.zeros((count, 6, UI_VERTEX_FLOATS), dtype=np.float32)
+        bars[:, :, 0], bars[:, :, 1] = corners_x, corners_y
+        colors = np.where((frame_times_ms <= budget_ms)[:, None], (0.2, 0.9, 0.2, 0.9),
+                          np.where((frame_times_ms <= 1.5 * budget_ms)[:, None], (0.9, 0.9, 0.2, 0.9), (0.9, 0.2, 0.2, 0.9)))
+        bars[:, :, 6:10] = colors[:, None, :]
+        budget_y = y0 + budget_ms * scale
+        return np.concatenate([
+            _rect_vertices(x0, y0, x1, y1, (0.0, 0.0, 0.0, 0.5)),
+            bars.reshape(-1, UI_VERTEX_FLOATS),
+            _rect_vertices(x0, budget_y, x1, budget_y + 1, (1.0, 1.0, 1.0, 0.8)),
+        ])
+
+    # --- Drawing ---
+
+    def _upload(self):
+        vertex_data = np.ascontiguousarray(np.concatenate([v for _, v in self._sections.values()]), dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo_id)
+        if vertex_data.nbytes > self._capacity_bytes:
+            self._capacity_bytes = max(vertex_data.nbytes, self._capacity_bytes * 2)
+            glBufferData(GL_ARRAY_BUFFER, self._capacity_bytes, None, GL_DYNAMIC_DRAW)
+        if vertex_data.nbytes:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, vertex_data.nbytes, vertex_data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._vertex_count = len(vertex_data)
+        self._dirty = False
+        self.uploads += 1
+
+    def draw_hud(self):
+        """Draws every HUD section in one call, re-uploading the VBO only if a section changed."""
+        if self._dirty:
+            self._upload()
+        if not self._vertex_count:
+            return
+        glDisable(GL_DEPTH_TEST); glDisable(GL_CULL_FACE); glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        render_state.use_program(self.program_id)
+        render_state.set_uniform_matrix4(self.uniform_locations['transform'], self.projection)
+        render_state.bind_texture(0, self.glyph_atlas.texture_id)
+        render_state.set_uniform_1i(self.uniform_locations['uiTexture'], 0)
+        render_state.bind_vertex_array(self.vao_id)
+        glDrawArrays(GL_TRIANGLES, 0, self._vertex_count)
+        glDisable(GL_BLEND); glEnable(GL_CULL_FACE); glEnable(GL_DEPTH_TEST)
+
+    def draw_block_outline(self, block_position, view_matrix, projection_matrix):
+        """Draws the wireframe outline of the block at integer world coordinates (depth-tested)."""
+        model_m = np.identity(4, dtype=np.float32)
+        model_m[3, 0:3] = block_position # Column-major translation
+        transform = model_m @ view_matrix @ projection_matrix # GL layout: (P V M)^T = M^T V^T P^T
+        render_state.use_program(self.program_id)
+        render_state.set_uniform_matrix4(self.uniform_locations['transform'], transform)
+        glLineWidth(2.0)
+        render_state.bind_vertex_array(self.outline_vao_id)
+        glDrawArrays(GL_LINES, 0, self.outline_vertex_count)
+        glLineWidth(1.0)
+
+    def delete(self):
+        render_state.forget_vertex_array(self.vao_id); render_state.forget_vertex_array(self.outline_vao_id)
+        render_state.forget_program(self.program_id)
+        glDeleteVertexArrays(2, [self.vao_id, self.outline_vao_id])
+        glDeleteBuffers(2, [self.vbo_id, self.outline_vbo_id])
+        glDeleteProgram(self.program_id)
@@ -0,0 +1,160 @@
+from collections import deque
+
+import numpy as np
+
+from .block_type import BlockType
+from .chunked_world import CHUNK_SHIFT
+from .culling import aabbs_in_frustum, chunk_aabbs, cull_chunks, last_cull_stats
+
+# Chunk faces in the order of their outward directions: +X, -X, +Y, -Y, +Z, -Z.
+# The opposite of face f is f ^ 1.
+FACE_DIRECTIONS = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+
+# The 15 unordered pairs of faces; a chunk's connectivity is a 15-bit mask over them, with bit i
+# set when empty cells connect FACE_PAIRS[i][0] to FACE_PAIRS[i][1] through the chunk
+FACE_PAIRS = tuple((a, b) for a in range(6) for b in range(a + 1, 6))
+PAIR_BIT = [[0] * 6 for _ in range(6)] # PAIR_BIT[a][b] -> mask bit of the pair (a, b), either order
+for _i, (_a, _b) in enumerate(FACE_PAIRS):
+    PAIR_BIT[_a][_b] = PAIR_BIT[_b][_a] = 1 << _i
+ALL_CONNECTED = (1 << len(FACE_PAIRS)) - 1 # Empty (or not yet meshed) chunks hide nothing
+
+# Set of faces (6-bit mask) touched by one region of empty cells -> the pairs it connects
+_PAIRS_OF_FACE_SET = np.zeros(64, dtype=np.int32)
+for _faces in range(64):
+    for _i, (_a, _b) in enumerate(FACE_PAIRS):
+        if _faces >> _a & 1 and _faces >> _b & 1:
+            _PAIRS_OF_FACE_SET[_faces] |= 1 << _i
+
+_FACE_SLICES = ((-1, slice(None), slice(None)), (0, slice(None), slice(None)),
+                (slice(None), -1, slice(None)), (slice(None), 0, slice(None)),
+                (slice(None), slice(None), -1), (slice(None), slice(None), 0))
+
+
+def _label_empty_regions(empty):
+    """
+    Labels the 6-connected regions of empty cells: each empty cell gets the smallest flat index
+    in its region, solid cells get empty.size. Labels are spread to neighbours a step at a time
+    and shortcut by pointer jumping (a label is itself a cell, whose label may be smaller still).
+    """
+    size = empty.size
+    labels = np.where(empty, np.arange(size).reshape(empty.shape), size)
+    flat_empty = empty.reshape(-1)
+    while True:
+        previous = labels.copy()
+        for axis in range(3):
+            low = [slice(None)] * 3; low[axis] = slice(None, -1); low = tuple(low)
+            high = [slice(None)] * 3; high[axis] = slice(1, None); high = tuple(high)
+            both = empty[low] & empty[high]
+            # The two views overlap, so each write takes the minimum with what is already there
+            labels[low] = np.where(both, np.minimum(labels[low], labels[high]), labels[low])
+            labels[high] = np.where(both, np.minimum(labels[low], labels[high]), labels[high])
+        flat = labels.reshape(-1)
+        flat[flat_empty] = flat[flat[flat_empty]]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def face_connectivity(blocks):
+    """
+    Which pairs of a chunk's faces are connected by empty cells inside it, i.e. whether the
+    chunk can be seen through from one face to the other.
+
+    Args:
+        blocks (np.ndarray): The chunk's (CHUNK_SIZE,) * 3 block values, or None for an all-EMPTY chunk.
+
+    Returns:
+        int: 15-bit mask over FACE_PAIRS.
+    """
+    if blocks is None:
+        return ALL_CONNECTED
+    empty = blocks == BlockType.EMPTY.value
+    if not empty.any():
+        return 0
+    if empty.all():
+        return ALL_CONNECTED
+    labels = _label_empty_regions(empty)
+    face_sets = np.zeros(empty.size + 1, dtype=np.uint8) # Per region label; the last slot collects solid cells
+    for face, face_slice in enumerate(_FACE_SLICES):
+        np.bitwise_or.at(face_sets, labels[face_slice].reshape(-1), 1 << face)
+    face_sets[-1] = 0
+    return int(np.bitwise_or.reduce(_PAIRS_OF_FACE_SET[np.unique(face_sets)]))
+
+
+class ChunkVisibilityGraph:
+    """
+    Face connectivity of every meshed chunk, and the visibility search over it.
+
+    Chunks without an entry (all-EMPTY ones, or ones not meshed yet) count as fully connected,
+    so the search never hides anything it knows nothing about.
+    """
+
+    def __init__(self):
+        self.connectivity = {} # chunk_coord -> 15-bit mask (see face_connectivity)
+
+    def set_connectivity(self, chunk_coord, mask):
+        if mask == ALL_CONNECTED:
+            self.connectivity.pop(chunk_coord, None)
+        else:
+            self.connectivity[chunk_coord] = mask
+
+    def update_chunk(self, world, chunk_coord):
+        """Recomputes a chunk's connectivity from the blocks currently in the world."""
+        self.set_connectivity(chunk_coord, face_connectivity(world.get_chunk(chunk_coord)))
+
+    def discard(self, chunk_coord):
+        self.connectivity.pop(chunk_coord, None)
+
+    def visible_chunks(self, camera_pos, frustum_planes, chunk_coords):
+        """
+        Returns the chunks (from the given iterable of drawable chunks) that may be visible from
+        the camera, by a breadth-first search from the camera's chunk.
+
+        The search steps to a neighbouring chunk only if that chunk intersects the frustum, never
+        against a direction it has already travelled in (so it only moves away from the camera),
+        and leaves a chunk through a face only if that face is connected to the face it came in
+        through. Chunks hidden behind solid terrain are never reached. The search stays within the
+        bounds of the drawable chunks plus one chunk of air around them; if the camera is outside
+        those bounds, plain frustum culling is used instead.
+        """
+        chunk_coords = list(chunk_coords)
+        if not chunk_coords:
+            last_cull_stats.update(chunks_tested=0, chunks_visible=0, chunks_culled=0, chunks_occluded=0)
+            return []
+        camera_chunk = tuple(int(np.floor(c + 0.5)) >> CHUNK_SHIFT for c in camera_pos)
+        coords = np.asarray(chunk_coords)
+        low, high = coords.min(axis=0) - 1, coords.max(axis=0) + 1
+        if not ((low <= camera_chunk) & (camera_chunk <= high)).all():
+            return cull_chunks(frustum_planes, chunk_coords)
+
+        # Frustum test of every chunk the search may enter, in one batch
+        grid = np.stack(np.meshgrid(*(np.arange(l, h + 1) for l, h in zip(low, high)), indexing='ij'), axis=-1).reshape(-1, 3)
+        in_frustum = set(map(tuple, grid[aabbs_in_frustum(frustum_planes, *chunk_aabbs(grid))].tolist()))
+        in_frustum.add(camera_chunk)
+
+        drawable = set(chunk_coords)
+        connectivity = self.connectivity
+        visible = []
+        visited = {camera_chunk}
+        queue = deque([(camera_chunk, -1, 0)]) # (chunk, face entered through or -1, directions travelled)
+        while queue:
+            chunk_coord, entered, travelled = queue.popleft()
+            if chunk_coord in drawable:
+                visible.append(chunk_coord)
+            mask = connectivity.get(chunk_coord, ALL_CONNECTED)
+            cx, cy, cz = chunk_coord
+            for face, (dx, dy, dz) in enumerate(FACE_DIRECTIONS):
+                if travelled >> (face ^ 1) & 1:
+                    continue # Would step back towards the camera
+                if entered >= 0 and not mask & PAIR_BIT[entered][face]:
+                    continue # No way through this chunk from where the search came in
+                neighbour = (cx + dx, cy + dy, cz + dz)
+                if neighbour in visited or neighbour not in in_frustum:
+                    continue
+                visited.add(neighbour)
+                queue.append((neighbour, face ^ 1, travelled | 1 << face))
+
+        in_frustum_count = len(drawable.intersection(in_frustum))
+        last_cull_stats.update(chunks_tested=len(drawable), chunks_visible=len(visible),
+                               chunks_culled=len(drawable) - in_frustum_count,
+                               chunks_occluded=in_frustum_count - len(visible))
+        return visible
@@ -1,42 +1,60 @@
+import math
+
 from .block_type import BlockType
-from .config import WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH
+from .config import WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH, WORLD_SEED, WORLDGEN_PROCESSES
+from .chunked_world import ChunkedWorld, CHUNK_SIZE, chunk_origin
+from .terrain import TerrainGenerator, generate_chunk_columns
+from .lighting import light_column
+
+# Global chunked voxel store (replaces the old nested-list world_data)
+world = ChunkedWorld()
+# Packed sky and block light per cell (see lighting.py), kept in step with world
+world_light = ChunkedWorld()
 
-# Global world_data variable
-world_data = [[[BlockType.EMPTY.value for _ in range(WORLD_DEPTH)] for _ in range(WORLD_HEIGHT)] for _ in range(WORLD_WIDTH)]
+def generate_world(seed=WORLD_SEED, width=WORLD_WIDTH, height=WORLD_HEIGHT, depth=WORLD_DEPTH, processes=WORLDGEN_PROCESSES):
+    """
+    Generates the initial world terrain: a seeded noise heightmap with grass/dirt/stone strata and trees,
+    computed a chunk column at a time in NumPy and spread over a process pool for large worlds.
+    """
+    generator = TerrainGenerator(seed, height)
+    column_coords = [(cx, cz) for cx in range(math.ceil(width / CHUNK_SIZE))
+                     for cz in range(math.ceil(depth / CHUNK_SIZE))]
+    for chunk_coord, blocks in generate_chunk_columns(generator, column_coords, processes=processes).items():
+        # Columns are generated whole; clear the parts that stick out past the world's edge
+        ox, _, oz = chunk_origin(chunk_coord)
+        if ox + blocks.shape[0] > width: blocks[width - ox:, :, :] = BlockType.EMPTY.value
+        if oz + blocks.shape[2] > depth: blocks[:, :, depth - oz:] = BlockType.EMPTY.value
+        if blocks.any():
+            world.set_chunk(chunk_coord, blocks)
 
-def generate_world():
-    """Generates the initial world terrain."""
-    global world_data # Ensure we are modifying the module-level world_data
-    
-    ground_level = WORLD_HEIGHT // 3
-    for x in range(WORLD_WIDTH):
-        for z in range(WORLD_DEPTH):
-            for y in range(ground_level):
-                world_data[x][y][z] = BlockType.DIRT.value
-            world_data[x][ground_level][z] = BlockType.GRASS.value
-            
-    # Manually placed blocks (example features)
-    # Ensure these are within the new world bounds if they were close to edges before
-    if WORLD_WIDTH > 5 and WORLD_HEIGHT > (ground_level + 3) and WORLD_DEPTH > 5:
-        world_data[1][ground_level+1][1] = BlockType.STONE.value
-        world_data[2][ground_level+1][2] = BlockType.STONE.value
-        world_data[2][ground_level+2][2] = BlockType.STONE.value
-        world_data[5][ground_level+1][5] = BlockType.WOOD.value
-        world_data[5][ground_level+2][5] = BlockType.WOOD.value
-        world_data[5][ground_level+3][5] = BlockType.LEAVES.value
-        
-        world_data[4][2][4]=BlockType.STONE.value # These might be below ground_level if it's low
-        world_data[3][2][4]=BlockType.STONE.value
-        world_data[5][2][4]=BlockType.STONE.value
-        world_data[4][1][4]=BlockType.STONE.value
-        world_data[4][3][4]=BlockType.STONE.value # This one could also be an issue
-        world_data[4][2][3]=BlockType.STONE.value
-        world_data[4][2][5]=BlockType.STONE.value
+def light_world(width=WORLD_WIDTH, depth=WORLD_DEPTH):
+    """Computes the light of every chunk column of a fixed-size world from scratch."""
+    world_light.chunks.clear()
+    world_light.chunk_revisions.clear()
+    for cx in range(math.ceil(width / CHUNK_SIZE)):
+        for cz in range(math.ceil(depth / CHUNK_SIZE)):
+            light_column(world, world_light, (cx, cz))
+
+def get_surface_height(x, z, max_height=WORLD_HEIGHT):
+    """Returns the y of the highest solid block in column (x, z), or -1 if the column is empty."""
+    solid_ys = world.get_region(x, 0, z, x + 1, max_height, z + 1)[0, :, 0].nonzero()[0]
+    return int(solid_ys[-1]) if len(solid_ys) else -1
 
 def is_block_solid(x, y, z):
     """Checks if a block at the given coordinates is solid (not EMPTY)."""
-    # world_data is accessed directly as a module-level global
-    # WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH are imported
     if not (0 <= x < WORLD_WIDTH and 0 <= y < WORLD_HEIGHT and 0 <= z < WORLD_DEPTH):
-        return False 
-    return world_data[x][y][z] != BlockType.EMPTY.value
+        return False
+    return world.is_block_solid(x, y, z)
+
+def load_saved_chunks(storage):
+    """
+    Replaces generated chunks with the saved ones from a WorldStorage (fixed-size worlds) and
+    marks the result clean, so only later edits are written back.
+    """
+    for chunk_coord in storage.saved_chunk_coords():
+        blocks = storage.load_chunk(chunk_coord)
+        if blocks is not None and blocks.any():
+            world.set_chunk(chunk_coord, blocks)
+        else:
+            world.unload_chunk(chunk_coord)
+    storage.mark_all_clean(world)